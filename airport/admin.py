@@ -6,7 +6,9 @@ from .models import (
     Airplane,
     Crew,
     Flight,
+    FlightSchedule,
     Order,
+    SeatHold,
     Ticket,
 )
 
@@ -54,6 +56,21 @@ class FlightAdmin(admin.ModelAdmin):
     list_filter = ('route', 'airplane')
 
 
+@admin.register(FlightSchedule)
+class FlightScheduleAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'route',
+        'airplane',
+        'departure_time',
+        'time_zone',
+        'valid_from',
+        'valid_until',
+        'generated_until',
+    )
+    list_filter = ('route', 'airplane')
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'created_at')
@@ -64,3 +81,9 @@ class OrderAdmin(admin.ModelAdmin):
 class TicketAdmin(admin.ModelAdmin):
     list_display = ('id', 'flight', 'order', 'row', 'seat')
     list_filter = ('flight', 'order')
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ('id', 'flight', 'user', 'row', 'seat', 'expires_at')
+    list_filter = ('flight',)
@@ -0,0 +1,215 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    AnalyticsWatermark,
+    DailyBookings,
+    Flight,
+    FlightLoad,
+    Order,
+    RouteDayLoad,
+)
+
+LOAD_FIELDS = (
+    'route_id',
+    'day',
+    'departure_time',
+    'capacity',
+    'seats_sold',
+    'seat_version',
+)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _changed_flights():
+    # Flights whose FlightLoad is missing or differs. One join over the
+    # flights table, which is orders of magnitude smaller than tickets.
+    current = FlightLoad.objects.filter(
+        flight_id=OuterRef('pk'),
+        route=OuterRef('route'),
+        departure_time=OuterRef('departure_time'),
+        capacity=OuterRef('capacity'),
+        seats_sold=OuterRef('seats_sold'),
+        seat_version=OuterRef('seat_version'),
+    )
+    return (
+        Flight.objects.annotate(
+            capacity=F('airplane__rows') * F('airplane__seats_in_row'),
+        )
+        .filter(~Exists(current))
+        .values_list(
+            'pk',
+            'route',
+            'departure_time',
+            'capacity',
+            'seats_sold',
+            'seat_version',
+        )
+        .order_by('pk')
+    )
+
+
+def _refresh_route_days(pairs, batch_size):
+    """Recompute RouteDayLoad for the given (route, day) pairs."""
+    for batch in _batched(sorted(pairs), batch_size):
+        pairs = set(batch)
+        totals = {
+            (row['route'], row['day']): row
+            for row in FlightLoad.objects.filter(
+                route__in={route for route, _ in batch},
+                day__in={day for _, day in batch},
+            )
+            .values('route', 'day')
+            .annotate(
+                flights=Count('pk'),
+                capacity=Sum('capacity'),
+                seats_sold=Sum('seats_sold'),
+            )
+            .order_by()
+        }
+        RouteDayLoad.objects.bulk_create(
+            [
+                RouteDayLoad(
+                    route_id=route,
+                    day=day,
+                    flights=row['flights'],
+                    capacity=row['capacity'],
+                    seats_sold=row['seats_sold'],
+                )
+                for (route, day), row in totals.items()
+                if (route, day) in pairs
+            ],
+            update_conflicts=True,
+            unique_fields=['route', 'day'],
+            update_fields=['flights', 'capacity', 'seats_sold'],
+        )
+        emptied = pairs - totals.keys()
+        if emptied:
+            RouteDayLoad.objects.filter(
+                Q(*[Q(route=route, day=day) for route, day in emptied],
+                  _connector=Q.OR),
+            ).delete()
+
+
+def refresh_loads(batch_size=5000):
+    """
+    Bring FlightLoad up to date with every flight whose seats, route,
+    departure or airplane changed since the last run, drop the loads of
+    deleted flights, and recompute the RouteDayLoad rows they touch.
+    """
+    touched = set()
+    updated = 0
+    with transaction.atomic():
+        changed = list(_changed_flights())
+        for batch in _batched(changed, batch_size):
+            old = FlightLoad.objects.in_bulk([row[0] for row in batch])
+            loads = []
+            for pk, route, departure, capacity, sold, version in batch:
+                if pk in old:
+                    touched.add((old[pk].route_id, old[pk].day))
+                load = FlightLoad(
+                    flight_id=pk,
+                    route_id=route,
+                    day=timezone.localdate(departure),
+                    departure_time=departure,
+                    capacity=capacity,
+                    seats_sold=sold,
+                    seat_version=version,
+                )
+                touched.add((route, load.day))
+                loads.append(load)
+            FlightLoad.objects.bulk_create(
+                loads,
+                update_conflicts=True,
+                unique_fields=['flight_id'],
+                update_fields=LOAD_FIELDS,
+            )
+            updated += len(loads)
+
+        deleted = FlightLoad.objects.exclude(
+            flight_id__in=Flight.objects.values('pk'),
+        )
+        touched.update(deleted.values_list('route', 'day'))
+        removed, _ = deleted.delete()
+
+        _refresh_route_days(touched, batch_size)
+    return {
+        'flights_updated': updated,
+        'flights_removed': removed,
+        'route_days': len(touched),
+    }
+
+
+def refresh_bookings(settle=timedelta(minutes=1)):
+    """
+    Add orders past the `orders` watermark to DailyBookings. Orders
+    younger than `settle` wait for the next run, so that an order whose
+    transaction commits late is not skipped. Tickets are counted as they
+    stand when the order is read: later cancellations show up in the load
+    factor, not here.
+    """
+    with transaction.atomic():
+        watermark, _ = (
+            AnalyticsWatermark.objects.select_for_update()
+            .get_or_create(name='orders')
+        )
+        orders = (
+            Order.objects.filter(
+                pk__gt=watermark.value,
+                created_at__lt=timezone.now() - settle,
+            )
+            .annotate(tickets_count=Count('tickets'))
+            .values_list('pk', 'created_at', 'tickets_count')
+            .order_by('pk')
+        )
+        days = defaultdict(lambda: [0, 0])
+        last = watermark.value
+        for pk, created_at, tickets in orders.iterator(chunk_size=5000):
+            totals = days[timezone.localdate(created_at)]
+            totals[0] += 1
+            totals[1] += tickets
+            last = pk
+
+        for day, (count, tickets) in days.items():
+            updated = DailyBookings.objects.filter(day=day).update(
+                orders=F('orders') + count,
+                tickets=F('tickets') + tickets,
+            )
+            if not updated:
+                DailyBookings.objects.create(
+                    day=day,
+                    orders=count,
+                    tickets=tickets,
+                )
+        watermark.value = last
+        watermark.save()
+    return {
+        'orders': sum(count for count, _ in days.values()),
+        'booking_days': len(days),
+    }
+
+
+def refresh_analytics(settle=timedelta(minutes=1), batch_size=5000):
+    return {
+        **refresh_loads(batch_size),
+        **refresh_bookings(settle),
+    }
+
+
+def with_load_factor(rows):
+    for row in rows:
+        capacity = row['capacity']
+        row['load_factor'] = (
+            round(row['seats_sold'] / capacity, 4) if capacity else 0.0
+        )
+        yield row
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AirportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'airport'
+
+    def ready(self):
+        from . import instrumentation
+        from . import signals  # noqa: F401
+        from .postgres import install_postgres_objects
+
+        post_migrate.connect(install_postgres_objects, sender=self)
+        instrumentation.install()
@@ -0,0 +1,34 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('flights/', async_views.flight_list, name='async-flight-list'),
+    path(
+        'flights/<int:pk>/',
+        async_views.flight_detail,
+        name='async-flight-detail',
+    ),
+    path(
+        'flights/<int:pk>/seats/',
+        async_views.flight_seats,
+        name='async-flight-seats',
+    ),
+    path(
+        'flights/<int:pk>/seats/events/',
+        async_views.flight_seat_events,
+        name='async-flight-seat-events',
+    ),
+    path('airports/', async_views.airport_list, name='async-airport-list'),
+    path(
+        'airports/<int:pk>/',
+        async_views.airport_detail,
+        name='async-airport-detail',
+    ),
+    path('routes/', async_views.route_list, name='async-route-list'),
+    path(
+        'routes/<int:pk>/',
+        async_views.route_detail,
+        name='async-route-detail',
+    ),
+]
@@ -0,0 +1,264 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import (
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_safe
+
+from . import cache as seat_map_cache
+from .filters import AsyncFlightFilter, AsyncRouteFilter
+from .metrics import SEAT_MAP_REQUESTS
+from .models import Airport, Flight, Route
+from .pubsub import flight_channel, get_broker
+from .seatmap import seat_map_payload
+from .serializers import AirportSerializer, FlightSerializer, RouteSerializer
+
+SEAT_MAP_LAYOUTS = ('verbose', 'compact')
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def _encode_cursor(values):
+    # Full isoformat: DjangoJSONEncoder would cut datetimes to milliseconds.
+    data = json.dumps(values, default=lambda value: value.isoformat())
+    return base64.urlsafe_b64encode(data.encode()).decode('ascii')
+
+
+def _decode_cursor(queryset, fields, cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(fields):
+            raise InvalidCursor()
+        return [
+            queryset.model._meta.get_field(name).to_python(value)
+            for name, value in zip(fields, values)
+        ]
+    except (binascii.Error, TypeError, ValueError, ValidationError):
+        raise InvalidCursor()
+
+
+def _after(fields, values):
+    """Rows strictly after `values` in (fields...) ascending order."""
+    condition = Q()
+    for i, name in enumerate(fields):
+        condition |= Q(
+            **dict(zip(fields[:i], values[:i])),
+            **{f'{name}__gt': values[i]},
+        )
+    return condition
+
+
+async def _keyset_page(request, queryset, serializer_class):
+    """Forward-only page over the queryset's (ascending) ordering."""
+    fields = list(queryset.query.order_by)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            values = _decode_cursor(queryset, fields, cursor)
+        except InvalidCursor:
+            return _error('Invalid cursor', 404)
+        queryset = queryset.filter(_after(fields, values))
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    rows = [row async for row in queryset[:page_size + 1]]
+    next_url = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        query = request.GET.copy()
+        query['cursor'] = _encode_cursor([
+            getattr(rows[-1], name) for name in fields
+        ])
+        next_url = request.build_absolute_uri('?' + query.urlencode())
+    return JsonResponse({
+        'next': next_url,
+        'results': serializer_class(rows, many=True).data,
+    })
+
+
+async def _detail(queryset, pk, serializer_class):
+    try:
+        instance = await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        return _error('Not found.', 404)
+    return JsonResponse(serializer_class(instance).data)
+
+
+def _filtered(filterset):
+    if not filterset.is_valid():
+        return None, JsonResponse(
+            {name: list(errors) for name, errors in filterset.errors.items()},
+            status=400,
+        )
+    return filterset.qs, None
+
+
+def _flights():
+    return (
+        Flight.objects.prefetch_related('crews')
+        .defer('seat_bitmap')
+        .order_by('id')
+    )
+
+
+@require_safe
+async def flight_list(request):
+    queryset, error = _filtered(
+        AsyncFlightFilter(request.GET, queryset=_flights())
+    )
+    if error is not None:
+        return error
+    return await _keyset_page(request, queryset, FlightSerializer)
+
+
+@require_safe
+async def flight_detail(request, pk):
+    return await _detail(_flights(), pk, FlightSerializer)
+
+
+def _seat_map_not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+async def _load_seat_map(pk, layout, version=None):
+    """(version, payload) of a seat map, from the cache when possible."""
+    if version is not None:
+        payload = await seat_map_cache.aget_payload(pk, version, layout)
+        if payload is not None:
+            SEAT_MAP_REQUESTS.inc(result='hit')
+            return version, payload
+    flight = await Flight.objects.select_related('airplane').aget(pk=pk)
+    SEAT_MAP_REQUESTS.inc(result='miss')
+    version = flight.seat_version
+    await seat_map_cache.aremember_version(pk, version)
+    payload = seat_map_payload(
+        pk,
+        version,
+        await flight.aget_seat_bitmap(),
+        layout,
+    )
+    await seat_map_cache.aset_payload(pk, version, layout, payload)
+    return version, payload
+
+
+@require_safe
+async def flight_seats(request, pk):
+    layout = request.GET.get('layout', 'verbose')
+    if layout not in SEAT_MAP_LAYOUTS:
+        return _error('layout must be one of: verbose, compact', 400)
+
+    version = await seat_map_cache.aget_version(pk)
+    if version is not None:
+        etag = seat_map_cache.etag_for(pk, version)
+        if seat_map_cache.etag_matches(request, etag):
+            SEAT_MAP_REQUESTS.inc(result='not_modified')
+            return _seat_map_not_modified(etag)
+    try:
+        version, payload = await _load_seat_map(pk, layout, version)
+    except Flight.DoesNotExist:
+        return _error('Not found.', 404)
+
+    etag = seat_map_cache.etag_for(pk, version)
+    if seat_map_cache.etag_matches(request, etag):
+        return _seat_map_not_modified(etag)
+    response = JsonResponse(payload)
+    response['ETag'] = etag
+    return response
+
+
+def _event(name, data, event_id=None):
+    lines = [f'event: {name}', f'data: {json.dumps(data)}']
+    if event_id is not None:
+        lines.insert(0, f'id: {event_id}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def _seat_events(pk):
+    async with get_broker().subscribe(flight_channel(pk)) as subscription:
+        # Subscribed before the snapshot is read, so no change falls
+        # between the two.
+        version, payload = await _load_seat_map(
+            pk,
+            'compact',
+            await seat_map_cache.aget_version(pk),
+        )
+        yield 'retry: 3000\n\n'
+        yield _event('snapshot', payload, version)
+        while True:
+            try:
+                message = await subscription.get(
+                    settings.SEAT_EVENTS_KEEPALIVE,
+                )
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if message is not None and message['version'] <= version:
+                continue
+            if (
+                message is None
+                or message['version'] != version + 1
+                or not (message['taken'] or message['released'])
+            ):
+                # Missed or reordered deltas, or a full reindex: resend.
+                try:
+                    version, payload = await _load_seat_map(pk, 'compact')
+                except Flight.DoesNotExist:
+                    return
+                yield _event('snapshot', payload, version)
+                continue
+            version = message['version']
+            yield _event('seats', {'flight': pk, **message}, version)
+
+
+@require_safe
+async def flight_seat_events(request, pk):
+    if not await Flight.objects.filter(pk=pk).aexists():
+        return _error('Not found.', 404)
+    return StreamingHttpResponse(
+        _seat_events(pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@require_safe
+async def airport_list(request):
+    return await _keyset_page(
+        request,
+        Airport.objects.order_by('id'),
+        AirportSerializer,
+    )
+
+
+@require_safe
+async def airport_detail(request, pk):
+    return await _detail(Airport.objects.all(), pk, AirportSerializer)
+
+
+@require_safe
+async def route_list(request):
+    queryset, error = _filtered(
+        AsyncRouteFilter(request.GET, queryset=Route.objects.order_by('id'))
+    )
+    if error is not None:
+        return error
+    return await _keyset_page(request, queryset, RouteSerializer)
+
+
+@require_safe
+async def route_detail(request, pk):
+    return await _detail(Route.objects.all(), pk, RouteSerializer)
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# Only what authentication and the permission classes read. Any other
+# field of the cached user is deferred and loaded on first access.
+CACHED_USER_FIELDS = (api_settings.USER_ID_FIELD, 'is_active', 'is_staff')
+
+
+def user_cache_key(user_id):
+    return f'auth:principal:{user_id}'
+
+
+def _cache_entry(user):
+    # Never the password hash: the cache may be shared (Redis). The stamp
+    # is what simplejwt puts in the token's revocation claim.
+    return {
+        'fields': {name: getattr(user, name) for name in CACHED_USER_FIELDS},
+        'stamp': (
+            get_md5_hash_password(user.password)
+            if api_settings.CHECK_REVOKE_TOKEN else None
+        ),
+    }
+
+
+def _cached_user(entry):
+    User = get_user_model()
+    names = [field.attname for field in User._meta.concrete_fields]
+    return User.from_db(
+        DEFAULT_DB_ALIAS,
+        names,
+        [entry['fields'].get(name, DEFERRED) for name in names],
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the token's user in the cache for
+    AUTH_USER_CACHE_TIMEOUT seconds instead of selecting it on every
+    request. Only the flags in CACHED_USER_FIELDS and a revocation stamp
+    are cached. Saving or deleting the user drops the cached copy.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key,
+                _cache_entry(user),
+                settings.AUTH_USER_CACHE_TIMEOUT,
+            )
+            return user
+
+        user = _cached_user(entry)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'),
+                code='user_inactive',
+            )
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry['stamp']:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code='password_changed',
+            )
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = CachedJWTAuthentication
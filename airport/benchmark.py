@@ -0,0 +1,536 @@
+import platform
+import random
+import statistics
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DatabaseError, connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import occupancy
+from .analytics import refresh_analytics
+from .models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSchedule,
+    Order,
+    Route,
+    Ticket,
+)
+from .occupancy import SeatUnavailable
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    # url, data and headers are functions of the build_context() dict.
+    name: str
+    url: object
+    # Most SQL queries one request may run, whatever the data size.
+    budget: int
+    method: str = 'get'
+    data: object = None
+    headers: object = None
+    cold_cache: bool = False
+    # Sent as the staff user instead of the regular one.
+    staff: bool = False
+
+
+def _seats_etag(ctx):
+    return {'HTTP_IF_NONE_MATCH': ctx['seats_etag']}
+
+
+def _free_seat(ctx):
+    row, seat = ctx['free_seats'].pop()
+    return {'row': row, 'seat': seat}
+
+
+ENDPOINTS = [
+    Endpoint('airport-list', lambda ctx: '/api/airports/', 2),
+    Endpoint(
+        'airport-detail',
+        lambda ctx: f'/api/airports/{ctx["airport"]}/',
+        1,
+    ),
+    Endpoint(
+        'airport-autocomplete',
+        lambda ctx: '/api/airports/autocomplete/?q=airp',
+        1,
+    ),
+    Endpoint('route-list', lambda ctx: '/api/routes/', 2),
+    Endpoint('route-detail', lambda ctx: f'/api/routes/{ctx["route"]}/', 1),
+    Endpoint('airplane-type-list', lambda ctx: '/api/airplane-types/', 2),
+    Endpoint('airplane-list', lambda ctx: '/api/airplanes/', 2),
+    Endpoint(
+        'airplane-detail',
+        lambda ctx: f'/api/airplanes/{ctx["airplane"]}/',
+        1,
+    ),
+    Endpoint(
+        'airplane-type-detail',
+        lambda ctx: f'/api/airplane-types/{ctx["airplane_type"]}/',
+        1,
+    ),
+    Endpoint('crew-list', lambda ctx: '/api/crews/', 2),
+    Endpoint('crew-detail', lambda ctx: f'/api/crews/{ctx["crew"]}/', 1),
+    Endpoint('schedule-list', lambda ctx: '/api/schedules/', 3),
+    Endpoint(
+        'schedule-detail',
+        lambda ctx: f'/api/schedules/{ctx["schedule"]}/',
+        2,
+    ),
+    Endpoint('flight-list', lambda ctx: '/api/flights/', 3),
+    Endpoint(
+        'flight-list-cursor',
+        lambda ctx: '/api/flights/?pagination=cursor',
+        2,
+    ),
+    Endpoint(
+        'flight-search',
+        lambda ctx: (
+            f'/api/flights/?source={ctx["source"]}'
+            f'&departure_after={ctx["departure_after"]}'
+        ),
+        3,
+    ),
+    Endpoint(
+        'flight-detail',
+        lambda ctx: f'/api/flights/{ctx["flight"]}/',
+        2,
+    ),
+    Endpoint(
+        'flight-seats-cold',
+        lambda ctx: f'/api/flights/{ctx["flight"]}/seats/',
+        1,
+        cold_cache=True,
+    ),
+    Endpoint(
+        'flight-seats-warm',
+        lambda ctx: f'/api/flights/{ctx["flight"]}/seats/',
+        0,
+    ),
+    Endpoint(
+        'flight-seats-compact',
+        lambda ctx: f'/api/flights/{ctx["flight"]}/seats/?layout=compact',
+        1,
+    ),
+    Endpoint(
+        'flight-seats-not-modified',
+        lambda ctx: f'/api/flights/{ctx["flight"]}/seats/',
+        0,
+        headers=_seats_etag,
+    ),
+    Endpoint('order-list', lambda ctx: '/api/orders/', 2),
+    Endpoint('order-detail', lambda ctx: f'/api/orders/{ctx["order"]}/', 1),
+    Endpoint('ticket-list', lambda ctx: '/api/tickets/', 2),
+    Endpoint(
+        'ticket-detail',
+        lambda ctx: f'/api/tickets/{ctx["ticket"]}/',
+        1,
+    ),
+    Endpoint(
+        'flight-conflicts',
+        lambda ctx: '/api/flights/conflicts/',
+        2,
+        staff=True,
+    ),
+    Endpoint('async-flight-list', lambda ctx: '/api/async/flights/', 2),
+    Endpoint(
+        'async-flight-detail',
+        lambda ctx: f'/api/async/flights/{ctx["flight"]}/',
+        2,
+    ),
+    Endpoint(
+        'async-flight-seats',
+        lambda ctx: f'/api/async/flights/{ctx["flight"]}/seats/',
+        1,
+        cold_cache=True,
+    ),
+    Endpoint('async-airport-list', lambda ctx: '/api/async/airports/', 1),
+    Endpoint(
+        'async-airport-detail',
+        lambda ctx: f'/api/async/airports/{ctx["airport"]}/',
+        1,
+    ),
+    Endpoint('async-route-list', lambda ctx: '/api/async/routes/', 1),
+    Endpoint(
+        'async-route-detail',
+        lambda ctx: f'/api/async/routes/{ctx["route"]}/',
+        1,
+    ),
+    Endpoint(
+        'ticket-export-csv',
+        lambda ctx: '/api/exports/tickets.csv',
+        1,
+        staff=True,
+    ),
+    Endpoint(
+        'order-export-ndjson',
+        lambda ctx: '/api/exports/orders.ndjson',
+        1,
+        staff=True,
+    ),
+    Endpoint(
+        'analytics-flights',
+        lambda ctx: '/api/analytics/flights/',
+        2,
+        staff=True,
+    ),
+    Endpoint(
+        'analytics-routes',
+        lambda ctx: '/api/analytics/routes/',
+        1,
+        staff=True,
+    ),
+    Endpoint(
+        'analytics-days',
+        lambda ctx: '/api/analytics/days/',
+        1,
+        staff=True,
+    ),
+    Endpoint(
+        'analytics-bookings',
+        lambda ctx: '/api/analytics/bookings/',
+        1,
+        staff=True,
+    ),
+    Endpoint(
+        'itinerary-search',
+        lambda ctx: (
+            f'/api/itineraries/?source={ctx["source"]}'
+            f'&destination={ctx["destination"]}&date={ctx["date"]}'
+        ),
+        3,
+    ),
+    Endpoint(
+        'flight-book',
+        lambda ctx: f'/api/flights/{ctx["book_flight"]}/book/',
+        12,
+        method='post',
+        data=_free_seat,
+    ),
+]
+
+BUDGETS = {endpoint.name: endpoint.budget for endpoint in ENDPOINTS}
+
+
+def build_context(user):
+    """
+    Ids and parameters the endpoint URLs are filled from. Also brings the
+    analytics rollups up to date and adds a staff user for the endpoints
+    that need one.
+    """
+    refresh_analytics(settle=timedelta(0))
+    staff, _ = get_user_model().objects.get_or_create(
+        username='benchmark-staff',
+        defaults={'is_staff': True},
+    )
+    flight = Flight.objects.order_by('id').select_related('route').first()
+    book_flight = (
+        Flight.objects.filter(seats_available__gt=0)
+        .select_related('airplane')
+        .order_by('-seats_available', 'id')
+        .first()
+    )
+    bitmap = book_flight.get_seat_bitmap()
+    route = flight.route
+    next_route = Route.objects.filter(source=route.destination_id).first()
+    ctx = {
+        'user': user,
+        'airport': Airport.objects.values_list('pk', flat=True).first(),
+        'route': route.pk,
+        'staff': staff,
+        'airplane': Airplane.objects.values_list('pk', flat=True).first(),
+        'airplane_type': (
+            AirplaneType.objects.values_list('pk', flat=True).first()
+        ),
+        'crew': Crew.objects.values_list('pk', flat=True).first(),
+        'schedule': (
+            FlightSchedule.objects.values_list('pk', flat=True).first()
+        ),
+        'flight': flight.pk,
+        'order': Order.objects.values_list('pk', flat=True).first(),
+        'ticket': Ticket.objects.values_list('pk', flat=True).first(),
+        'source': route.source_id,
+        'destination': (
+            next_route.destination_id if next_route
+            else route.destination_id
+        ),
+        'date': timezone.localdate(flight.departure_time).isoformat(),
+        'departure_after': flight.departure_time.strftime(
+            '%Y-%m-%dT%H:%MZ'
+        ),
+        'book_flight': book_flight.pk,
+        'free_seats': [
+            (row, seat)
+            for row in range(1, bitmap.rows + 1)
+            for seat in range(1, bitmap.seats_in_row + 1)
+            if not bitmap.is_taken(row, seat)
+        ],
+    }
+    response = APIClient().get(f'/api/flights/{flight.pk}/seats/')
+    ctx['seats_etag'] = response['ETag']
+    return ctx
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(endpoint, ctx, repeat):
+    client = APIClient()
+    client.force_authenticate(ctx['staff' if endpoint.staff else 'user'])
+    seat_map_cache = caches[settings.SEAT_MAP_CACHE_ALIAS]
+    timings, queries, statuses, size = [], [], set(), 0
+    for _ in range(repeat):
+        if endpoint.method == 'post' and not ctx['free_seats']:
+            break
+        if endpoint.cold_cache:
+            seat_map_cache.clear()
+        kwargs = endpoint.headers(ctx) if endpoint.headers else {}
+        if endpoint.data:
+            kwargs['data'] = endpoint.data(ctx)
+        request = getattr(client, endpoint.method)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = request(endpoint.url(ctx), **kwargs)
+            # Exports run their queries while the body streams.
+            body = (
+                b''.join(response.streaming_content) if response.streaming
+                else response.content
+            )
+            timings.append(time.perf_counter() - start)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+        size = len(body)
+    if not timings:
+        return None
+    return {
+        'requests': len(timings),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'p50_ms': round(_percentile(timings, 0.5) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 0.95) * 1000, 3),
+        'queries': max(queries),
+        'budget': endpoint.budget,
+        'over_budget': max(queries) > endpoint.budget,
+        'statuses': sorted(statuses),
+        'bytes': size,
+    }
+
+
+def measure_endpoints(ctx, repeat, endpoints=ENDPOINTS):
+    return {
+        endpoint.name: measure(endpoint, ctx, repeat)
+        for endpoint in endpoints
+    }
+
+
+def booking_storm(flight_id, threads=8, attempts=50, seed=0):
+    """
+    Book random seats of one flight from `threads` threads at once and
+    check afterwards that no seat was sold twice and the counters agree.
+    """
+    flight = Flight.objects.select_related('airplane').get(pk=flight_id)
+    places = [
+        (row, seat)
+        for row in range(1, flight.airplane.rows + 1)
+        for seat in range(1, flight.airplane.seats_in_row + 1)
+    ]
+    users = list(get_user_model().objects.order_by('id')[:threads])
+    lock = threading.Lock()
+    results = {'booked': 0, 'conflicts': 0, 'errors': 0, 'latencies': []}
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        user = users[index % len(users)]
+        barrier.wait()
+        try:
+            for _ in range(attempts):
+                seat = rng.choice(places)
+                start = time.perf_counter()
+                try:
+                    occupancy.book_seats(flight_id, user, [seat])
+                    outcome = 'booked'
+                except SeatUnavailable:
+                    outcome = 'conflicts'
+                except DatabaseError:
+                    outcome = 'errors'
+                elapsed = time.perf_counter() - start
+                with lock:
+                    results[outcome] += 1
+                    results['latencies'].append(elapsed)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=worker, args=(index,))
+        for index in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    flight.refresh_from_db()
+    tickets = flight.tickets.count()
+    distinct = flight.tickets.values('row', 'seat').distinct().count()
+    latencies = results.pop('latencies')
+    return {
+        **results,
+        'threads': threads,
+        'attempts': threads * attempts,
+        'seconds': round(elapsed, 3),
+        'bookings_per_second': round(results['booked'] / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 0.5) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+        'consistent': (
+            tickets == distinct
+            and flight.seats_sold == tickets
+            and flight.get_seat_bitmap().taken_count() == tickets
+        ),
+    }
+
+
+CONNECTION_MODES = ('per_request', 'persistent', 'pooled')
+
+
+def _connection_rounds(acquire, requests, threads):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(rounds):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            with acquire() as conn:
+                conn.execute('SELECT 1')
+            timings.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(timings)
+
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=worker, args=(requests // threads,))
+        for _ in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(_percentile(latencies, 0.5) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+    }
+
+
+def connection_benchmark(alias='default', requests=500, threads=4,
+                         modes=CONNECTION_MODES):
+    """
+    What a request pays to get a PostgreSQL connection, run one query and
+    let go of it: a new connection each time (CONN_MAX_AGE=0 without a
+    pool), one kept per thread (CONN_MAX_AGE>0), or a psycopg_pool pool.
+    """
+    import psycopg
+    from psycopg_pool import ConnectionPool
+
+    params = {
+        **connections[alias].get_connection_params(),
+        'autocommit': True,
+    }
+    results = {}
+    if 'per_request' in modes:
+        results['per_request'] = _connection_rounds(
+            lambda: psycopg.connect(**params),
+            requests,
+            threads,
+        )
+    if 'persistent' in modes:
+        local = threading.local()
+        opened = []
+
+        def persistent():
+            if not hasattr(local, 'conn'):
+                local.conn = psycopg.connect(**params)
+                opened.append(local.conn)
+            return nullcontext(local.conn)
+
+        try:
+            results['persistent'] = _connection_rounds(
+                persistent,
+                requests,
+                threads,
+            )
+        finally:
+            for conn in opened:
+                conn.close()
+    if 'pooled' in modes:
+        with ConnectionPool(
+            kwargs=params,
+            min_size=threads,
+            max_size=threads,
+            check=ConnectionPool.check_connection,
+        ) as pool:
+            pool.wait()
+            results['pooled'] = _connection_rounds(
+                pool.connection,
+                requests,
+                threads,
+            )
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'started_at': timezone.now().isoformat(),
+    }
+
+
+def compare(baseline, current, tolerance):
+    """
+    Per endpoint and size, p50 of `current` against `baseline`. Returns a
+    list of (size, endpoint, old_ms, new_ms, ratio, regressed).
+    """
+    old = {
+        (run['flights'], name): result
+        for run in baseline['runs']
+        for name, result in run['endpoints'].items()
+        if result
+    }
+    rows = []
+    for run in current['runs']:
+        for name, result in run['endpoints'].items():
+            before = old.get((run['flights'], name))
+            if not result or not before:
+                continue
+            ratio = result['p50_ms'] / max(before['p50_ms'], 1e-6)
+            rows.append((
+                run['flights'],
+                name,
+                before['p50_ms'],
+                result['p50_ms'],
+                round(ratio, 2),
+                ratio > tolerance or result['queries'] > before['queries'],
+            ))
+    return rows
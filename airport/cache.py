@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+
+
+def _cache():
+    return caches[settings.SEAT_MAP_CACHE_ALIAS]
+
+
+def _version_key(flight_id):
+    return f'seatmap:{flight_id}:version'
+
+
+def _payload_key(flight_id, version, layout):
+    return f'seatmap:{flight_id}:{version}:{layout}'
+
+
+def etag_for(flight_id, version):
+    return f'"{flight_id}-{version}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+def get_version(flight_id):
+    return _cache().get(_version_key(flight_id))
+
+
+def remember_version(flight_id, version):
+    # add() so a reader that saw an older row never overwrites a version
+    # published by a writer that committed in the meantime.
+    _cache().add(
+        _version_key(flight_id),
+        version,
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
+
+
+def publish_version(flight_id, version):
+    _cache().set(
+        _version_key(flight_id),
+        version,
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
+
+
+def forget_flight(flight_id):
+    # Payloads are only found through the version, so they simply expire.
+    _cache().delete(_version_key(flight_id))
+
+
+def get_payload(flight_id, version, layout):
+    return _cache().get(_payload_key(flight_id, version, layout))
+
+
+def set_payload(flight_id, version, layout, payload):
+    _cache().set(
+        _payload_key(flight_id, version, layout),
+        payload,
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
+
+
+async def aget_version(flight_id):
+    return await _cache().aget(_version_key(flight_id))
+
+
+async def aremember_version(flight_id, version):
+    await _cache().aadd(
+        _version_key(flight_id),
+        version,
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
+
+
+async def aget_payload(flight_id, version, layout):
+    return await _cache().aget(_payload_key(flight_id, version, layout))
+
+
+async def aset_payload(flight_id, version, layout, payload):
+    await _cache().aset(
+        _payload_key(flight_id, version, layout),
+        payload,
+        settings.SEAT_MAP_CACHE_TIMEOUT,
+    )
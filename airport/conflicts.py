@@ -0,0 +1,174 @@
+import heapq
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import groupby
+
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import Airplane, Crew, Flight
+
+# resource kind -> (model, Flight lookup to it)
+RESOURCES = {
+    'airplane': (Airplane, 'airplane'),
+    'crew': (Crew, 'crews'),
+}
+
+
+def booked_flights(kind, ids, start, end, exclude=None):
+    """
+    (flight id, resource id, departure, arrival) of the flights of the
+    given airplanes or crew members that overlap [start, end).
+
+    Indexed on both ends: the flights departing inside the window, plus
+    each resource's last flight departing before it, which is the only
+    earlier one that can still be in the air when the resource's schedule
+    has no overlaps of its own. Validation keeps it that way (and the
+    exclusion constraint does on PostgreSQL); conflict_report() finds
+    overlaps that predate both.
+    """
+    model, lookup = RESOURCES[kind]
+    ids = list(ids)
+    flights = Flight.objects.all()
+    if exclude is not None:
+        flights = flights.exclude(pk=exclude)
+    previous = Subquery(
+        flights.filter(**{lookup: OuterRef('pk')}, departure_time__lt=start)
+        .order_by('-departure_time')
+        .values('pk')[:1]
+    )
+    rows = (
+        flights.filter(
+            Q(
+                **{f'{lookup}__in': ids},
+                departure_time__gte=start,
+                departure_time__lt=end,
+            )
+            | Q(
+                pk__in=model.objects.filter(pk__in=ids)
+                .annotate(previous=previous)
+                .values('previous')
+            ),
+            arrival_time__gt=start,
+        )
+        .values_list('pk', lookup, 'departure_time', 'arrival_time')
+        .order_by(lookup, 'departure_time')
+    )
+    # A previous flight joins all of its crew, not only the requested.
+    wanted = set(ids)
+    return [row for row in rows if row[1] in wanted]
+
+
+def find_conflicts(departure, arrival, airplane=None, crews=(),
+                   exclude=None):
+    """
+    Flights that would share an airplane or a crew member with a flight
+    from `departure` to `arrival`, as (kind, resource id, flight id).
+    """
+    conflicts = []
+    if airplane is not None:
+        conflicts.extend(
+            ('airplane', resource, flight)
+            for flight, resource, _, _ in booked_flights(
+                'airplane', [airplane], departure, arrival, exclude,
+            )
+        )
+    if crews:
+        conflicts.extend(
+            ('crew', resource, flight)
+            for flight, resource, _, _ in booked_flights(
+                'crew', crews, departure, arrival, exclude,
+            )
+        )
+    return conflicts
+
+
+def without_overlaps(kind, flights, resources):
+    """
+    The unsaved `flights` whose airplane or crew members, as listed by
+    `resources(flight)`, are free for the whole flight: neither booked in
+    the database nor taken by an earlier flight of the batch.
+    """
+    if not flights:
+        return flights
+    booked = defaultdict(list)
+    for _, resource, departure, arrival in booked_flights(
+        kind,
+        {resource for flight in flights for resource in resources(flight)},
+        min(flight.departure_time for flight in flights),
+        max(flight.arrival_time for flight in flights),
+    ):
+        booked[resource].append((arrival, departure))
+    arrivals = {}
+    for resource, existing in booked.items():
+        existing.sort()
+        arrivals[resource] = [arrival for arrival, _ in existing]
+
+    def busy(resource, flight):
+        # The first existing flight still in the air at departure.
+        existing = booked.get(resource, ())
+        index = bisect_right(arrivals.get(resource, ()), flight.departure_time)
+        if index < len(existing) and existing[index][1] < flight.arrival_time:
+            return True
+        until = busy_until.get(resource)
+        return until is not None and flight.departure_time < until
+
+    accepted = []
+    busy_until = {}
+    for flight in sorted(flights, key=lambda f: f.departure_time):
+        taken = resources(flight)
+        if any(busy(resource, flight) for resource in taken):
+            continue
+        accepted.append(flight)
+        for resource in taken:
+            busy_until[resource] = max(
+                busy_until.get(resource, flight.arrival_time),
+                flight.arrival_time,
+            )
+    return accepted
+
+
+def _sweep(kind, rows):
+    # rows: (resource, flight, departure, arrival), sorted by resource and
+    # departure. Intervals still in the air are kept in a heap by arrival.
+    for resource, flights in groupby(rows, key=lambda row: row[0]):
+        active = []
+        for _, flight, departure, arrival in flights:
+            while active and active[0][0] <= departure:
+                heapq.heappop(active)
+            for other_arrival, other in active:
+                yield {
+                    'kind': kind,
+                    'resource': resource,
+                    'flights': [other, flight],
+                    'start': departure,
+                    'end': min(arrival, other_arrival),
+                }
+            heapq.heappush(active, (arrival, flight))
+
+
+def conflict_report(kinds=tuple(RESOURCES)):
+    """
+    Every pair of flights sharing an airplane or a crew member at the same
+    time, from one ordered scan per kind.
+    """
+    if 'airplane' in kinds:
+        yield from _sweep('airplane', (
+            Flight.objects.order_by('airplane', 'departure_time', 'pk')
+            .values_list('airplane', 'pk', 'departure_time', 'arrival_time')
+            .iterator(chunk_size=5000)
+        ))
+    if 'crew' in kinds:
+        yield from _sweep('crew', (
+            Flight.crews.through.objects.order_by(
+                'crew',
+                'flight__departure_time',
+                'flight',
+            )
+            .values_list(
+                'crew',
+                'flight',
+                'flight__departure_time',
+                'flight__arrival_time',
+            )
+            .iterator(chunk_size=5000)
+        ))
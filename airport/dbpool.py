@@ -0,0 +1,61 @@
+import time
+
+from django.db import connections
+
+
+def _pool(connection):
+    # The PostgreSQL backend keeps its pools in a class-level dict and
+    # creates one on first access to `connection.pool`. Only look.
+    pools = getattr(connection, '_connection_pools', {})
+    return pools.get(connection.alias)
+
+
+def checkout_ms(pool):
+    """Time to borrow and return one connection right now."""
+    start = time.perf_counter()
+    with pool.connection():
+        pass
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def pool_stats(aliases=None, probe=True):
+    """
+    Per database alias (all, or `aliases`): whether this process has a
+    connection pool for it and, if so, the pool's size, idle connections,
+    waiting requests and checkout latency (the average wait since
+    start-up, plus a live probe of an open pool). Never creates a pool.
+    """
+    result = []
+    for alias in aliases or connections:
+        connection = connections[alias]
+        entry = {
+            'alias': alias,
+            'vendor': connection.vendor,
+            'pooled': False,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        }
+        pool = _pool(connection)
+        if pool is not None:
+            stats = pool.get_stats()
+            requests = stats.get('requests_num', 0)
+            waited = stats.get('requests_wait_ms', 0)
+            entry.update({
+                'pooled': True,
+                'min_size': stats['pool_min'],
+                'max_size': stats['pool_max'],
+                'size': stats['pool_size'],
+                'available': stats['pool_available'],
+                'waiting': stats['requests_waiting'],
+                'requests': requests,
+                'avg_checkout_ms': (
+                    round(waited / requests, 3) if requests else 0.0
+                ),
+                'checkout_errors': stats.get('requests_errors', 0),
+                'connections_lost': stats.get('connections_lost', 0),
+                'stats': stats,
+            })
+            if probe and not pool.closed:
+                entry['checkout_ms'] = checkout_ms(pool)
+        result.append(entry)
+    return result
@@ -0,0 +1,80 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+
+TICKET_COLUMNS = (
+    ('id', 'id'),
+    ('flight', 'flight_id'),
+    ('departure_time', 'flight__departure_time'),
+    ('order', 'order_id'),
+    ('user', 'order__user_id'),
+    ('row', 'row'),
+    ('seat', 'seat'),
+)
+
+ORDER_COLUMNS = (
+    ('id', 'id'),
+    ('user', 'user_id'),
+    ('username', 'user__username'),
+    ('created_at', 'created_at'),
+)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, columns):
+    return queryset.values_list(*(lookup for _, lookup in columns)).iterator(
+        chunk_size=CHUNK_SIZE,
+    )
+
+
+def _batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def encode_ndjson(rows, columns):
+    names = [name for name, _ in columns]
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def encode_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        ])
+
+
+ENCODERS = {
+    'ndjson': (encode_ndjson, 'application/x-ndjson'),
+    'csv': (encode_csv, 'text/csv'),
+}
+
+
+def stream_export(queryset, columns, fmt, filename):
+    encode, content_type = ENCODERS[fmt]
+    response = StreamingHttpResponse(
+        _batched(encode(_rows(queryset, columns), columns)),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{fmt}"'
+    )
+    return response
@@ -0,0 +1,144 @@
+import django_filters
+
+from .models import (
+    DailyBookings,
+    Flight,
+    FlightLoad,
+    Order,
+    Route,
+    RouteDayLoad,
+    Ticket,
+)
+
+
+class FlightFilter(django_filters.FilterSet):
+    departure_after = django_filters.IsoDateTimeFilter(
+        field_name='departure_time',
+        lookup_expr='gte',
+    )
+    departure_before = django_filters.IsoDateTimeFilter(
+        field_name='departure_time',
+        lookup_expr='lt',
+    )
+    source = django_filters.NumberFilter(field_name='route__source')
+    destination = django_filters.NumberFilter(
+        field_name='route__destination',
+    )
+    available_gte = django_filters.NumberFilter(
+        field_name='seats_available',
+        lookup_expr='gte',
+    )
+    available_lte = django_filters.NumberFilter(
+        field_name='seats_available',
+        lookup_expr='lte',
+    )
+
+    range_filters = ('departure_after', 'departure_before')
+
+    class Meta:
+        model = Flight
+        fields = [
+            'route',
+            'airplane',
+            'crews',
+            'departure_time',
+            'arrival_time',
+        ]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Walk (route, departure_time, id) / (departure_time, id) in index
+        # order unless the client asked for another ordering.
+        ranged = any(
+            self.form.cleaned_data.get(name) for name in self.range_filters
+        )
+        if ranged and 'ordering' not in self.data:
+            queryset = queryset.order_by('departure_time', 'id')
+        return queryset
+
+
+class AsyncFlightFilter(FlightFilter):
+    """
+    FlightFilter without model choice fields, whose validation would query
+    the database synchronously.
+    """
+
+    route = django_filters.NumberFilter()
+    airplane = django_filters.NumberFilter()
+    crews = django_filters.NumberFilter()
+
+
+class AsyncRouteFilter(django_filters.FilterSet):
+    source = django_filters.NumberFilter()
+    destination = django_filters.NumberFilter()
+
+    class Meta:
+        model = Route
+        fields = ['source', 'destination']
+
+
+class TicketExportFilter(django_filters.FilterSet):
+    departure_after = django_filters.IsoDateTimeFilter(
+        field_name='flight__departure_time',
+        lookup_expr='gte',
+    )
+    departure_before = django_filters.IsoDateTimeFilter(
+        field_name='flight__departure_time',
+        lookup_expr='lt',
+    )
+
+    class Meta:
+        model = Ticket
+        fields = ['flight']
+
+
+class OrderExportFilter(django_filters.FilterSet):
+    created_after = django_filters.IsoDateTimeFilter(
+        field_name='created_at',
+        lookup_expr='gte',
+    )
+    created_before = django_filters.IsoDateTimeFilter(
+        field_name='created_at',
+        lookup_expr='lt',
+    )
+
+    class Meta:
+        model = Order
+        fields = ['user']
+
+
+class RouteDayLoadFilter(django_filters.FilterSet):
+    date_after = django_filters.DateFilter(
+        field_name='day',
+        lookup_expr='gte',
+    )
+    date_before = django_filters.DateFilter(
+        field_name='day',
+        lookup_expr='lte',
+    )
+    route = django_filters.NumberFilter()
+
+    class Meta:
+        model = RouteDayLoad
+        fields = ['route']
+
+
+class FlightLoadFilter(RouteDayLoadFilter):
+    class Meta:
+        model = FlightLoad
+        fields = ['route']
+
+
+class DailyBookingsFilter(django_filters.FilterSet):
+    date_after = django_filters.DateFilter(
+        field_name='day',
+        lookup_expr='gte',
+    )
+    date_before = django_filters.DateFilter(
+        field_name='day',
+        lookup_expr='lte',
+    )
+
+    class Meta:
+        model = DailyBookings
+        fields = []
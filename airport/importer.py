@@ -0,0 +1,266 @@
+import csv
+import json
+import time
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .conflicts import without_overlaps
+from .itineraries import route_graph
+from .models import Airplane, AirplaneType, Airport, Flight, Route
+from .search import airport_index
+from .seatmap import SeatBitmap
+
+RECORD_TYPES = ('airport', 'airplane_type', 'airplane', 'route', 'flight')
+
+# Stands in for an NDJSON line that is not a JSON object.
+MALFORMED = 'malformed'
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        for record in csv.DictReader(stream):
+            yield {k: v for k, v in record.items() if v not in (None, '')}
+    else:
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                record = {'type': MALFORMED, 'line': number}
+            yield record
+
+
+def _aware(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ImportRowError(f'invalid datetime: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ScheduleImporter:
+    """
+    Loads airports, airplane types, airplanes, routes and flights from a
+    stream of records. Foreign keys are resolved through in-memory maps
+    loaded once up front, and rows are written in batches; flights go
+    through COPY on PostgreSQL.
+    """
+
+    def __init__(self, batch_size=5000, use_copy=None, log=None):
+        self.batch_size = batch_size
+        if use_copy is None:
+            use_copy = connection.vendor == 'postgresql'
+        self.use_copy = use_copy
+        self.log = log or (lambda message: None)
+        self.buffers = {kind: [] for kind in RECORD_TYPES}
+        self.created = Counter()
+        self.skipped = Counter()
+        self.started = None
+
+        self.airports = dict(
+            Airport.objects.order_by('-id').values_list('name', 'id')
+        )
+        self.airplane_types = dict(
+            AirplaneType.objects.values_list('name', 'id')
+        )
+        self.airplanes = {
+            name: (pk, rows, seats)
+            for pk, name, rows, seats in Airplane.objects.values_list(
+                'id', 'name', 'rows', 'seats_in_row',
+            )
+        }
+        self.routes = {
+            (src, dst): pk
+            for pk, src, dst in Route.objects.values_list(
+                'id', 'source_id', 'destination_id',
+            )
+        }
+
+    def run(self, records):
+        self.started = time.perf_counter()
+        pending = 0
+        for record in records:
+            kind = record.get('type')
+            if kind == MALFORMED:
+                self.log(f'line {record["line"]}: not a JSON object, skipped')
+            if kind not in self.buffers:
+                self.skipped[kind or 'unknown'] += 1
+                continue
+            self.buffers[kind].append(record)
+            pending += 1
+            if pending >= self.batch_size:
+                self.flush()
+                pending = 0
+        self.flush()
+        return self.created, self.skipped
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return sum(self.created.values()) / elapsed if elapsed else 0.0
+
+    def flush(self):
+        # Dependency order: everything a flight points at is written first.
+        with transaction.atomic():
+            for kind in RECORD_TYPES:
+                records, self.buffers[kind] = self.buffers[kind], []
+                if records:
+                    getattr(self, f'_write_{kind}s')(records)
+                    # bulk_create skips the post_save handlers that
+                    # refresh these indexes.
+                    if kind == 'airport':
+                        transaction.on_commit(airport_index.invalidate)
+                    elif kind == 'route':
+                        transaction.on_commit(route_graph.invalidate)
+        self.log(
+            f'{sum(self.created.values())} rows written '
+            f'({self.rows_per_second:.0f} rows/s)'
+        )
+
+    def _resolve(self, records, resolve):
+        for record in records:
+            try:
+                yield resolve(record)
+            except (ImportRowError, KeyError, TypeError, ValueError):
+                self.skipped[record['type']] += 1
+
+    def _write_airports(self, records):
+        def resolve(record):
+            return Airport(
+                name=record['name'],
+                closest_big_city=record.get('closest_big_city', ''),
+            )
+
+        new = {}
+        for airport in self._resolve(records, resolve):
+            if airport.name not in self.airports:
+                new.setdefault(airport.name, airport)
+        for airport in Airport.objects.bulk_create(new.values()):
+            self.airports[airport.name] = airport.id
+        self.created['airport'] += len(new)
+
+    def _write_airplane_types(self, records):
+        def resolve(record):
+            return AirplaneType(name=record['name'])
+
+        new = {}
+        for airplane_type in self._resolve(records, resolve):
+            if airplane_type.name not in self.airplane_types:
+                new.setdefault(airplane_type.name, airplane_type)
+        for airplane_type in AirplaneType.objects.bulk_create(new.values()):
+            self.airplane_types[airplane_type.name] = airplane_type.id
+        self.created['airplane_type'] += len(new)
+
+    def _write_airplanes(self, records):
+        def resolve(record):
+            return Airplane(
+                name=record['name'],
+                rows=int(record['rows']),
+                seats_in_row=int(record['seats_in_row']),
+                airplane_type_id=self.airplane_types[record['airplane_type']],
+            )
+
+        new = {}
+        for airplane in self._resolve(records, resolve):
+            if airplane.name not in self.airplanes:
+                new.setdefault(airplane.name, airplane)
+        for airplane in Airplane.objects.bulk_create(new.values()):
+            self.airplanes[airplane.name] = (
+                airplane.id,
+                airplane.rows,
+                airplane.seats_in_row,
+            )
+        self.created['airplane'] += len(new)
+
+    def _write_routes(self, records):
+        def resolve(record):
+            route = Route(
+                source_id=self.airports[record['source']],
+                destination_id=self.airports[record['destination']],
+                distance=int(record['distance']),
+            )
+            if route.source_id == route.destination_id:
+                raise ImportRowError('source must differ from destination')
+            return route
+
+        new = {}
+        for route in self._resolve(records, resolve):
+            key = (route.source_id, route.destination_id)
+            if key not in self.routes:
+                new.setdefault(key, route)
+        for route in Route.objects.bulk_create(new.values()):
+            self.routes[route.source_id, route.destination_id] = route.id
+        self.created['route'] += len(new)
+
+    def _resolve_flight(self, record):
+        route_id = self.routes[
+            self.airports[record['source']],
+            self.airports[record['destination']],
+        ]
+        airplane_id, rows, seats_in_row = self.airplanes[record['airplane']]
+        departure = _aware(record['departure_time'])
+        arrival = _aware(record['arrival_time'])
+        if not arrival > departure:
+            raise ImportRowError('arrival_time must be after departure_time')
+        return Flight(
+            route_id=route_id,
+            airplane_id=airplane_id,
+            departure_time=departure,
+            arrival_time=arrival,
+            seat_bitmap=SeatBitmap(rows, seats_in_row).to_bytes(),
+            seats_available=rows * seats_in_row,
+        )
+
+    def _write_flights(self, records):
+        # Skip flights whose airplane is already flying then, either in the
+        # database or earlier in the file.
+        resolved = list(self._resolve(records, self._resolve_flight))
+        flights = without_overlaps(
+            'airplane',
+            resolved,
+            lambda flight: [flight.airplane_id],
+        )
+        self.skipped['flight'] += len(resolved) - len(flights)
+        if self.use_copy:
+            self._copy_flights(flights)
+        else:
+            Flight.objects.bulk_create(flights, batch_size=self.batch_size)
+        self.created['flight'] += len(flights)
+
+    def _copy_flights(self, flights):
+        fields = [
+            Flight._meta.get_field(name)
+            for name in (
+                'route',
+                'airplane',
+                'departure_time',
+                'arrival_time',
+                'seat_bitmap',
+                'seat_version',
+                'seats_sold',
+                'seats_available',
+            )
+        ]
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        table = connection.ops.quote_name(Flight._meta.db_table)
+        with connection.cursor() as cursor:
+            with cursor.copy(
+                f'COPY {table} ({columns}) FROM STDIN'
+            ) as copy:
+                for flight in flights:
+                    copy.write_row([
+                        getattr(flight, field.attname) for field in fields
+                    ])
@@ -0,0 +1,54 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class InProcessIndex:
+    """
+    A lazily built, read-only structure kept in process memory.
+
+    `invalidate()` stores a fresh generation token in the default cache, so
+    every worker sharing that cache rebuilds once it next checks the token,
+    at most INDEX_GENERATION_CHECK_SECONDS later. The invalidating process
+    rebuilds straight away.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self._build = build
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = None
+        self._value = None
+
+    @property
+    def _key(self):
+        return f'index:{self.name}:generation'
+
+    def get(self):
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if (
+            checked_at is not None
+            and now - checked_at < settings.INDEX_GENERATION_CHECK_SECONDS
+        ):
+            return self._value
+        generation = cache.get_or_set(self._key, uuid.uuid4().hex, None)
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._value = self._build()
+                    self._generation = generation
+        self._checked_at = now
+        return self._value
+
+    def invalidate(self):
+        cache.set(self._key, uuid.uuid4().hex, None)
+        self.reset()
+
+    def reset(self):
+        """Check the generation token on the next `get()`."""
+        self._checked_at = None
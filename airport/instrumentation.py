@@ -0,0 +1,201 @@
+import functools
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+from .metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, registry
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('airport_request_timings', default=None)
+
+# Collapse IN (%s, %s, ...) so the same query over different ids counts
+# as one statement.
+_IN_LIST = re.compile(r'\((?:%s, )*%s\)')
+
+
+class RequestTimings:
+    """Per-request counters. Also the DB execute wrapper that fills them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.statements = Counter()
+        self.slow_queries = []
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db += elapsed
+            self.statements[_IN_LIST.sub('(...)', sql)] += 1
+            if elapsed * 1000 >= settings.INSTRUMENTATION_SLOW_QUERY_MS:
+                self.slow_queries.append((sql, elapsed))
+
+
+def _timed_serialization(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        timings = _current.get()
+        if timings is None or timings.serializing:
+            return method(self, *args, **kwargs)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timings.serialize += time.perf_counter() - start
+            timings.serializing = False
+    return wrapper
+
+
+def _record_query(execute, sql, params, many, context):
+    # Installed on every connection, so it also sees the queries that async
+    # views run on sync_to_async threads; the context var follows them.
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        # First, so that execute_wrapper() blocks still pop their own.
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def install():
+    """
+    Hook query timing into every DB connection and serializer timing into
+    DRF's is_valid() and .data. Both are no-ops outside sampled requests.
+    """
+    connection_created.connect(_install_query_recorder)
+    if getattr(BaseSerializer, '_timed', False):
+        return
+    BaseSerializer.is_valid = _timed_serialization(BaseSerializer.is_valid)
+    BaseSerializer.data = property(
+        _timed_serialization(BaseSerializer.data.fget),
+    )
+    BaseSerializer._timed = True
+
+
+def _log(event, **fields):
+    logger.warning(json.dumps({'event': event, **fields}, default=str))
+
+
+class InstrumentationMiddleware:
+    """
+    Counts every request in the metrics registry. For a sampled share of
+    requests (INSTRUMENTATION_SAMPLE_RATE) it also times the view, its SQL
+    and its serializers. It reports them in a Server-Timing header and logs
+    slow requests, slow queries and repeated statements as JSON. Sits last
+    in MIDDLEWARE, so "view" covers the view and nothing around it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings, token = self.begin()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        self.end(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = self.begin()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        self.end(request, response, timings, time.perf_counter() - start)
+        return response
+
+    def begin(self):
+        if not self.sampled():
+            return None, None
+        timings = RequestTimings()
+        return timings, _current.set(timings)
+
+    def end(self, request, response, timings, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        HTTP_REQUESTS.inc(
+            view=view,
+            method=request.method,
+            status=response.status_code,
+        )
+        HTTP_REQUEST_SECONDS.observe(elapsed, view=view)
+        registry.flush()
+        if timings is not None:
+            self.report(request, response, timings, elapsed)
+
+    def sampled(self):
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate
+
+    def report(self, request, response, timings, elapsed):
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+            f'serialize;dur={timings.serialize * 1000:.1f}',
+            f'view;dur={elapsed * 1000:.1f}',
+        ])
+
+        match = request.resolver_match
+        context = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+        }
+        repeated = [
+            {'sql': sql, 'count': count}
+            for sql, count in timings.statements.most_common()
+            if count >= settings.INSTRUMENTATION_REPEATED_QUERY_THRESHOLD
+        ]
+        if repeated:
+            _log('repeated_queries', **context, queries=repeated)
+        for sql, seconds in timings.slow_queries:
+            _log(
+                'slow_query',
+                **context,
+                sql=sql,
+                ms=round(seconds * 1000, 1),
+            )
+        if elapsed * 1000 >= settings.INSTRUMENTATION_SLOW_REQUEST_MS:
+            _log(
+                'slow_request',
+                **context,
+                status=response.status_code,
+                ms=round(elapsed * 1000, 1),
+                db_ms=round(timings.db * 1000, 1),
+                queries=timings.queries,
+                serialize_ms=round(timings.serialize * 1000, 1),
+            )
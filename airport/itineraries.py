@@ -0,0 +1,177 @@
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .indexes import InProcessIndex
+from .models import Flight, Route
+
+
+@dataclass(frozen=True)
+class RouteGraph:
+    # source -> destination -> (route_id, distance), and the reverse.
+    outgoing: dict
+    incoming: dict
+
+    def paths(self, source, destination, max_legs):
+        """Yield route-id tuples of 1..max_legs legs, no airport repeated."""
+        direct = self.outgoing.get(source, {})
+        if destination in direct:
+            yield (direct[destination][0],)
+        if max_legs < 2:
+            return
+
+        into_destination = self.incoming.get(destination, {})
+        for hop, (first, _) in direct.items():
+            if hop != destination and hop in into_destination:
+                yield first, into_destination[hop][0]
+        if max_legs < 3:
+            return
+
+        for hop1, (first, _) in direct.items():
+            if hop1 == destination:
+                continue
+            onward = self.outgoing.get(hop1, {})
+            for hop2, (last, _) in into_destination.items():
+                if hop2 in (source, hop1) or hop2 not in onward:
+                    continue
+                yield first, onward[hop2][0], last
+
+
+def _build_route_graph():
+    outgoing = defaultdict(dict)
+    incoming = defaultdict(dict)
+    routes = Route.objects.values_list(
+        'id',
+        'source_id',
+        'destination_id',
+        'distance',
+    )
+    for route_id, source, destination, distance in routes:
+        outgoing[source][destination] = (route_id, distance)
+        incoming[destination][source] = (route_id, distance)
+    return RouteGraph(dict(outgoing), dict(incoming))
+
+
+route_graph = InProcessIndex('route-graph', _build_route_graph)
+
+
+def _day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def _flights_by_route(route_ids, departure_from, departure_to):
+    flights = (
+        Flight.objects.filter(
+            route_id__in=route_ids,
+            departure_time__gte=departure_from,
+            departure_time__lt=departure_to,
+        )
+        .select_related('route')
+        .defer('seat_bitmap')
+        .order_by('departure_time', 'id')
+    )
+    by_route = defaultdict(list)
+    for flight in flights:
+        by_route[flight.route_id].append(flight)
+    return by_route
+
+
+def search_itineraries(
+    source,
+    destination,
+    day,
+    max_legs=3,
+    min_layover=timedelta(minutes=45),
+    max_layover=timedelta(hours=6),
+    order_by='distance',
+    limit=20,
+):
+    paths = list(route_graph.get().paths(source, destination, max_legs))
+    if not paths:
+        return []
+
+    # One query per leg position: each leg's departure window is bounded
+    # by the arrivals of the flights that can feed it.
+    start, end = _day_bounds(day)
+    legs = [_flights_by_route({p[0] for p in paths}, start, end)]
+    for position in range(1, max(len(p) for p in paths)):
+        arrivals = [
+            f.arrival_time
+            for route_id in {p[position - 1] for p in paths
+                             if len(p) > position}
+            for f in legs[-1].get(route_id, ())
+        ]
+        if not arrivals:
+            break
+        legs.append(_flights_by_route(
+            {p[position] for p in paths if len(p) > position},
+            min(arrivals) + min_layover,
+            max(arrivals) + max_layover + timedelta(microseconds=1),
+        ))
+
+    departures = [
+        {
+            route_id: [f.departure_time for f in flights]
+            for route_id, flights in leg.items()
+        }
+        for leg in legs
+    ]
+
+    itineraries = []
+
+    def extend(path, chain):
+        position = len(chain)
+        if position == len(path):
+            itineraries.append(list(chain))
+            return
+        if position >= len(legs):
+            return
+        candidates = legs[position].get(path[position], ())
+        if not candidates:
+            # No flights on this route in the window.
+            return
+        if position == 0:
+            window = candidates
+        else:
+            arrival = chain[-1].arrival_time
+            times = departures[position][path[position]]
+            low = bisect_left(times, arrival + min_layover)
+            high = bisect_left(
+                times,
+                arrival + max_layover + timedelta(microseconds=1),
+            )
+            window = candidates[low:high]
+        for flight in window:
+            chain.append(flight)
+            extend(path, chain)
+            chain.pop()
+
+    for path in paths:
+        extend(path, [])
+
+    def duration(chain):
+        return chain[-1].arrival_time - chain[0].departure_time
+
+    def distance(chain):
+        return sum(f.route.distance for f in chain)
+
+    if order_by == 'duration':
+        itineraries.sort(key=lambda c: (duration(c), distance(c), len(c)))
+    else:
+        itineraries.sort(key=lambda c: (distance(c), duration(c), len(c)))
+
+    return [
+        {
+            'legs': chain,
+            'total_distance': distance(chain),
+            'total_duration': duration(chain),
+            'departure_time': chain[0].departure_time,
+            'arrival_time': chain[-1].arrival_time,
+        }
+        for chain in itineraries[:limit]
+    ]
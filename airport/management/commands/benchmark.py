@@ -0,0 +1,148 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from airport import benchmark
+from airport.synthetic import generate_dataset
+
+
+def _sizes(value):
+    try:
+        return [int(size) for size in value.split(',')]
+    except ValueError:
+        raise CommandError('--sizes takes comma-separated flight counts.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every list/detail endpoint, the seat map and booking against '
+        'synthetic data of several sizes, check per-endpoint SQL query '
+        'budgets and run a concurrent booking storm against one flight. '
+        'Runs in a throwaway test database and writes a JSON report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=_sizes,
+            default=[100, 1000],
+            help='Comma-separated flight counts (default 100,1000).',
+        )
+        parser.add_argument('--fill', type=float, default=0.5)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--storm-threads', type=int, default=8)
+        parser.add_argument('--storm-attempts', type=int, default=50)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument(
+            '--compare',
+            metavar='BASELINE',
+            help='An earlier report; exit non-zero on regressions.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1.25,
+            help='Allowed p50 slowdown against --compare (default 1.25).',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity=0,
+            interactive=False,
+            serialized_aliases=[],
+        )
+        try:
+            report = {
+                'environment': benchmark.environment(),
+                'runs': [self.run(size, options) for size in options['sizes']],
+            }
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f'Report written to {options["output"]}.')
+
+        failures = [
+            f'{run["flights"]} flights: {name} ran {result["queries"]} '
+            f'queries, budget {result["budget"]}'
+            for run in report['runs']
+            for name, result in run['endpoints'].items()
+            if result and result['over_budget']
+        ]
+        failures.extend(
+            f'{run["flights"]} flights: booking storm left inconsistent '
+            f'seats'
+            for run in report['runs']
+            if not run['storm']['consistent']
+        )
+        if baseline:
+            failures.extend(self.compare(baseline, report, options))
+        if failures:
+            raise CommandError('\n'.join(failures))
+
+    def run(self, size, options):
+        # Each size adds to the data of the previous one.
+        self.stdout.write(f'Generating {size} flights...')
+        dataset = generate_dataset(
+            flights=size,
+            fill=options['fill'],
+            prefix=f'B{size}',
+        )
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        ctx = benchmark.build_context(get_user_model().objects.first())
+        endpoints = benchmark.measure_endpoints(ctx, options['repeat'])
+        for name, result in endpoints.items():
+            if result:
+                self.stdout.write(
+                    f'{name:28} {result["p50_ms"]:9.2f} ms p50 '
+                    f'{result["p95_ms"]:9.2f} ms p95 '
+                    f'{result["queries"]:3} queries'
+                )
+        storm = benchmark.booking_storm(
+            ctx['book_flight'],
+            threads=options['storm_threads'],
+            attempts=options['storm_attempts'],
+        )
+        self.stdout.write(
+            f'Booking storm: {storm["booked"]} booked, {storm["conflicts"]} '
+            f'conflicts, {storm["errors"]} errors, '
+            f'{storm["bookings_per_second"]} bookings/s'
+        )
+        return {
+            'flights': size,
+            'dataset': dataset,
+            'endpoints': endpoints,
+            'storm': storm,
+        }
+
+    def compare(self, baseline, report, options):
+        failures = []
+        for size, name, old, new, ratio, regressed in benchmark.compare(
+            baseline,
+            report,
+            options['tolerance'],
+        ):
+            self.stdout.write(
+                f'{size:>7} {name:28} {old:9.2f} -> {new:9.2f} ms '
+                f'x{ratio}{"  REGRESSED" if regressed else ""}'
+            )
+            if regressed:
+                failures.append(f'{size} flights: {name} regressed x{ratio}')
+        return failures
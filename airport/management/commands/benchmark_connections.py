@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from airport.benchmark import (
+    CONNECTION_MODES,
+    connection_benchmark,
+    environment,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the latency of connect + SELECT 1 + release against '
+        'PostgreSQL with a connection per request, persistent connections '
+        'and a psycopg_pool pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument(
+            '--modes',
+            default=','.join(CONNECTION_MODES),
+            help=f'Comma-separated subset of {", ".join(CONNECTION_MODES)}.',
+        )
+        parser.add_argument('--output', help='Write the results as JSON.')
+
+    def handle(self, *args, **options):
+        if connections[options['database']].vendor != 'postgresql':
+            raise CommandError('benchmark_connections needs PostgreSQL.')
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(CONNECTION_MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}')
+
+        results = connection_benchmark(
+            options['database'],
+            requests=options['requests'],
+            threads=options['threads'],
+            modes=modes,
+        )
+        baseline = results.get('per_request')
+        for mode, result in results.items():
+            speedup = ''
+            if baseline and mode != 'per_request':
+                ratio = baseline['p50_ms'] / result['p50_ms']
+                speedup = f'  x{ratio:.1f} vs per_request'
+            self.stdout.write(
+                f'{mode:12} {result["p50_ms"]:8.2f} ms p50 '
+                f'{result["p95_ms"]:8.2f} ms p95 '
+                f'{result["requests_per_second"]:9.1f} req/s{speedup}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(
+                    {'environment': environment(), 'results': results},
+                    file,
+                    indent=2,
+                )
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.schedules import materialize_schedules
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the missing flights of every recurring schedule for the '
+        'next --days days. Safe to run repeatedly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90)
+
+    def handle(self, *args, **options):
+        until = timezone.localdate() + timedelta(days=options['days'])
+        created, skipped = materialize_schedules(until)
+        self.stdout.write(f'Created {created} flights up to {until}.')
+        if skipped:
+            self.stdout.write(
+                f'Skipped {skipped} flights whose airplane or crew is '
+                'already flying then.'
+            )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from airport.synthetic import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic airports, airplanes, flights and '
+        'tickets (seat bitmaps and counters included) for load testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flights', type=int, default=1000)
+        parser.add_argument(
+            '--fill',
+            type=float,
+            default=0.5,
+            help='Share of every cabin sold as tickets (default 0.5).',
+        )
+        parser.add_argument('--airports', type=int, default=50)
+        parser.add_argument('--rows', type=int, default=30)
+        parser.add_argument('--seats-in-row', type=int, default=6)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='SYN',
+            help='Name prefix; use a new one to add to existing data.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        generate_dataset(
+            flights=options['flights'],
+            fill=options['fill'],
+            airports=options['airports'],
+            rows=options['rows'],
+            seats_in_row=options['seats_in_row'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.importer import ScheduleImporter, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-load airports, airplane types, airplanes, routes and flights '
+        'from a CSV or NDJSON file. Every record has a "type" column.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            dest='fmt',
+            choices=['csv', 'ndjson'],
+            help='Defaults to the file extension.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create for flights even on PostgreSQL.',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['fmt'] or path.suffix.lstrip('.').lower()
+        if fmt not in ('csv', 'ndjson'):
+            raise CommandError('cannot tell the format, pass --format')
+
+        importer = ScheduleImporter(
+            batch_size=options['batch_size'],
+            use_copy=False if options['no_copy'] else None,
+            log=self.stdout.write,
+        )
+        with path.open(newline='', encoding='utf-8') as stream:
+            created, skipped = importer.run(read_records(stream, fmt))
+
+        for kind, count in sorted(created.items()):
+            self.stdout.write(f'{kind}: {count} created')
+        for kind, count in sorted(skipped.items()):
+            self.stdout.write(f'{kind}: {count} skipped')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {importer.rows_per_second:.0f} rows/s'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from airport.occupancy import reap_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Delete expired seat holds and free their seats.'
+
+    def handle(self, *args, **options):
+        reaped = reap_expired_holds()
+        self.stdout.write(f'Reaped {reaped} expired seat holds.')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from airport.models import Flight
+from airport.occupancy import lock_flight, reindex_flight
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare Flight.seats_sold/seats_available with the tickets table '
+        'and rebuild the seat index of flights that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report flights whose counters are off.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Flight.objects.annotate(tickets_count=Count('tickets'))
+            .filter(
+                ~Q(seats_sold=F('tickets_count'))
+                | ~Q(
+                    seats_available=(
+                        F('airplane__rows') * F('airplane__seats_in_row')
+                        - F('tickets_count')
+                    )
+                )
+            )
+            .values_list('pk', flat=True)
+            .order_by('pk')
+        )
+        fixed = 0
+        for flight_id in list(drifted):
+            self.stdout.write(f'Flight {flight_id}: counters out of sync')
+            if options['dry_run']:
+                continue
+            with transaction.atomic():
+                reindex_flight(lock_flight(flight_id))
+            fixed += 1
+        self.stdout.write(f'Reconciled {fixed} flights.')
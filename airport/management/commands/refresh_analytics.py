@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from airport.analytics import refresh_analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold flights changed since the last run and new orders into the '
+        'analytics rollups behind /api/analytics/. Run it periodically.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settle-seconds',
+            type=int,
+            default=60,
+            help='Leave orders younger than this for the next run.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        result = refresh_analytics(
+            settle=timedelta(seconds=options['settle_seconds']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f'{result["flights_updated"]} flights updated, '
+            f'{result["flights_removed"]} removed, '
+            f'{result["route_days"]} route days recomputed, '
+            f'{result["orders"]} orders added.'
+        )
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.occupancy import trim_seat_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete old seat change log entries. Clients asking for a delta '
+        'older than the remaining log get the full seat map.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Keep entries newer than this many hours (default 24).',
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options['hours'])
+        deleted = trim_seat_changes(before)
+        self.stdout.write(f'Deleted {deleted} seat change log entries.')
@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+
+class Registry:
+    """
+    Thread-safe in-process metrics. With METRICS_DIR set, each process
+    also writes its samples to <METRICS_DIR>/<pid>.json (at most every
+    METRICS_FLUSH_INTERVAL seconds) and exposition sums all of them, so
+    every worker's traffic shows up whichever one is scraped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.flushed_at = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return self
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {
+                    json.dumps(key): value
+                    for key, value in metric.samples.items()
+                }
+                for name, metric in self.metrics.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.samples.clear()
+
+    def flush(self, force=False):
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not directory or (
+            not force and now - self.flushed_at
+            < settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        self.flushed_at = now
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        tmp = path / f'.{os.getpid()}.json.tmp'
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path / f'{os.getpid()}.json')
+
+    def collect(self):
+        """Samples of this process, or of every process with METRICS_DIR."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return [self.snapshot()]
+        self.flush(force=True)
+        snapshots = []
+        for file in Path(directory).glob('*.json'):
+            try:
+                snapshots.append(json.loads(file.read_text()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        merged = {name: {} for name in self.metrics}
+        for snapshot in self.collect():
+            for name, samples in snapshot.items():
+                if name not in merged:
+                    continue
+                metric = self.metrics[name]
+                for key, value in samples.items():
+                    merged[name][key] = metric.merge(
+                        merged[name].get(key),
+                        value,
+                    )
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(merged[name].items()):
+                labels = dict(zip(metric.labelnames, json.loads(key)))
+                lines.extend(metric.expose(labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=registry):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+        self.registry = registry.register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def expose(self, labels, value):
+        yield f'{self.name}{_format_labels(labels)} {value}'
+
+
+class Histogram(Metric):
+    """Buckets are stored per bucket and made cumulative on exposition."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS, registry=registry):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0,
+                ]
+            sample[0][index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [
+            [a + b for a, b in zip(total[0], value[0])],
+            total[1] + value[1],
+            total[2] + value[2],
+        ]
+
+    def expose(self, labels, value):
+        counts, total, count = value
+        cumulative = 0
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for bound, bucket in zip(bounds, counts):
+            cumulative += bucket
+            yield (
+                f'{self.name}_bucket'
+                f'{_format_labels({**labels, "le": bound})} {cumulative}'
+            )
+        yield f'{self.name}_sum{_format_labels(labels)} {total}'
+        yield f'{self.name}_count{_format_labels(labels)} {count}'
+
+
+BOOKING_SECONDS = Histogram(
+    'airport_booking_seconds',
+    'Latency of seat booking operations.',
+    ['operation', 'outcome'],
+)
+SEAT_CONFLICTS = Counter(
+    'airport_seat_conflicts_total',
+    'Booking attempts rejected because a seat was already taken.',
+    ['flight'],
+)
+ORDERS_CREATED = Counter(
+    'airport_orders_created_total',
+    'Orders created.',
+)
+SEAT_MAP_REQUESTS = Counter(
+    'airport_seat_map_requests_total',
+    'Seat map requests by how they were served: not_modified and hit '
+    'come from the cache, miss reads the flight from the database.',
+    ['result'],
+)
+HTTP_REQUESTS = Counter(
+    'airport_http_requests_total',
+    'HTTP requests by view, method and status.',
+    ['view', 'method', 'status'],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'airport_http_request_seconds',
+    'Time spent in views.',
+    ['view'],
+)
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
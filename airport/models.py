@@ -1,7 +1,9 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import F, Q
 
+from .seatmap import SeatBitmap
+
 
 class Airport(models.Model):
     name = models.CharField(max_length=255)
@@ -60,6 +62,15 @@ class Airplane(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_layout = (
+            instance.__dict__.get('rows'),
+            instance.__dict__.get('seats_in_row'),
+        )
+        return instance
+
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
@@ -69,6 +80,57 @@ class Crew(models.Model):
         return f'{self.first_name} {self.last_name}'
 
 
+class FlightSchedule(models.Model):
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.PROTECT,
+        related_name='schedules',
+    )
+    airplane = models.ForeignKey(
+        Airplane,
+        on_delete=models.PROTECT,
+        related_name='schedules',
+    )
+    departure_time = models.TimeField(help_text='Local time in time_zone')
+    time_zone = models.CharField(max_length=64, default=settings.TIME_ZONE)
+    duration = models.DurationField()
+    weekdays = models.PositiveSmallIntegerField(
+        default=0b1111111,
+        help_text='Bit mask of operating days, bit 0 = Monday',
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    crews = models.ManyToManyField(
+        Crew,
+        related_name='schedules',
+        blank=True,
+    )
+    generated_until = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(valid_until__gte=F('valid_from')),
+                name='schedule_valid_until_after_from',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.route} {self.departure_time:%H:%M}'
+
+    def operates_on(self, day):
+        return bool(self.weekdays >> day.weekday() & 1)
+
+
+# Flight fields kept by the seat index (airport.occupancy).
+SEAT_INDEX_FIELDS = (
+    'seat_bitmap',
+    'seat_version',
+    'seats_sold',
+    'seats_available',
+)
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route,
@@ -83,6 +145,17 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crews = models.ManyToManyField(Crew, related_name='flights', blank=True)
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        related_name='flights',
+        null=True,
+        blank=True,
+    )
+    seat_bitmap = models.BinaryField(default=bytes, editable=False)
+    seat_version = models.PositiveBigIntegerField(default=0, editable=False)
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    seats_available = models.IntegerField(default=0, editable=False)
 
     class Meta:
         constraints = [
@@ -91,10 +164,123 @@ class Flight(models.Model):
                 name='flight_arrival_after_departure',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['route', 'departure_time', 'id'],
+                name='flight_route_departure_idx',
+            ),
+            models.Index(
+                fields=['departure_time', 'id'],
+                name='flight_departure_idx',
+            ),
+            models.Index(
+                fields=['airplane', 'departure_time'],
+                name='flight_airplane_departure_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Flight {self.id}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_airplane_id = instance.__dict__.get('airplane_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        loaded_airplane_id = getattr(self, '_loaded_airplane_id', None)
+        if (
+            loaded_airplane_id is not None
+            and loaded_airplane_id == self.airplane_id
+        ):
+            if update_fields is None and not kwargs.get('force_insert'):
+                # The seat index only changes under lock_flight(). Writing
+                # back the copy loaded with this instance would undo every
+                # booking made since.
+                deferred = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and field.name not in SEAT_INDEX_FIELDS
+                    and field.attname not in deferred
+                ]
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic(using=kwargs.get('using')):
+            self._seat_bitmap_rebuilt = self.pk is not None
+            if self._seat_bitmap_rebuilt:
+                # Continue from the stored version, not the loaded one, so
+                # the change log's versions keep increasing.
+                stored = (
+                    Flight.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('seat_version', flat=True)
+                    .first()
+                )
+                if stored is not None:
+                    self.seat_version = stored
+                self.seat_version += 1
+            self.reset_seat_index()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields,
+                    *SEAT_INDEX_FIELDS,
+                }
+            super().save(*args, **kwargs)
+        self._loaded_airplane_id = self.airplane_id
+
+    def reset_seat_index(self):
+        self.seat_bitmap = self.rebuild_seat_bitmap().to_bytes()
+        self.seats_sold = self.tickets.count() if self.pk is not None else 0
+        self.seats_available = (
+            self.airplane.rows * self.airplane.seats_in_row - self.seats_sold
+        )
+
+    def rebuild_seat_bitmap(self):
+        seats = ()
+        if self.pk is not None:
+            seats = self.tickets.values_list('row', 'seat').union(
+                self.holds.values_list('row', 'seat'),
+                all=True,
+            )
+        return SeatBitmap.from_seats(
+            self.airplane.rows,
+            self.airplane.seats_in_row,
+            seats,
+        )
+
+    def get_seat_bitmap(self):
+        try:
+            return SeatBitmap(
+                self.airplane.rows,
+                self.airplane.seats_in_row,
+                self.seat_bitmap,
+            )
+        except ValueError:
+            return self.rebuild_seat_bitmap()
+
+    async def aget_seat_bitmap(self):
+        try:
+            return SeatBitmap(
+                self.airplane.rows,
+                self.airplane.seats_in_row,
+                self.seat_bitmap,
+            )
+        except ValueError:
+            seats = self.tickets.values_list('row', 'seat').union(
+                self.holds.values_list('row', 'seat'),
+                all=True,
+            )
+            return SeatBitmap.from_seats(
+                self.airplane.rows,
+                self.airplane.seats_in_row,
+                [seat async for seat in seats],
+            )
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -106,6 +292,16 @@ class Order(models.Model):
 
     class Meta:
         db_table = 'orders'
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'],
+                name='orders_created_at_id_idx',
+            ),
+            models.Index(
+                fields=['user', 'created_at'],
+                name='orders_user_created_at_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Order {self.id}'
@@ -132,9 +328,166 @@ class Ticket(models.Model):
                 name='uniq_ticket_place_per_flight',
             ),
         ]
+        indexes = [
+            models.Index(fields=['flight', 'id'], name='ticket_flight_id_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_place = (
+            instance.__dict__.get('flight_id'),
+            instance.__dict__.get('row'),
+            instance.__dict__.get('seat'),
+        )
+        return instance
 
     def __str__(self):
         return (
             f'T{self.id} F{self.flight_id} '
             f'r{self.row}s{self.seat}'
         )
+
+
+class SeatHold(models.Model):
+    row = models.PositiveSmallIntegerField()
+    seat = models.PositiveSmallIntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name='holds',
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='seat_holds',
+    )
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['flight', 'row', 'seat'],
+                name='uniq_hold_place_per_flight',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='seat_hold_expires_idx'),
+        ]
+
+    def __str__(self):
+        return (
+            f'H{self.id} F{self.flight_id} '
+            f'r{self.row}s{self.seat}'
+        )
+
+
+class SeatChange(models.Model):
+    """
+    One row per seat_version of a flight: the places taken and released
+    by that change. A version without a row (a reindex, or a row trimmed
+    away) means deltas across it can't be answered from the log.
+    """
+
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name='seat_changes',
+    )
+    version = models.PositiveBigIntegerField()
+    taken = models.JSONField(default=list)
+    released = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['flight', 'version'],
+                name='uniq_seat_change_version',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='seat_change_created_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'F{self.flight_id} v{self.version}'
+
+
+class FlightLoad(models.Model):
+    """
+    Analytics rollup: a flight's seats as last folded into RouteDayLoad.
+    `flight_id` is not a foreign key, so rows of deleted flights stay
+    behind until refresh_analytics takes them out of their day.
+    """
+
+    flight_id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    day = models.DateField()
+    departure_time = models.DateTimeField()
+    capacity = models.PositiveIntegerField()
+    seats_sold = models.PositiveIntegerField()
+    seat_version = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['route', 'day'],
+                name='flight_load_route_day_idx',
+            ),
+            models.Index(fields=['day'], name='flight_load_day_idx'),
+        ]
+
+    @property
+    def load_factor(self):
+        if not self.capacity:
+            return 0.0
+        return round(self.seats_sold / self.capacity, 4)
+
+
+class RouteDayLoad(models.Model):
+    """Analytics rollup: seats flown on one route on one (local) day."""
+
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    day = models.DateField()
+    flights = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+    seats_sold = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['route', 'day'],
+                name='uniq_route_day_load',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='route_day_load_day_idx'),
+        ]
+
+
+class DailyBookings(models.Model):
+    """Analytics rollup: orders placed per (local) day, and their tickets."""
+
+    day = models.DateField(unique=True)
+    orders = models.PositiveIntegerField(default=0)
+    tickets = models.PositiveIntegerField(default=0)
+
+
+class AnalyticsWatermark(models.Model):
+    """How far refresh_analytics has read an append-only table."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
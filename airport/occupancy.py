@@ -0,0 +1,292 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .metrics import BOOKING_SECONDS, SEAT_CONFLICTS
+from .models import Flight, Order, SeatChange, SeatHold, Ticket
+from .seatmap import find_best_seats
+
+# Sent after commit with flight_id, version, taken and released seats.
+seats_changed = Signal()
+
+
+class NotEnoughSeats(Exception):
+    pass
+
+
+class NoActiveHolds(Exception):
+    pass
+
+
+class SeatUnavailable(Exception):
+    def __init__(self, seats):
+        super().__init__(seats)
+        self.seats = seats
+
+
+def lock_flight(flight_id):
+    return (
+        Flight.objects.select_related('airplane')
+        .select_for_update(of=('self',))
+        .get(pk=flight_id)
+    )
+
+
+def _notify(flight, taken=(), released=()):
+    flight_id, version = flight.pk, flight.seat_version
+    transaction.on_commit(lambda: seats_changed.send(
+        sender=Flight,
+        flight_id=flight_id,
+        version=version,
+        taken=taken,
+        released=released,
+    ))
+
+
+def save_seat_bitmap(flight, bitmap, taken=(), released=(), sold=0):
+    """
+    Persist a locked flight's bitmap, bump its seat version and move its
+    seat counters by `sold` tickets.
+    """
+    taken, released = list(taken), list(released)
+    flight.seat_bitmap = bitmap.to_bytes()
+    flight.seat_version += 1
+    flight.seats_sold += sold
+    flight.seats_available -= sold
+    Flight.objects.filter(pk=flight.pk).update(
+        seat_bitmap=flight.seat_bitmap,
+        seat_version=F('seat_version') + 1,
+        seats_sold=F('seats_sold') + sold,
+        seats_available=F('seats_available') - sold,
+    )
+    SeatChange.objects.create(
+        flight=flight,
+        version=flight.seat_version,
+        taken=taken,
+        released=released,
+    )
+    _notify(flight, taken, released)
+
+
+def reindex_flight(flight):
+    """Recompute a locked flight's bitmap and counters from its tickets."""
+    flight.reset_seat_index()
+    flight.seat_version += 1
+    Flight.objects.filter(pk=flight.pk).update(
+        seat_bitmap=flight.seat_bitmap,
+        seat_version=F('seat_version') + 1,
+        seats_sold=flight.seats_sold,
+        seats_available=flight.seats_available,
+    )
+    _notify(flight)
+
+
+def seat_changes_since(flight, since):
+    """
+    Net seat changes of a flight after version `since`, or None when the
+    log can't answer: it was trimmed, or the cabin was reindexed since.
+    """
+    if since > flight.seat_version:
+        return None
+    changes = list(
+        flight.seat_changes.filter(
+            version__gt=since,
+            version__lte=flight.seat_version,
+        )
+        .order_by('version')
+        .values_list('taken', 'released')
+    )
+    if len(changes) != flight.seat_version - since:
+        return None
+    places = {}
+    for taken, released in changes:
+        for row, seat in released:
+            places[row, seat] = False
+        for row, seat in taken:
+            places[row, seat] = True
+    return [
+        {'row': row, 'seat': seat, 'taken': is_taken}
+        for (row, seat), is_taken in sorted(places.items())
+    ]
+
+
+def trim_seat_changes(before):
+    deleted, _ = SeatChange.objects.filter(created_at__lt=before).delete()
+    return deleted
+
+
+def apply_seat_changes(flight, taken=(), released=(), sold=0):
+    """Write seat changes into a locked flight's occupancy bitmap."""
+    bitmap = flight.get_seat_bitmap()
+    for row, seat in released:
+        if bitmap.contains(row, seat):
+            bitmap.release(row, seat)
+    for row, seat in taken:
+        if bitmap.contains(row, seat):
+            bitmap.take(row, seat)
+    save_seat_bitmap(flight, bitmap, taken, released, sold)
+    return bitmap
+
+
+def _release_holds_locked(flight, holds):
+    # holds: (pk, row, seat). A seat that somehow also has a ticket keeps
+    # its bit; only the hold goes.
+    SeatHold.objects.filter(pk__in=[pk for pk, _, _ in holds]).delete()
+    places = {(row, seat) for _, row, seat in holds}
+    ticketed = set(
+        flight.tickets.filter(
+            row__in={row for row, _ in places},
+            seat__in={seat for _, seat in places},
+        ).values_list('row', 'seat')
+    )
+    apply_seat_changes(flight, released=sorted(places - ticketed))
+
+
+def _reap_expired_locked(flight, now=None):
+    expired = list(
+        flight.holds.filter(expires_at__lte=now or timezone.now())
+        .values_list('pk', 'row', 'seat')
+    )
+    if expired:
+        _release_holds_locked(flight, expired)
+    return len(expired)
+
+
+def reap_expired_holds(now=None):
+    now = now or timezone.now()
+    flight_ids = (
+        SeatHold.objects.filter(expires_at__lte=now)
+        .values_list('flight_id', flat=True)
+        .distinct()
+    )
+    reaped = 0
+    for flight_id in list(flight_ids):
+        with transaction.atomic():
+            reaped += _reap_expired_locked(lock_flight(flight_id), now)
+    return reaped
+
+
+def _lock_for_booking(flight_id, seats=()):
+    flight = lock_flight(flight_id)
+    _reap_expired_locked(flight)
+    bitmap = flight.get_seat_bitmap()
+    taken = [
+        (row, seat) for row, seat in seats
+        if bitmap.is_taken(row, seat)
+    ]
+    if taken:
+        raise SeatUnavailable(taken)
+    return flight
+
+
+@contextmanager
+def _measured(operation, flight_id):
+    outcome = 'error'
+    start = time.perf_counter()
+    try:
+        yield
+        outcome = 'ok'
+    except (SeatUnavailable, IntegrityError):
+        outcome = 'conflict'
+        SEAT_CONFLICTS.inc(flight=flight_id)
+        raise
+    except (NotEnoughSeats, NoActiveHolds):
+        outcome = 'rejected'
+        raise
+    finally:
+        BOOKING_SECONDS.observe(
+            time.perf_counter() - start,
+            operation=operation,
+            outcome=outcome,
+        )
+
+
+def _book_locked(flight, user, seats):
+    order = Order.objects.create(user=user)
+    tickets = Ticket.objects.bulk_create(
+        Ticket(flight=flight, order=order, row=row, seat=seat)
+        for row, seat in seats
+    )
+    apply_seat_changes(flight, taken=seats, sold=len(tickets))
+    return order, tickets
+
+
+def lock_free_place(flight_id, row, seat):
+    """
+    Lock a flight for a ticket written outside the booking functions,
+    raising SeatUnavailable if the place is sold or held.
+    """
+    return _lock_for_booking(flight_id, [(row, seat)])
+
+
+def book_seats(flight_id, user, seats):
+    with _measured('book', flight_id), transaction.atomic():
+        flight = _lock_for_booking(flight_id, seats)
+        return _book_locked(flight, user, seats)
+
+
+def assign_seats(flight_id, user, count):
+    with _measured('assign', flight_id), transaction.atomic():
+        flight = _lock_for_booking(flight_id)
+        seats = find_best_seats(flight.get_seat_bitmap(), count)
+        if seats is None:
+            raise NotEnoughSeats(count)
+        return _book_locked(flight, user, seats)
+
+
+def hold_seats(flight_id, user, seats):
+    expires_at = timezone.now() + settings.SEAT_HOLD_TTL
+    with _measured('hold', flight_id), transaction.atomic():
+        flight = _lock_for_booking(flight_id, seats)
+        holds = SeatHold.objects.bulk_create(
+            SeatHold(
+                flight=flight,
+                user=user,
+                row=row,
+                seat=seat,
+                expires_at=expires_at,
+            )
+            for row, seat in seats
+        )
+        apply_seat_changes(flight, taken=seats)
+    return holds
+
+
+def confirm_holds(flight_id, user):
+    with _measured('confirm_hold', flight_id), transaction.atomic():
+        flight = _lock_for_booking(flight_id)
+        holds = list(
+            flight.holds.filter(user=user)
+            .order_by('row', 'seat')
+            .values_list('pk', 'row', 'seat')
+        )
+        if not holds:
+            raise NoActiveHolds()
+        SeatHold.objects.filter(pk__in=[pk for pk, _, _ in holds]).delete()
+        order = Order.objects.create(user=user)
+        tickets = Ticket.objects.bulk_create(
+            Ticket(flight=flight, order=order, row=row, seat=seat)
+            for _, row, seat in holds
+        )
+        save_seat_bitmap(
+            flight,
+            flight.get_seat_bitmap(),
+            sold=len(tickets),
+        )
+    return order, tickets
+
+
+def release_holds(flight_id, user):
+    with transaction.atomic():
+        flight = lock_flight(flight_id)
+        holds = list(
+            flight.holds.filter(user=user).values_list('pk', 'row', 'seat')
+        )
+        if holds:
+            _release_holds_locked(flight, holds)
+    return len(holds)
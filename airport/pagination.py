@@ -0,0 +1,63 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = getattr(view, 'cursor_ordering', self.ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page numbers by default. Switches to keyset (cursor) pages, which need
+    no COUNT(*) and no OFFSET, when the request passes ?pagination=cursor or
+    a ?cursor= token, or when the view sets `pagination_mode = 'cursor'`.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_class = KeysetPagination
+
+    def use_cursor(self, request, view):
+        mode = request.query_params.get(self.mode_query_param)
+        if mode is None:
+            if self.cursor_class.cursor_query_param in request.query_params:
+                return True
+            mode = getattr(view, 'pagination_mode', 'page')
+        return mode == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = None
+        if self.use_cursor(request, view):
+            self.cursor = self.cursor_class()
+            page = self.cursor.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor is not None:
+            return self.cursor.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            *self.cursor_class().get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': (
+                    'page (default) or cursor. Cursor pages have no count '
+                    'and cost the same at any depth.'
+                ),
+                'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+            },
+        ]
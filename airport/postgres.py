@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import connections
+
+from .models import Airport, Flight
+
+AIRPLANE_OVERLAP_CONSTRAINT_NAME = 'flight_airplane_no_overlap'
+
+
+def _airport_trigram_indexes(schema_editor):
+    table = schema_editor.quote_name(Airport._meta.db_table)
+    name = schema_editor.quote_name('name')
+    city = schema_editor.quote_name('closest_big_city')
+    return [
+        f'CREATE INDEX IF NOT EXISTS airport_name_trgm_idx '
+        f'ON {table} USING gin ({name} gin_trgm_ops)',
+        f'CREATE INDEX IF NOT EXISTS airport_name_upper_trgm_idx '
+        f'ON {table} USING gin (UPPER({name}) gin_trgm_ops)',
+        f'CREATE INDEX IF NOT EXISTS airport_city_upper_trgm_idx '
+        f'ON {table} USING gin (UPPER({city}) gin_trgm_ops)',
+    ]
+
+
+def _airplane_overlap_constraint(schema_editor):
+    # tstzrange() is half-open, so back-to-back legs do not overlap.
+    table = schema_editor.quote_name(Flight._meta.db_table)
+    airplane = schema_editor.quote_name('airplane_id')
+    departure = schema_editor.quote_name('departure_time')
+    arrival = schema_editor.quote_name('arrival_time')
+    return (
+        f'DO $$ BEGIN '
+        f'IF NOT EXISTS (SELECT 1 FROM pg_constraint '
+        f"WHERE conname = '{AIRPLANE_OVERLAP_CONSTRAINT_NAME}') THEN "
+        f'ALTER TABLE {table} '
+        f'ADD CONSTRAINT {AIRPLANE_OVERLAP_CONSTRAINT_NAME} '
+        f'EXCLUDE USING gist ({airplane} WITH =, '
+        f'tstzrange({departure}, {arrival}) WITH &&); '
+        f'END IF; END $$'
+    )
+
+
+def violates_airplane_overlap(exc):
+    """Whether an IntegrityError comes from the airplane exclusion."""
+    diag = getattr(exc.__cause__, 'diag', None)
+    return (
+        getattr(diag, 'constraint_name', None)
+        == AIRPLANE_OVERLAP_CONSTRAINT_NAME
+    )
+
+
+def install_postgres_objects(using='default', **kwargs):
+    """
+    post_migrate hook for PostgreSQL-only objects that the other backends
+    cannot express, so they stay out of the model definitions.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    statements = []
+    with connection.schema_editor() as schema_editor:
+        if settings.AIRPORT_AUTOCOMPLETE_BACKEND == 'postgres':
+            statements.append('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            statements.extend(_airport_trigram_indexes(schema_editor))
+        if settings.AIRPLANE_OVERLAP_CONSTRAINT:
+            statements.append('CREATE EXTENSION IF NOT EXISTS btree_gist')
+            statements.append(_airplane_overlap_constraint(schema_editor))
+        for statement in statements:
+            schema_editor.execute(statement)
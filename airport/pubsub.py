@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    A bounded queue owned by one event loop. Publishers on any thread hand
+    messages over with call_soon_threadsafe. A subscriber that falls too
+    far behind gets its backlog replaced by a single None ("resync").
+    """
+
+    def __init__(self, maxsize):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The subscriber's loop is already closed.
+            pass
+
+    def _put(self, message):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = None
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+    """Fans messages out to the subscribers of this process only."""
+
+    queue_size = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers[channel]
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, message):
+        self.dispatch(channel, message)
+
+    def dispatch(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Publishes with NOTIFY so that every worker process sees every message.
+    Each process that has subscribers keeps one LISTEN connection open on a
+    daemon thread and fans what it hears out locally.
+    """
+
+    pg_channel = 'airport_events'
+    # NOTIFY payloads must stay under 8000 bytes.
+    max_payload = 7900
+
+    def __init__(self, using='default'):
+        super().__init__()
+        self.using = using
+        self._listener = None
+
+    def subscribe(self, channel):
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, message):
+        payload = json.dumps([channel, message])
+        if len(payload.encode()) > self.max_payload:
+            payload = json.dumps([channel, None])
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)',
+                [self.pg_channel, payload],
+            )
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen,
+                    name='airport-pubsub-listener',
+                    daemon=True,
+                )
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg
+
+        params = connections[self.using].get_connection_params()
+        while True:
+            try:
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f'LISTEN {self.pg_channel}')
+                    for notify in conn.notifies():
+                        self.dispatch(*json.loads(notify.payload))
+            except Exception:
+                logger.exception('Seat event listener failed, reconnecting')
+                time.sleep(1)
+
+
+BROKERS = {
+    'local': LocalBroker,
+    'postgres': PostgresBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = BROKERS[settings.SEAT_EVENTS_BROKER]()
+        return _broker
+
+
+def flight_channel(flight_id):
+    return f'flight:{flight_id}'
@@ -0,0 +1,112 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('airport_replica_reads', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRouter:
+    """
+    Reads go to a random DATABASE_REPLICAS alias only while
+    ReplicaMiddleware allows it for the current request, and never while
+    the primary has a transaction open in this thread. Everything else,
+    writes included, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or not _replica_reads.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def _pin_key(request):
+    # Writes need credentials, so whoever wrote sends the same header or
+    # session cookie on their next read. Checked before authentication.
+    credentials = (
+        request.headers.get('Authorization')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    digest = hashlib.sha256(credentials.encode()).hexdigest()[:32]
+    return f'db:pin:{digest}'
+
+
+class ReplicaMiddleware:
+    """
+    Lets safe requests read from replicas, except for clients that wrote
+    in the last DB_REPLICA_STICKY_SECONDS: those read from the primary so
+    that they see their own bookings despite replication lag. Pins live
+    in the default cache, which must be shared between workers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        key, token = self.begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _replica_reads.reset(token)
+        self.end(request, response, key)
+        return response
+
+    async def __acall__(self, request):
+        key, token = self.begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _replica_reads.reset(token)
+        self.end(request, response, key)
+        return response
+
+    def begin(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return None, None
+        key = _pin_key(request)
+        if request.method not in SAFE_METHODS:
+            return key, None
+        if key is not None and cache.get(key):
+            return None, None
+        return None, _replica_reads.set(True)
+
+    def end(self, request, response, key):
+        if key is not None and response.status_code < 400:
+            cache.set(key, True, settings.DB_REPLICA_STICKY_SECONDS)
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.utils import timezone
+
+from .conflicts import without_overlaps
+from .models import Flight, FlightSchedule
+
+
+def _departures(schedule, first_day, last_day):
+    tz = ZoneInfo(schedule.time_zone)
+    day = first_day
+    while day <= last_day:
+        if schedule.operates_on(day):
+            yield datetime.combine(day, schedule.departure_time, tzinfo=tz)
+        day += timedelta(days=1)
+
+
+def materialize_schedule(schedule, until, today=None):
+    """
+    Create the flights of one schedule up to `until` (inclusive) that do
+    not exist yet. Flights whose airplane or crew is already flying then
+    are skipped and retried on the next run. Returns the numbers of
+    flights created and skipped.
+    """
+    first_day = max(schedule.valid_from, today or timezone.localdate())
+    if schedule.generated_until is not None:
+        first_day = max(first_day, schedule.generated_until + timedelta(1))
+    last_day = min(schedule.valid_until, until)
+    if first_day > last_day:
+        return 0, 0
+
+    departures = list(_departures(schedule, first_day, last_day))
+    with transaction.atomic():
+        existing = set()
+        if departures:
+            existing = set(
+                schedule.flights.filter(
+                    departure_time__gte=departures[0],
+                    departure_time__lte=departures[-1],
+                ).values_list('departure_time', flat=True)
+            )
+        candidates = []
+        for departure in departures:
+            if departure in existing:
+                continue
+            flight = Flight(
+                route_id=schedule.route_id,
+                airplane=schedule.airplane,
+                schedule=schedule,
+                departure_time=departure,
+                arrival_time=departure + schedule.duration,
+            )
+            flight.reset_seat_index()
+            candidates.append(flight)
+
+        crew_ids = [crew.id for crew in schedule.crews.all()]
+        flights = without_overlaps(
+            'airplane',
+            candidates,
+            lambda flight: [flight.airplane_id],
+        )
+        flights = without_overlaps('crew', flights, lambda flight: crew_ids)
+        Flight.objects.bulk_create(flights, batch_size=1000)
+
+        Flight.crews.through.objects.bulk_create(
+            [
+                Flight.crews.through(flight_id=flight.id, crew_id=crew_id)
+                for flight in flights
+                for crew_id in crew_ids
+            ],
+            batch_size=1000,
+        )
+
+        # Stop before the first skipped day, so the next run retries it
+        # once the conflict is gone; days already generated are skipped.
+        accepted = set(map(id, flights))
+        skipped_days = [
+            flight.departure_time.date()
+            for flight in candidates
+            if id(flight) not in accepted
+        ]
+        if skipped_days:
+            last_day = min(skipped_days) - timedelta(days=1)
+        schedule.generated_until = last_day
+        FlightSchedule.objects.filter(pk=schedule.pk).update(
+            generated_until=last_day,
+        )
+    return len(flights), len(candidates) - len(flights)
+
+
+def materialize_schedules(until, today=None):
+    today = today or timezone.localdate()
+    schedules = (
+        FlightSchedule.objects.filter(
+            valid_until__gte=today,
+            valid_from__lte=until,
+        )
+        .exclude(generated_until__gte=until)
+        .select_related('airplane')
+        .prefetch_related('crews')
+        .order_by('id')
+    )
+    created = skipped = 0
+    for schedule in schedules:
+        added, overlapping = materialize_schedule(schedule, until, today)
+        created += added
+        skipped += overlapping
+    return created, skipped
@@ -0,0 +1,148 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Case, Q, When
+
+from .indexes import InProcessIndex
+from .models import Airport
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AirportSearchIndex:
+    """
+    Prefix index over every word of the airport name and city, plus a
+    trigram index used as a fuzzy fallback (infixes, typos) when no word
+    prefix matches.
+    """
+
+    max_cached_queries = 10000
+
+    def __init__(self, airports):
+        self.airports = airports
+        self.names = [normalize(name) for _, name, _ in airports]
+        tokens = []
+        self.trigrams = defaultdict(set)
+        for i, (_, name, city) in enumerate(airports):
+            for weight, text in ((0, name), (1, city)):
+                for word in _WORD.findall(normalize(text)):
+                    tokens.append((word, weight, i))
+            for gram in _trigrams(normalize(f'{name} {city}')):
+                self.trigrams[gram].add(i)
+        tokens.sort()
+        self.tokens = tokens
+        self.words = [word for word, _, _ in tokens]
+        # Keystroke queries repeat across users; the index is immutable.
+        self._results = {}
+
+    @classmethod
+    def build(cls):
+        return cls(list(
+            Airport.objects.order_by('id').values_list(
+                'id',
+                'name',
+                'closest_big_city',
+            )
+        ))
+
+    def _prefixed(self, prefix):
+        """Map airport index -> best weight among words starting with it."""
+        found = {}
+        start = bisect_left(self.words, prefix)
+        for word, weight, i in self.tokens[start:]:
+            if not word.startswith(prefix):
+                break
+            found[i] = min(weight, found.get(i, weight))
+        return found
+
+    def search(self, query, limit=10, min_similarity=0.5):
+        query = normalize(query).strip()
+        key = (query, limit, min_similarity)
+        if key not in self._results:
+            if len(self._results) >= self.max_cached_queries:
+                self._results.clear()
+            self._results[key] = self._search(query, limit, min_similarity)
+        return self._results[key]
+
+    def _search(self, query, limit, min_similarity):
+        words = _WORD.findall(query)
+        if not words:
+            return []
+
+        matches = None
+        for word in words:
+            found = self._prefixed(word)
+            if matches is None:
+                matches = found
+            else:
+                matches = {
+                    i: max(weight, found[i])
+                    for i, weight in matches.items()
+                    if i in found
+                }
+
+        ranked = []
+        for i, weight in matches.items():
+            tier = 0 if self.names[i].startswith(query) else 1 + weight
+            ranked.append((tier, 0.0, len(self.names[i]), i))
+
+        if not ranked and len(query) >= 3:
+            grams = _trigrams(query)
+            shared = defaultdict(int)
+            for gram in grams:
+                for i in self.trigrams.get(gram, ()):
+                    shared[i] += 1
+            for i, count in shared.items():
+                similarity = count / len(grams)
+                if i not in matches and similarity >= min_similarity:
+                    ranked.append((3, -similarity, len(self.names[i]), i))
+
+        return [
+            dict(zip(('id', 'name', 'closest_big_city'), self.airports[i]))
+            for *_, i in heapq.nsmallest(limit, ranked)
+        ]
+
+
+airport_index = InProcessIndex('airport-search', AirportSearchIndex.build)
+
+
+def _search_postgres(query, limit):
+    # Served by the trigram GIN indexes from airport.postgres.
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    return list(
+        Airport.objects.filter(
+            Q(name__icontains=query)
+            | Q(closest_big_city__icontains=query)
+            | Q(name__trigram_similar=query)
+        )
+        .annotate(
+            prefix=Case(
+                When(name__istartswith=query, then=0),
+                default=1,
+            ),
+            similarity=TrigramSimilarity('name', query),
+        )
+        .order_by('prefix', '-similarity', 'name')
+        .values('id', 'name', 'closest_big_city')[:limit]
+    )
+
+
+def autocomplete(query, limit=10):
+    if settings.AIRPORT_AUTOCOMPLETE_BACKEND == 'postgres':
+        return _search_postgres(query, limit)
+    return airport_index.get().search(query, limit)
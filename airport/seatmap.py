@@ -0,0 +1,164 @@
+import base64
+
+
+class SeatBitmap:
+    """One bit per seat, row-major, least significant bit first."""
+
+    __slots__ = ('rows', 'seats_in_row', 'bits')
+
+    def __init__(self, rows, seats_in_row, bits=None):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = self.size_for(rows, seats_in_row)
+        if bits is None:
+            bits = bytes(size)
+        if len(bits) != size:
+            raise ValueError(
+                f'bitmap of {len(bits)} bytes does not fit '
+                f'{rows}x{seats_in_row} seats'
+            )
+        self.bits = bytearray(bits)
+
+    @staticmethod
+    def size_for(rows, seats_in_row):
+        return (rows * seats_in_row + 7) // 8
+
+    @classmethod
+    def from_seats(cls, rows, seats_in_row, seats):
+        bitmap = cls(rows, seats_in_row)
+        for row, seat in seats:
+            if bitmap.contains(row, seat):
+                bitmap.take(row, seat)
+        return bitmap
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_in_row
+
+    def contains(self, row, seat):
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def index(self, row, seat):
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def is_taken(self, row, seat):
+        i = self.index(row, seat)
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def take(self, row, seat):
+        i = self.index(row, seat)
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def release(self, row, seat):
+        i = self.index(row, seat)
+        self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def taken_count(self):
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def to_bytes(self):
+        return bytes(self.bits)
+
+
+def build_seat_map(bitmap):
+    mask = int.from_bytes(bitmap.bits, 'little')
+    seats_in_row = bitmap.seats_in_row
+    seat_map = []
+    for row_number in range(1, bitmap.rows + 1):
+        offset = (row_number - 1) * seats_in_row
+        row_seats = [
+            {
+                'row': row_number,
+                'seat': seat_number,
+                'taken': bool(mask >> (offset + seat_number - 1) & 1),
+            }
+            for seat_number in range(1, seats_in_row + 1)
+        ]
+        seat_map.append({'row': row_number, 'seats': row_seats})
+    return seat_map
+
+
+def _free_runs(row_bits, seats_in_row):
+    """Yield (start_seat, length) for each run of free seats in a row."""
+    start = None
+    for seat in range(1, seats_in_row + 2):
+        free = seat <= seats_in_row and not row_bits >> (seat - 1) & 1
+        if free and start is None:
+            start = seat
+        elif not free and start is not None:
+            yield start, seat - start
+            start = None
+
+
+def find_best_seats(bitmap, count):
+    """
+    Pick `count` free seats: a single run in one row if possible (the
+    tightest fitting run, front rows first), otherwise the fewest adjacent
+    rows that hold enough free seats. Returns None if the cabin is too full.
+    """
+    mask = int.from_bytes(bitmap.bits, 'little')
+    row_mask = (1 << bitmap.seats_in_row) - 1
+    runs = [
+        list(_free_runs(
+            mask >> (row * bitmap.seats_in_row) & row_mask,
+            bitmap.seats_in_row,
+        ))
+        for row in range(bitmap.rows)
+    ]
+
+    best = None
+    for row, row_runs in enumerate(runs, start=1):
+        for start, length in row_runs:
+            if length >= count and (best is None or length < best[2]):
+                best = (row, start, length)
+    if best is not None:
+        row, start, _ = best
+        return [(row, seat) for seat in range(start, start + count)]
+
+    free = [sum(length for _, length in row_runs) for row_runs in runs]
+    window = None
+    low, total = 0, 0
+    for high in range(len(free)):
+        total += free[high]
+        while total - free[low] >= count:
+            total -= free[low]
+            low += 1
+        if total >= count and (
+            window is None or high - low < window[1] - window[0]
+        ):
+            window = (low, high)
+    if window is None:
+        return None
+
+    seats = []
+    for index in range(window[0], window[1] + 1):
+        row_runs = sorted(runs[index], key=lambda run: -run[1])
+        for start, length in row_runs:
+            for seat in range(start, start + length):
+                if len(seats) == count:
+                    return seats
+                seats.append((index + 1, seat))
+    return seats
+
+
+def encode_seat_bitmap(bitmap):
+    return base64.b64encode(bitmap.bits).decode('ascii')
+
+
+def seat_map_payload(flight_id, version, bitmap, layout):
+    if layout == 'compact':
+        return {
+            'flight': flight_id,
+            'version': version,
+            'rows': bitmap.rows,
+            'seats_in_row': bitmap.seats_in_row,
+            'encoding': 'bitmap-base64',
+            'bitmap': encode_seat_bitmap(bitmap),
+        }
+    return {
+        'flight': flight_id,
+        'version': version,
+        'rows': bitmap.rows,
+        'seats_in_row': bitmap.seats_in_row,
+        'seat_map': build_seat_map(bitmap),
+    }
@@ -1,11 +1,18 @@
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from rest_framework import serializers
 
+from .conflicts import RESOURCES, find_conflicts
 from .models import (
     Airplane,
     AirplaneType,
     Airport,
     Crew,
+    DailyBookings,
     Flight,
+    FlightLoad,
+    FlightSchedule,
     Order,
     Route,
     Ticket,
@@ -18,6 +25,11 @@ class AirportSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class AirportAutocompleteSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
@@ -55,10 +67,52 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FlightSchedule
+        fields = '__all__'
+
+    def validate_time_zone(self, value):
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError('unknown time zone')
+        return value
+
+    def validate_weekdays(self, value):
+        if not 0 < value < 1 << 7:
+            raise serializers.ValidationError(
+                'weekdays must be a non-empty 7-bit mask'
+            )
+        return value
+
+    def validate_duration(self, value):
+        if value <= timedelta(0):
+            raise serializers.ValidationError('duration must be positive')
+        return value
+
+    def validate(self, attrs):
+        valid_from = attrs.get('valid_from') or getattr(
+            self.instance,
+            'valid_from',
+            None,
+        )
+        valid_until = attrs.get('valid_until') or getattr(
+            self.instance,
+            'valid_until',
+            None,
+        )
+        if valid_from and valid_until and valid_until < valid_from:
+            raise serializers.ValidationError(
+                'valid_until must not be before valid_from'
+            )
+        return attrs
+
+
 class FlightSerializer(serializers.ModelSerializer):
     class Meta:
         model = Flight
-        fields = '__all__'
+        exclude = ('seat_bitmap',)
 
     def validate(self, attrs):
         departure = attrs.get('departure_time') or getattr(
@@ -75,8 +129,49 @@ class FlightSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'arrival_time must be after departure_time'
             )
+        if departure and arrival:
+            self._validate_overlaps(attrs, departure, arrival)
         return attrs
 
+    def _validate_overlaps(self, attrs, departure, arrival):
+        airplane = attrs.get('airplane') or getattr(
+            self.instance,
+            'airplane',
+            None,
+        )
+        if 'crews' in attrs:
+            crews = [crew.pk for crew in attrs['crews']]
+        elif self.instance is not None:
+            crews = [crew.pk for crew in self.instance.crews.all()]
+        else:
+            crews = []
+        conflicts = find_conflicts(
+            departure,
+            arrival,
+            airplane=airplane.pk if airplane else None,
+            crews=crews,
+            exclude=getattr(self.instance, 'pk', None),
+        )
+        errors = {}
+        for kind, resource, flight in conflicts:
+            field = 'airplane' if kind == 'airplane' else 'crews'
+            errors.setdefault(field, []).append(
+                f'{kind} {resource} is already on flight {flight} '
+                f'at that time'
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
+
+
+class FlightConflictSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=list(RESOURCES))
+    resource = serializers.IntegerField(
+        help_text='id of the airplane or crew member',
+    )
+    flights = serializers.ListField(child=serializers.IntegerField())
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
 
 class OrderSerializer(serializers.ModelSerializer):
     class Meta:
@@ -108,6 +203,20 @@ class BookSeatSerializer(serializers.Serializer):
     seat = serializers.IntegerField(min_value=1)
 
 
+class BookSeatsSerializer(serializers.Serializer):
+    seats = BookSeatSerializer(many=True, allow_empty=False)
+
+    def validate_seats(self, seats):
+        places = [(s['row'], s['seat']) for s in seats]
+        if len(set(places)) != len(places):
+            raise serializers.ValidationError('duplicate seats in request')
+        return places
+
+
+class AssignSeatsSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1)
+
+
 class SeatInfoSerializer(serializers.Serializer):
     row = serializers.IntegerField()
     seat = serializers.IntegerField()
@@ -121,11 +230,45 @@ class SeatRowSerializer(serializers.Serializer):
 
 class SeatMapResponseSerializer(serializers.Serializer):
     flight = serializers.IntegerField()
+    version = serializers.IntegerField()
     rows = serializers.IntegerField()
     seats_in_row = serializers.IntegerField()
     seat_map = SeatRowSerializer(many=True)
 
 
+class CompactSeatMapResponseSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    version = serializers.IntegerField()
+    rows = serializers.IntegerField()
+    seats_in_row = serializers.IntegerField()
+    encoding = serializers.ChoiceField(choices=['bitmap-base64'])
+    bitmap = serializers.CharField(
+        help_text=(
+            'Base64 of one bit per seat, 1 = taken. Seat (row, seat) is '
+            'bit i = (row - 1) * seats_in_row + (seat - 1), stored in '
+            'byte i // 8 at position i % 8, least significant bit first.'
+        ),
+    )
+
+
+class SeatMapDeltaResponseSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    version = serializers.IntegerField()
+    since = serializers.IntegerField()
+    changes = SeatInfoSerializer(many=True)
+
+
+class SeatPlaceSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldResponseSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    expires_at = serializers.DateTimeField()
+    seats = SeatPlaceSerializer(many=True)
+
+
 class TicketShortSerializer(serializers.Serializer):
     id = serializers.IntegerField()  # noqa: VNE003
     row = serializers.IntegerField()
@@ -136,3 +279,99 @@ class BookingResponseSerializer(serializers.Serializer):
     order = serializers.IntegerField()
     flight = serializers.IntegerField()
     ticket = TicketShortSerializer()
+
+
+class MultiBookingResponseSerializer(serializers.Serializer):
+    order = serializers.IntegerField()
+    flight = serializers.IntegerField()
+    tickets = TicketShortSerializer(many=True)
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    date = serializers.DateField()
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=3)
+    min_layover = serializers.IntegerField(
+        min_value=0,
+        default=45,
+        help_text='Minimum connection time, minutes',
+    )
+    max_layover = serializers.IntegerField(
+        min_value=0,
+        default=360,
+        help_text='Maximum connection time, minutes',
+    )
+    ordering = serializers.ChoiceField(
+        choices=['distance', 'duration'],
+        default='distance',
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        if attrs['source'] == attrs['destination']:
+            raise serializers.ValidationError(
+                'source must differ from destination'
+            )
+        if attrs['min_layover'] > attrs['max_layover']:
+            raise serializers.ValidationError(
+                'min_layover must not exceed max_layover'
+            )
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(source='id')
+    route = serializers.IntegerField(source='route_id')
+    source = serializers.IntegerField(source='route.source_id')
+    destination = serializers.IntegerField(source='route.destination_id')
+    distance = serializers.IntegerField(source='route.distance')
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    legs = ItineraryLegSerializer(many=True)
+    total_distance = serializers.IntegerField()
+    total_duration = serializers.DurationField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class FlightLoadSerializer(serializers.ModelSerializer):
+    flight = serializers.IntegerField(source='flight_id')
+    load_factor = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = FlightLoad
+        fields = (
+            'flight',
+            'route',
+            'day',
+            'departure_time',
+            'capacity',
+            'seats_sold',
+            'load_factor',
+        )
+
+
+class RouteLoadSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    flights = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    seats_sold = serializers.IntegerField()
+    load_factor = serializers.FloatField()
+
+
+class DayLoadSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    flights = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    seats_sold = serializers.IntegerField()
+    load_factor = serializers.FloatField()
+
+
+class DailyBookingsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyBookings
+        fields = ('day', 'orders', 'tickets')
@@ -0,0 +1,176 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import cache as seat_map_cache
+from .authentication import user_cache_key
+from .itineraries import route_graph
+from .metrics import ORDERS_CREATED
+from .models import (
+    Airplane,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    SeatHold,
+    Ticket,
+)
+from .occupancy import (
+    apply_seat_changes,
+    lock_flight,
+    reindex_flight,
+    release_holds,
+    seats_changed,
+)
+from .pubsub import flight_channel, get_broker
+from .search import airport_index
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    place = (instance.flight_id, instance.row, instance.seat)
+    loaded = None if created else getattr(instance, '_loaded_place', None)
+    if loaded == place:
+        return
+    with transaction.atomic():
+        if loaded is not None and loaded[0] is not None:
+            old_flight_id, old_row, old_seat = loaded
+            if old_flight_id != instance.flight_id:
+                apply_seat_changes(
+                    lock_flight(old_flight_id),
+                    released=[(old_row, old_seat)],
+                    sold=-1,
+                )
+                loaded = None
+        flight = lock_flight(instance.flight_id)
+        apply_seat_changes(
+            flight,
+            taken=[(instance.row, instance.seat)],
+            released=[loaded[1:]] if loaded else (),
+            sold=0 if loaded else 1,
+        )
+    instance._loaded_place = place
+
+
+def _deletes_flight(origin):
+    if isinstance(origin, QuerySet):
+        return origin.model is Flight
+    return isinstance(origin, Flight)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, origin=None, **kwargs):
+    if _deletes_flight(origin):
+        # The flight goes too; a SeatChange written now would outlive the
+        # ones the collector already gathered and block the flight delete.
+        return
+    with transaction.atomic():
+        try:
+            flight = lock_flight(instance.flight_id)
+        except Flight.DoesNotExist:
+            return
+        apply_seat_changes(
+            flight,
+            released=[(instance.row, instance.seat)],
+            sold=-1,
+        )
+
+
+@receiver(post_save, sender=Airplane)
+def airplane_saved(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    layout = (instance.rows, instance.seats_in_row)
+    if getattr(instance, '_loaded_layout', None) == layout:
+        return
+    with transaction.atomic():
+        for flight_id in instance.flights.values_list('pk', flat=True):
+            reindex_flight(lock_flight(flight_id))
+    instance._loaded_layout = layout
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, raw=False, **kwargs):
+    if created or raw or not getattr(instance, '_seat_bitmap_rebuilt', False):
+        return
+    instance._seat_bitmap_rebuilt = False
+    flight_id, version = instance.pk, instance.seat_version
+    transaction.on_commit(lambda: seats_changed.send(
+        sender=Flight,
+        flight_id=flight_id,
+        version=version,
+        taken=[],
+        released=[],
+    ))
+
+
+@receiver(post_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    flight_id = instance.pk
+    transaction.on_commit(lambda: seat_map_cache.forget_flight(flight_id))
+
+
+@receiver(seats_changed)
+def publish_seat_map_version(sender, flight_id, version, **kwargs):
+    seat_map_cache.publish_version(flight_id, version)
+
+
+@receiver(seats_changed)
+def publish_seat_events(sender, flight_id, version, taken, released,
+                        **kwargs):
+    try:
+        get_broker().publish(flight_channel(flight_id), {
+            'version': version,
+            'taken': [list(place) for place in taken],
+            'released': [list(place) for place in released],
+        })
+    except Exception:
+        # The seats are already committed; live streams just miss a delta.
+        logger.exception('Could not publish seat events for %s', flight_id)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def route_changed(sender, **kwargs):
+    transaction.on_commit(route_graph.invalidate)
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def airport_changed(sender, **kwargs):
+    transaction.on_commit(airport_index.invalidate)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    key = user_cache_key(getattr(instance, jwt_settings.USER_ID_FIELD))
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def user_deleted(sender, instance, **kwargs):
+    # The cascade would drop the holds without clearing their seats.
+    flight_ids = (
+        SeatHold.objects.filter(user=instance)
+        .values_list('flight_id', flat=True)
+        .distinct()
+    )
+    for flight_id in list(flight_ids):
+        release_holds(flight_id, instance)
+
+
+@receiver(post_save, sender=Order)
+def order_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(ORDERS_CREATED.inc)
@@ -0,0 +1,185 @@
+import random
+import time
+from datetime import time as dt_time, timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .itineraries import route_graph
+from .models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSchedule,
+    Order,
+    Route,
+    Ticket,
+)
+from .search import airport_index
+from .seatmap import SeatBitmap
+
+LEG = timedelta(hours=2)
+CREW_SIZE = 2
+TURNAROUND = timedelta(hours=1)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def generate_dataset(flights=1000, fill=0.5, airports=50, rows=30,
+                     seats_in_row=6, flights_per_airplane=10, seed=0,
+                     prefix='SYN', batch_size=5000, log=None):
+    """
+    Bulk-create a synthetic schedule: airports joined in a ring of routes,
+    airplanes flying back-to-back legs without overlaps, each with a crew
+    of two, and `flights` flights, each with `fill` of its cabin sold as
+    tickets (2-4 per order) and a matching seat bitmap and seat counters.
+    Every route also gets a recurring schedule, not yet materialized.
+    Signals are bypassed, so it is fast enough for millions of tickets.
+    Names start with `prefix`; use a new one to add more data to the same
+    database.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    started = time.perf_counter()
+    capacity = rows * seats_in_row
+    sold = int(capacity * fill)
+
+    with transaction.atomic():
+        airport_objs = Airport.objects.bulk_create(
+            Airport(name=f'{prefix} Airport {i}', closest_big_city=f'City {i}')
+            for i in range(airports)
+        )
+        route_objs = Route.objects.bulk_create(
+            Route(
+                source=source,
+                destination=airport_objs[(i + 1) % airports],
+                distance=rng.randint(200, 3000),
+            )
+            for i, source in enumerate(airport_objs)
+        )
+        # bulk_create skips the post_save handlers that refresh these.
+        transaction.on_commit(airport_index.invalidate)
+        transaction.on_commit(route_graph.invalidate)
+        airplane_type, _ = AirplaneType.objects.get_or_create(
+            name=f'{prefix} Type',
+        )
+        airplane_objs = Airplane.objects.bulk_create(
+            Airplane(
+                name=f'{prefix}-{i:05d}',
+                rows=rows,
+                seats_in_row=seats_in_row,
+                airplane_type=airplane_type,
+            )
+            for i in range(-(-flights // flights_per_airplane))
+        )
+        crew_objs = Crew.objects.bulk_create(
+            Crew(first_name=f'{prefix} Crew', last_name=str(i))
+            for i in range(len(airplane_objs) * CREW_SIZE)
+        )
+        crews = {
+            airplane.pk: [
+                crew.pk
+                for crew in crew_objs[i * CREW_SIZE:(i + 1) * CREW_SIZE]
+            ]
+            for i, airplane in enumerate(airplane_objs)
+        }
+        FlightSchedule.objects.bulk_create(
+            FlightSchedule(
+                route=route,
+                airplane=airplane_objs[i % len(airplane_objs)],
+                departure_time=dt_time(8),
+                duration=LEG,
+                valid_from=timezone.localdate(),
+                valid_until=timezone.localdate() + timedelta(days=90),
+            )
+            for i, route in enumerate(route_objs)
+        )
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                username=f'{prefix.lower()}-user-{i}',
+                password='!',
+            )
+            for i in range(100)
+        )
+    log(f'Created {airports} airports, {len(airplane_objs)} airplanes, '
+        f'{len(crew_objs)} crew members.')
+
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def flight_rows():
+        for i in range(flights):
+            airplane_index, leg = divmod(i, flights_per_airplane)
+            departure = start + leg * (LEG + TURNAROUND)
+            seats = sorted(
+                divmod(index, seats_in_row)
+                for index in rng.sample(range(capacity), sold)
+            )
+            places = [(row + 1, seat + 1) for row, seat in seats]
+            flight = Flight(
+                route=route_objs[(airplane_index + leg) % airports],
+                airplane=airplane_objs[airplane_index],
+                departure_time=departure,
+                arrival_time=departure + LEG,
+                seat_bitmap=SeatBitmap.from_seats(
+                    rows,
+                    seats_in_row,
+                    places,
+                ).to_bytes(),
+                seats_sold=sold,
+                seats_available=capacity - sold,
+            )
+            yield flight, places
+
+    tickets_created = 0
+    per_batch = max(1, batch_size // max(sold, 1))
+    for batch in _batched(flight_rows(), per_batch):
+        with transaction.atomic():
+            flight_objs = Flight.objects.bulk_create(
+                flight for flight, _ in batch
+            )
+            Flight.crews.through.objects.bulk_create(
+                Flight.crews.through(flight_id=flight.pk, crew_id=crew_id)
+                for flight in flight_objs
+                for crew_id in crews[flight.airplane_id]
+            )
+            orders, tickets = [], []
+            for flight, (_, places) in zip(flight_objs, batch):
+                while places:
+                    size = rng.randint(2, 4)
+                    order = Order(user=rng.choice(users))
+                    orders.append(order)
+                    tickets.extend(
+                        (flight, order, row, seat)
+                        for row, seat in places[:size]
+                    )
+                    places = places[size:]
+            Order.objects.bulk_create(orders, batch_size=batch_size)
+            Ticket.objects.bulk_create(
+                (
+                    Ticket(flight=flight, order=order, row=row, seat=seat)
+                    for flight, order, row, seat in tickets
+                ),
+                batch_size=batch_size,
+            )
+        tickets_created += len(tickets)
+        log(f'{tickets_created} tickets...')
+
+    elapsed = time.perf_counter() - started
+    log(f'Generated {flights} flights and {tickets_created} tickets '
+        f'in {elapsed:.1f}s.')
+    return {
+        'airports': airports,
+        'airplanes': len(airplane_objs),
+        'crews': len(crew_objs),
+        'flights': flights,
+        'tickets': tickets_created,
+        'seconds': round(elapsed, 2),
+    }
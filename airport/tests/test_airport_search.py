@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from airport.indexes import InProcessIndex
+from airport.models import Airport
+
+
+class AirportAutocompleteTests(TestCase):
+    def setUp(self):
+        for name, city in [
+            ('Kyiv Boryspil', 'Kyiv'),
+            ('Kyiv Zhuliany', 'Kyiv'),
+            ('Lviv Danylo Halytskyi', 'Lviv'),
+            ('Heathrow', 'London'),
+            ('Zürich', 'Zurich'),
+        ]:
+            Airport.objects.create(name=name, closest_big_city=city)
+        self.client = APIClient()
+
+    def names(self, q, **params):
+        res = self.client.get(
+            '/api/airports/autocomplete/',
+            {'q': q, **params},
+        )
+        self.assertEqual(res.status_code, 200, res.content)
+        return [a['name'] for a in res.json()]
+
+    def test_name_prefix_ranks_first(self):
+        self.assertEqual(
+            self.names('kyiv'),
+            ['Kyiv Boryspil', 'Kyiv Zhuliany'],
+        )
+        self.assertEqual(self.names('bory'), ['Kyiv Boryspil'])
+
+    def test_city_word_and_multi_word_prefixes(self):
+        self.assertEqual(self.names('lond'), ['Heathrow'])
+        self.assertEqual(self.names('kyiv zh'), ['Kyiv Zhuliany'])
+
+    def test_accents_and_typos(self):
+        self.assertEqual(self.names('zur'), ['Zürich'])
+        self.assertIn('Heathrow', self.names('heatrow'))
+
+    def test_limit_and_validation(self):
+        self.assertEqual(len(self.names('k', limit=1)), 1)
+        res = self.client.get('/api/airports/autocomplete/')
+        self.assertEqual(res.status_code, 400)
+
+
+class InProcessIndexTests(TestCase):
+    def test_generation_is_checked_at_most_every_interval(self):
+        builds = []
+        index = InProcessIndex('test', lambda: builds.append(1) or len(builds))
+        with mock.patch.object(
+            cache, 'get_or_set', wraps=cache.get_or_set,
+        ) as get_or_set:
+            self.assertEqual(index.get(), 1)
+            cache.set(index._key, 'elsewhere', None)
+            self.assertEqual(index.get(), 1)
+            self.assertEqual(get_or_set.call_count, 1)
+            with override_settings(INDEX_GENERATION_CHECK_SECONDS=0):
+                self.assertEqual(index.get(), 2)
+
+        index.invalidate()
+        self.assertEqual(index.get(), 3)
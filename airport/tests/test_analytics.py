@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport import occupancy
+from airport.analytics import refresh_analytics
+from airport.models import DailyBookings, Flight, RouteDayLoad
+
+from .utils import make_flight
+
+User = get_user_model()
+
+DAY1 = datetime(2030, 5, 1, 8, tzinfo=dt_timezone.utc)
+DAY2 = DAY1 + timedelta(days=1)
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u', password='p')
+        # 3 rows x 4 seats = 12 seats each.
+        self.first = make_flight(departure=DAY1)
+        self.second = make_flight(departure=DAY1 + timedelta(hours=3))
+        self.third = make_flight(departure=DAY2)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='staff',
+            password='p',
+            is_staff=True,
+        ))
+
+    def refresh(self):
+        return refresh_analytics(settle=timedelta(0))
+
+    def test_load_factor_per_flight_route_and_day(self):
+        occupancy.book_seats(self.first.id, self.user, [(1, 1), (1, 2)])
+        occupancy.book_seats(self.third.id, self.user, [(2, 1)])
+        self.refresh()
+
+        flights = self.client.get('/api/analytics/flights/').json()
+        self.assertEqual(
+            [(f['flight'], f['seats_sold'], f['load_factor'])
+             for f in flights['results']],
+            [
+                (self.first.id, 2, 0.1667),
+                (self.second.id, 0, 0.0),
+                (self.third.id, 1, 0.0833),
+            ],
+        )
+        with self.assertNumQueries(1):
+            routes = self.client.get('/api/analytics/routes/').json()
+        self.assertEqual(routes, [{
+            'route': self.first.route_id,
+            'flights': 3,
+            'capacity': 36,
+            'seats_sold': 3,
+            'load_factor': 0.0833,
+        }])
+        days = self.client.get(
+            '/api/analytics/days/',
+            {'date_after': '2030-05-02'},
+        ).json()
+        self.assertEqual(days, [{
+            'day': '2030-05-02',
+            'flights': 1,
+            'capacity': 12,
+            'seats_sold': 1,
+            'load_factor': 0.0833,
+        }])
+
+    def test_refresh_only_touches_changed_flights(self):
+        self.refresh()
+        self.assertEqual(self.refresh()['flights_updated'], 0)
+
+        occupancy.book_seats(self.second.id, self.user, [(3, 4)])
+        self.assertEqual(self.refresh()['flights_updated'], 1)
+        self.assertEqual(
+            RouteDayLoad.objects.get(day=DAY1.date()).seats_sold,
+            1,
+        )
+
+        Flight.objects.filter(pk=self.third.pk).update(
+            departure_time=DAY2 + timedelta(days=1),
+            arrival_time=DAY2 + timedelta(days=1, hours=1),
+        )
+        self.second.tickets.all().delete()
+        self.second.delete()
+        result = self.refresh()
+        self.assertEqual(result['flights_updated'], 1)
+        self.assertEqual(result['flights_removed'], 1)
+        self.assertEqual(
+            list(
+                RouteDayLoad.objects.order_by('day')
+                .values_list('day', 'flights', 'seats_sold')
+            ),
+            [
+                (DAY1.date(), 1, 0),
+                (DAY2.date() + timedelta(days=1), 1, 0),
+            ],
+        )
+
+    def test_bookings_are_counted_once(self):
+        occupancy.book_seats(self.first.id, self.user, [(1, 1), (1, 2)])
+        occupancy.book_seats(self.third.id, self.user, [(1, 1)])
+        refresh_analytics()  # both orders are still settling
+        self.assertFalse(DailyBookings.objects.exists())
+
+        self.assertEqual(self.refresh()['orders'], 2)
+        self.assertEqual(self.refresh()['orders'], 0)
+        occupancy.book_seats(self.second.id, self.user, [(2, 2)])
+        out = StringIO()
+        call_command('refresh_analytics', '--settle-seconds=0', stdout=out)
+        self.assertIn('1 orders added', out.getvalue())
+
+        res = self.client.get('/api/analytics/bookings/')
+        self.assertEqual(len(res.json()), 1)
+        self.assertEqual(res.json()[0]['orders'], 3)
+        self.assertEqual(res.json()[0]['tickets'], 4)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.user)
+        for name in ('flights', 'routes', 'days', 'bookings'):
+            res = self.client.get(f'/api/analytics/{name}/')
+            self.assertEqual(res.status_code, 403)
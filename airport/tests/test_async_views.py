@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Flight, Route
+
+from .utils import make_flight
+
+PAGE_SIZE = {'PAGE_SIZE': 2}
+
+
+class AsyncReadViewsTests(TestCase):
+    def setUp(self):
+        start = timezone.now() + timedelta(days=1)
+        self.flights = [
+            make_flight(departure=start + timedelta(minutes=5 * i))
+            for i in range(5)
+        ]
+        self.client = AsyncClient()
+
+    async def test_flight_detail_matches_sync_endpoint(self):
+        flight = self.flights[0]
+        res = await self.client.get(f'/api/async/flights/{flight.id}/')
+        self.assertEqual(res.status_code, 200)
+        sync_get = sync_to_async(APIClient().get)
+        sync = await sync_get(f'/api/flights/{flight.id}/')
+        self.assertEqual(res.json(), sync.json())
+
+    async def test_missing_flight_is_404(self):
+        res = await self.client.get('/api/async/flights/999999/')
+        self.assertEqual(res.status_code, 404)
+
+    async def test_flight_list_is_keyset_paginated(self):
+        seen = []
+        url = '/api/async/flights/'
+        with self.settings(REST_FRAMEWORK=PAGE_SIZE):
+            while url:
+                body = (await self.client.get(url)).json()
+                seen += [flight['id'] for flight in body['results']]
+                url = body['next']
+        self.assertEqual(seen, [flight.id for flight in self.flights])
+
+    async def test_departure_range_walks_departure_order(self):
+        # Reverse the id order of departures to tell the orderings apart.
+        first, last = self.flights[0], self.flights[-1]
+        await Flight.objects.filter(pk=first.pk).aupdate(
+            departure_time=last.departure_time + timedelta(minutes=1),
+            arrival_time=last.arrival_time + timedelta(minutes=1),
+        )
+        seen = []
+        url = '/api/async/flights/?departure_after=2000-01-01T00:00Z'
+        with self.settings(REST_FRAMEWORK=PAGE_SIZE):
+            while url:
+                body = (await self.client.get(url)).json()
+                seen += [flight['id'] for flight in body['results']]
+                url = body['next']
+        self.assertEqual(
+            seen,
+            [flight.id for flight in self.flights[1:]] + [first.id],
+        )
+
+    async def test_invalid_filter_and_cursor(self):
+        res = await self.client.get('/api/async/flights/?source=x')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('source', res.json())
+        res = await self.client.get('/api/async/flights/?cursor=bad')
+        self.assertEqual(res.status_code, 404)
+
+    async def test_seat_map_etag_round_trip(self):
+        url = f'/api/async/flights/{self.flights[0].id}/seats/'
+        res = await self.client.get(url, {'layout': 'compact'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['encoding'], 'bitmap-base64')
+
+        res = await self.client.get(url, headers={
+            'If-None-Match': res['ETag'],
+        })
+        self.assertEqual(res.status_code, 304)
+
+        sync_get = sync_to_async(APIClient().get)
+        sync = await sync_get(f'/api/flights/{self.flights[0].id}/seats/')
+        self.assertEqual(sync['ETag'], res['ETag'])
+
+    async def test_seat_map_rejects_unknown_layout(self):
+        url = f'/api/async/flights/{self.flights[0].id}/seats/'
+        res = await self.client.get(url, {'layout': 'wide'})
+        self.assertEqual(res.status_code, 400)
+
+    async def test_route_lookup(self):
+        route = await Route.objects.aget()
+        res = await self.client.get(
+            '/api/async/routes/',
+            {'source': route.source_id},
+        )
+        self.assertEqual(
+            [r['id'] for r in res.json()['results']],
+            [route.id],
+        )
+        res = await self.client.get(f'/api/async/routes/{route.id}/')
+        self.assertEqual(res.json()['distance'], 468)
+
+    async def test_airport_lookup(self):
+        airport = await Airport.objects.aget(name='Lviv')
+        res = await self.client.get(f'/api/async/airports/{airport.id}/')
+        self.assertEqual(res.json()['closest_big_city'], 'Lviv')
+
+    async def test_writes_are_not_allowed(self):
+        res = await self.client.post('/api/async/flights/')
+        self.assertEqual(res.status_code, 405)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.authentication import CachedJWTAuthentication, user_cache_key
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.token = str(AccessToken.for_user(self.user))
+        self.auth = CachedJWTAuthentication()
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}',
+        )
+        return self.auth.authenticate(request)[0]
+
+    def test_user_is_looked_up_once(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_password_hash_is_not_cached(self):
+        self.authenticate()
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, repr(entry))
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertTrue(user.is_active)
+            self.assertFalse(user.is_staff)
+        self.assertEqual(user.username, 'u1')
+
+    def test_deactivation_takes_effect_immediately(self):
+        self.authenticate()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_booking_with_cached_user(self):
+        flight = make_flight()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        for seat in (1, 2):
+            res = client.post(
+                f'/api/flights/{flight.id}/book/',
+                {'row': 1, 'seat': seat},
+            )
+            self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.user.orders.count(), 2)
+
+    def test_basic_auth_is_not_accepted(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Basic dTE6cA==')
+        res = client.post('/api/orders/', {})
+        self.assertEqual(res.status_code, 401)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import TestCase
+from psycopg_pool import ConnectionPool
+from rest_framework.test import APIClient
+
+from airport.dbpool import pool_stats
+
+User = get_user_model()
+
+
+class DatabasePoolTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='staff',
+            password='p',
+            is_staff=True,
+        ))
+
+    def test_unpooled_connection_reports_persistence_settings(self):
+        res = self.client.get('/api/ops/db-pool/')
+        self.assertEqual(res.status_code, 200)
+        default = res.json()[0]
+        self.assertEqual(default['alias'], 'default')
+        self.assertFalse(default['pooled'])
+        self.assertTrue(default['health_checks'])
+
+    def test_pool_stats(self):
+        pool = ConnectionPool('', open=False, min_size=2, max_size=5)
+        with mock.patch.object(
+            connections['default'],
+            '_connection_pools',
+            {'default': pool},
+            create=True,
+        ):
+            default = pool_stats(probe=False)[0]
+        self.assertTrue(default['pooled'])
+        self.assertEqual(
+            (default['min_size'], default['max_size'], default['waiting']),
+            (2, 5, 0),
+        )
+        self.assertEqual(default['avg_checkout_ms'], 0.0)
+
+    def test_stats_do_not_create_pools(self):
+        def create_pool(connection):
+            self.fail(f'pool created for {connection.alias}')
+
+        with mock.patch.object(
+            type(connections['default']),
+            'pool',
+            property(create_pool),
+            create=True,
+        ):
+            res = self.client.get('/api/ops/db-pool/', {'alias': 'default'})
+        self.assertEqual([entry['alias'] for entry in res.json()], ['default'])
+        self.assertFalse(res.json()[0]['pooled'])
+
+    def test_unknown_alias(self):
+        res = self.client.get('/api/ops/db-pool/', {'alias': 'nope'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            User.objects.create_user(username='u', password='p'),
+        )
+        self.assertEqual(self.client.get('/api/ops/db-pool/').status_code, 403)
+
+    def test_connection_benchmark_needs_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_connections')
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='ops',
+            password='p',
+            is_staff=True,
+        )
+        self.flight = make_flight()
+        other = make_flight(name='UR-BBB')
+        self.order = Order.objects.create(user=self.admin)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                flight=self.flight,
+                order=self.order,
+                row=1,
+                seat=seat,
+            )
+        Ticket.objects.create(flight=other, order=self.order, row=1, seat=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def body(self, res):
+        return b''.join(res.streaming_content).decode()
+
+    def test_tickets_ndjson_by_flight(self):
+        res = self.client.get(
+            f'/api/exports/tickets.ndjson?flight={self.flight.id}',
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.body(res).splitlines()]
+        self.assertEqual([r['seat'] for r in rows], [1, 2, 3])
+        self.assertEqual(rows[0]['user'], self.admin.id)
+
+    def test_orders_csv(self):
+        res = self.client.get('/api/exports/orders.csv')
+        self.assertEqual(res.status_code, 200)
+        rows = list(csv.reader(io.StringIO(self.body(res))))
+        self.assertEqual(rows[0], ['id', 'user', 'username', 'created_at'])
+        self.assertEqual(rows[1][:3], [str(self.order.id), str(self.admin.id),
+                                       'ops'])
+
+    def test_staff_only_and_known_formats(self):
+        res = self.client.get('/api/exports/tickets.xml')
+        self.assertEqual(res.status_code, 404)
+
+        user = User.objects.create_user(username='u', password='p')
+        self.client.force_authenticate(user)
+        res = self.client.get('/api/exports/tickets.csv')
+        self.assertEqual(res.status_code, 403)
@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.conflicts import booked_flights, find_conflicts
+from airport.importer import ScheduleImporter
+from airport.models import Crew, Flight
+from airport.serializers import FlightSerializer
+
+from .utils import make_flight
+
+User = get_user_model()
+
+T0 = datetime(2030, 5, 1, 8, tzinfo=dt_timezone.utc)
+
+
+def at(hours):
+    return T0 + timedelta(hours=hours)
+
+
+class FlightOverlapValidationTests(TestCase):
+    def setUp(self):
+        self.flight = make_flight(departure=at(0))  # 08:00-09:00
+        self.crew = Crew.objects.create(first_name='Olena', last_name='K')
+        self.flight.crews.add(self.crew)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='u', password='p'),
+        )
+
+    def payload(self, start, hours=1, **extra):
+        return {
+            'route': self.flight.route_id,
+            'airplane': self.flight.airplane_id,
+            'departure_time': at(start).isoformat(),
+            'arrival_time': at(start + hours).isoformat(),
+            **extra,
+        }
+
+    def test_overlapping_airplane_is_rejected(self):
+        res = self.client.post('/api/flights/', self.payload(0.5))
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()['airplane'], [
+            f'airplane {self.flight.airplane_id} is already on flight '
+            f'{self.flight.id} at that time',
+        ])
+
+    def test_back_to_back_legs_are_allowed(self):
+        res = self.client.post('/api/flights/', self.payload(1))
+        self.assertEqual(res.status_code, 201)
+        res = self.client.post('/api/flights/', self.payload(-1))
+        self.assertEqual(res.status_code, 201)
+
+    def test_crew_member_cannot_fly_two_airplanes_at_once(self):
+        other = make_flight(departure=at(24), name='UR-BBB')
+        res = self.client.post('/api/flights/', self.payload(
+            0.5,
+            airplane=other.airplane_id,
+            crews=[self.crew.id],
+        ))
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('crews', res.json())
+        self.assertNotIn('airplane', res.json())
+
+    def test_update_does_not_conflict_with_itself(self):
+        res = self.client.patch(
+            f'/api/flights/{self.flight.id}/',
+            {'arrival_time': at(2).isoformat()},
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_only_the_exclusion_constraint_reads_as_overlap(self):
+        # What psycopg raises on PostgreSQL, wrapped by Django.
+        cause = Exception('conflicting key value')
+        cause.diag = mock.Mock(constraint_name='flight_airplane_no_overlap')
+        overlap = IntegrityError(*cause.args)
+        overlap.__cause__ = cause
+        with mock.patch.object(FlightSerializer, 'save', side_effect=overlap):
+            res = self.client.post('/api/flights/', self.payload(2))
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('airplane', res.json())
+
+        other = IntegrityError('CHECK constraint failed')
+        with mock.patch.object(FlightSerializer, 'save', side_effect=other):
+            with self.assertRaises(IntegrityError):
+                self.client.post('/api/flights/', self.payload(2))
+
+    def test_long_earlier_flight_still_in_the_air(self):
+        make_flight(departure=at(3))
+        Flight.objects.filter(departure_time=at(3)).update(
+            arrival_time=at(12),
+        )
+        make_flight(departure=at(20))
+        with self.assertNumQueries(1):
+            rows = booked_flights(
+                'airplane',
+                [self.flight.airplane_id],
+                at(10),
+                at(11),
+            )
+        self.assertEqual([row[2] for row in rows], [at(3)])
+        self.assertEqual(
+            find_conflicts(at(8), at(8.5), crews=[self.crew.id]),
+            [],
+        )
+
+
+class ImporterOverlapTests(TestCase):
+    def test_overlapping_rows_are_skipped(self):
+        make_flight(departure=at(0))
+
+        def flight(start):
+            return {
+                'type': 'flight', 'source': 'Boryspil',
+                'destination': 'Lviv', 'airplane': 'UR-AAA',
+                'departure_time': at(start).isoformat(),
+                'arrival_time': at(start + 1).isoformat(),
+            }
+
+        importer = ScheduleImporter(use_copy=False)
+        created, skipped = importer.run([
+            flight(0.5), flight(1), flight(1.5), flight(2), flight(-1),
+        ])
+        self.assertEqual(created['flight'], 3)
+        self.assertEqual(skipped['flight'], 2)
+        self.assertEqual(
+            sorted(Flight.objects.values_list('departure_time', flat=True)),
+            [at(-1), at(0), at(1), at(2)],
+        )
+
+
+class ConflictReportTests(TestCase):
+    def setUp(self):
+        self.a = make_flight(departure=at(0))
+        self.b = make_flight(departure=at(0.5))
+        self.c = make_flight(departure=at(0.75))
+        make_flight(departure=at(5))
+        crew = Crew.objects.create(first_name='Ivan', last_name='P')
+        other = make_flight(departure=at(0.5), name='UR-BBB')
+        self.a.crews.add(crew)
+        other.crews.add(crew)
+        self.crew, self.other = crew, other
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='staff',
+            password='p',
+            is_staff=True,
+        ))
+
+    def test_lists_every_overlapping_pair(self):
+        res = self.client.get('/api/flights/conflicts/')
+        self.assertEqual(res.status_code, 200)
+        pairs = [(c['kind'], c['flights']) for c in res.json()]
+        self.assertEqual(pairs, [
+            ('airplane', [self.a.id, self.b.id]),
+            ('airplane', [self.a.id, self.c.id]),
+            ('airplane', [self.b.id, self.c.id]),
+            ('crew', [self.a.id, self.other.id]),
+        ])
+        self.assertEqual(res.json()[0]['resource'], self.a.airplane_id)
+
+    def test_kind_filter(self):
+        res = self.client.get('/api/flights/conflicts/', {'kind': 'crew'})
+        self.assertEqual(res.json(), [{
+            'kind': 'crew',
+            'resource': self.crew.id,
+            'flights': [self.a.id, self.other.id],
+            'start': '2030-05-01T08:30:00Z',
+            'end': '2030-05-01T09:00:00Z',
+        }])
+        res = self.client.get('/api/flights/conflicts/', {'kind': 'gate'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            User.objects.create_user(username='u', password='p'),
+        )
+        res = self.client.get('/api/flights/conflicts/')
+        self.assertEqual(res.status_code, 403)
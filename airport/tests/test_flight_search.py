@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Flight, Route
+
+from .utils import make_flight
+
+
+def at(day, hour=8):
+    return datetime(2030, 5, day, hour, tzinfo=dt_timezone.utc)
+
+
+class FlightDateRangeTests(TestCase):
+    def setUp(self):
+        self.early = make_flight(departure=at(3))
+        self.late = make_flight(departure=at(2))
+        self.outside = make_flight(departure=at(9))
+        route = Route.objects.create(
+            source=self.early.route.destination,
+            destination=self.early.route.source,
+            distance=468,
+        )
+        self.back = Flight.objects.create(
+            route=route,
+            airplane=self.early.airplane,
+            departure_time=at(4),
+            arrival_time=at(4) + timedelta(hours=1),
+        )
+        self.client = APIClient()
+
+    def ids(self, **params):
+        res = self.client.get('/api/flights/', params)
+        self.assertEqual(res.status_code, 200, res.content)
+        return [f['id'] for f in res.json()['results']]
+
+    def test_range_is_ordered_by_departure(self):
+        self.assertEqual(
+            self.ids(
+                departure_after=at(1).isoformat(),
+                departure_before=at(5).isoformat(),
+            ),
+            [self.late.id, self.early.id, self.back.id],
+        )
+
+    def test_source_and_destination_through_route(self):
+        kyiv = Airport.objects.get(name='Boryspil')
+        self.assertEqual(
+            self.ids(source=kyiv.id, departure_before=at(5).isoformat()),
+            [self.late.id, self.early.id],
+        )
+        self.assertEqual(self.ids(destination=kyiv.id), [self.back.id])
+
+
+class FlightIndexPlanTests(TestCase):
+    def setUp(self):
+        self.flight = make_flight(departure=at(3))
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_route_range_uses_composite_index(self):
+        plan = self.plan(
+            Flight.objects.filter(
+                route=self.flight.route_id,
+                departure_time__gte=at(1),
+                departure_time__lt=at(5),
+            ).order_by('departure_time', 'id')
+        )
+        self.assertIn('flight_route_departure_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_plain_range_uses_departure_index(self):
+        plan = self.plan(
+            Flight.objects.filter(
+                departure_time__gte=at(1),
+                departure_time__lt=at(5),
+            ).order_by('departure_time', 'id')
+        )
+        self.assertIn('flight_departure_idx', plan)
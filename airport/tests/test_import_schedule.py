@@ -0,0 +1,105 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.itineraries import route_graph
+from airport.models import Airport, Flight, Route
+
+RECORDS = [
+    {'type': 'airport', 'name': 'KBP', 'closest_big_city': 'Kyiv'},
+    {'type': 'airport', 'name': 'LWO', 'closest_big_city': 'Lviv'},
+    {'type': 'airplane_type', 'name': 'A320'},
+    {'type': 'airplane', 'name': 'UR-AAA', 'rows': 3, 'seats_in_row': 4,
+     'airplane_type': 'A320'},
+    {'type': 'route', 'source': 'KBP', 'destination': 'LWO',
+     'distance': 470},
+    {'type': 'flight', 'source': 'KBP', 'destination': 'LWO',
+     'airplane': 'UR-AAA', 'departure_time': '2030-05-01T08:00:00Z',
+     'arrival_time': '2030-05-01T09:10:00Z'},
+    {'type': 'flight', 'source': 'KBP', 'destination': 'LWO',
+     'airplane': 'UR-AAA', 'departure_time': '2030-05-02T08:00:00',
+     'arrival_time': '2030-05-02T09:10:00'},
+    # Unknown route and inverted times are skipped, not fatal.
+    {'type': 'flight', 'source': 'LWO', 'destination': 'KBP',
+     'airplane': 'UR-AAA', 'departure_time': '2030-05-01T08:00:00Z',
+     'arrival_time': '2030-05-01T09:10:00Z'},
+    {'type': 'flight', 'source': 'KBP', 'destination': 'LWO',
+     'airplane': 'UR-AAA', 'departure_time': '2030-05-01T10:00:00Z',
+     'arrival_time': '2030-05-01T09:10:00Z'},
+]
+
+
+class ImportScheduleTests(TestCase):
+    def run_import(self, name, content, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / name
+            path.write_text(content)
+            out = StringIO()
+            call_command('import_schedule', str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def test_ndjson_import_with_small_batches(self):
+        content = '\n'.join(json.dumps(r) for r in RECORDS)
+        out = self.run_import('schedule.ndjson', content, '--batch-size=2')
+        self.assertIn('flight: 2 created', out)
+        self.assertIn('flight: 2 skipped', out)
+        self.assertIn('rows/s', out)
+
+        flight = Flight.objects.select_related('airplane').first()
+        self.assertEqual(flight.seats_available, 12)
+        self.assertEqual(flight.get_seat_bitmap().taken_count(), 0)
+        self.assertEqual(len(flight.seat_bitmap), 2)
+
+    def test_malformed_ndjson_line_is_skipped(self):
+        lines = [json.dumps(r) for r in RECORDS]
+        lines.insert(3, '{"type": "airplane", "name": ')
+        out = self.run_import('schedule.ndjson', '\n'.join(lines))
+        self.assertIn('line 4: not a JSON object, skipped', out)
+        self.assertIn('malformed: 1 skipped', out)
+        self.assertIn('flight: 2 created', out)
+        self.assertEqual(Flight.objects.count(), 2)
+
+    def test_import_refreshes_search_indexes(self):
+        client = APIClient()
+        self.assertEqual(
+            client.get('/api/airports/autocomplete/', {'q': 'KB'}).json(),
+            [],
+        )
+        route_graph.get()
+        content = '\n'.join(json.dumps(r) for r in RECORDS)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_import('schedule.ndjson', content)
+
+        res = client.get('/api/airports/autocomplete/', {'q': 'KB'})
+        self.assertEqual([a['name'] for a in res.json()], ['KBP'])
+        kbp, lwo = (
+            Airport.objects.get(name=name).pk for name in ('KBP', 'LWO')
+        )
+        res = client.get('/api/itineraries/', {
+            'source': kbp,
+            'destination': lwo,
+            'date': '2030-05-01',
+        })
+        self.assertEqual(len(res.json()), 1)
+
+    def test_csv_import_is_idempotent_for_reference_data(self):
+        columns = [
+            'type', 'name', 'closest_big_city', 'rows', 'seats_in_row',
+            'airplane_type', 'source', 'destination', 'distance',
+            'airplane', 'departure_time', 'arrival_time',
+        ]
+        lines = [','.join(columns)] + [
+            ','.join(str(r.get(c, '')) for c in columns) for r in RECORDS
+        ]
+        content = '\n'.join(lines) + '\n'
+        self.run_import('schedule.csv', content)
+        self.run_import('schedule.csv', content)
+        self.assertEqual(Airport.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 1)
+        # The second run's flights overlap the first run's and are skipped.
+        self.assertEqual(Flight.objects.count(), 2)
@@ -0,0 +1,85 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from airport.models import Crew
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+def timings(response):
+    parts = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        parts[name] = dict(param.split('=', 1) for param in params)
+    return parts
+
+
+@override_settings(
+    INSTRUMENTATION_SAMPLE_RATE=1,
+    INSTRUMENTATION_SLOW_REQUEST_MS=10_000,
+    INSTRUMENTATION_SLOW_QUERY_MS=10_000,
+    INSTRUMENTATION_REPEATED_QUERY_THRESHOLD=5,
+)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.flight = make_flight()
+        self.client = APIClient()
+
+    def test_server_timing_header(self):
+        res = self.client.get('/api/flights/')
+        parts = timings(res)
+        self.assertEqual(set(parts), {'db', 'serialize', 'view'})
+        self.assertEqual(parts['db']['desc'], '"3 queries"')
+        self.assertGreater(float(parts['serialize']['dur']), 0)
+        self.assertGreaterEqual(
+            float(parts['view']['dur']),
+            float(parts['db']['dur']),
+        )
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        res = self.client.get('/api/flights/')
+        self.assertNotIn('Server-Timing', res)
+
+    @override_settings(
+        INSTRUMENTATION_SLOW_REQUEST_MS=0,
+        INSTRUMENTATION_SLOW_QUERY_MS=0,
+    )
+    def test_slow_log(self):
+        with self.assertLogs('airport.instrumentation', 'WARNING') as logs:
+            self.client.get(f'/api/flights/{self.flight.id}/')
+        events = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        kinds = [event['event'] for event in events]
+        self.assertIn('slow_query', kinds)
+        self.assertEqual(kinds[-1], 'slow_request')
+        self.assertEqual(events[-1]['view'], 'flight-detail')
+        self.assertEqual(events[-1]['status'], 200)
+
+    def test_repeated_queries_are_flagged(self):
+        user = User.objects.create_user(username='u1', password='p')
+        crews = Crew.objects.bulk_create(
+            Crew(first_name=f'C{i}', last_name='X') for i in range(6)
+        )
+        self.client.force_authenticate(user)
+        with self.assertLogs('airport.instrumentation', 'WARNING') as logs:
+            # One SELECT per crew id while validating the M2M field.
+            self.client.patch(
+                f'/api/flights/{self.flight.id}/',
+                {'crews': [crew.id for crew in crews]},
+                format='json',
+            )
+        event = json.loads(logs.output[0].split(':', 2)[2])
+        self.assertEqual(event['event'], 'repeated_queries')
+        self.assertEqual(event['view'], 'flight-detail')
+        self.assertGreaterEqual(event['queries'][0]['count'], 6)
+
+    async def test_async_views_are_timed(self):
+        res = await AsyncClient().get(
+            f'/api/async/flights/{self.flight.id}/',
+        )
+        self.assertEqual(timings(res)['db']['desc'], '"2 queries"')
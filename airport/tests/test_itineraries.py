@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Route,
+)
+
+
+def at(hour, minute=0, day=1):
+    return datetime(2030, 5, day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self):
+        self.kbp, self.lwo, self.waw, self.lhr = (
+            Airport.objects.create(name=name)
+            for name in ('KBP', 'LWO', 'WAW', 'LHR')
+        )
+        self.routes = {}
+        for src, dst, distance in [
+            (self.kbp, self.lwo, 470),
+            (self.lwo, self.waw, 330),
+            (self.waw, self.lhr, 1450),
+            (self.kbp, self.waw, 690),
+            (self.kbp, self.lhr, 2500),
+        ]:
+            self.routes[src.name, dst.name] = Route.objects.create(
+                source=src,
+                destination=dst,
+                distance=distance,
+            )
+        self.plane = Airplane.objects.create(
+            name='UR-AAA',
+            rows=3,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name='A320'),
+        )
+        self.client = APIClient()
+
+    def flight(self, src, dst, departure, hours):
+        return Flight.objects.create(
+            route=self.routes[src, dst],
+            airplane=self.plane,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+        )
+
+    def search(self, **params):
+        params = {
+            'source': self.kbp.id,
+            'destination': self.lhr.id,
+            'date': '2030-05-01',
+            **params,
+        }
+        res = self.client.get('/api/itineraries/', params)
+        self.assertEqual(res.status_code, 200, res.content)
+        return [[leg['flight'] for leg in i['legs']] for i in res.json()]
+
+    def test_connections_respect_layovers_and_rank_by_distance(self):
+        direct = self.flight('KBP', 'LHR', at(8), 4)
+        kbp_waw = self.flight('KBP', 'WAW', at(6), 1.5)
+        waw_lhr = self.flight('WAW', 'LHR', at(9), 2.5)
+        self.flight('WAW', 'LHR', at(7), 2.5)  # too early to connect
+        self.flight('WAW', 'LHR', at(23), 2.5)  # layover too long
+        kbp_lwo = self.flight('KBP', 'LWO', at(5), 1)
+        lwo_waw = self.flight('LWO', 'WAW', at(6, 45), 1)
+
+        results = self.search()
+        self.assertEqual(results, [
+            [kbp_waw.id, waw_lhr.id],
+            [kbp_lwo.id, lwo_waw.id, waw_lhr.id],
+            [direct.id],
+        ])
+
+        self.assertEqual(
+            self.search(ordering='duration')[0],
+            [direct.id],
+        )
+        self.assertEqual(self.search(max_legs=1), [[direct.id]])
+
+    def test_only_first_leg_is_bound_to_date(self):
+        self.flight('KBP', 'LHR', at(8, day=2), 4)
+        kbp_waw = self.flight('KBP', 'WAW', at(22), 1.5)
+        waw_lhr = self.flight('WAW', 'LHR', at(1, day=2), 2.5)
+        self.assertEqual(self.search(), [[kbp_waw.id, waw_lhr.id]])
+
+    def test_connection_without_flights(self):
+        # WAW-LHR has no flights, while LWO-WAW does at the same position.
+        self.flight('KBP', 'WAW', at(6), 1.5)
+        self.flight('KBP', 'LWO', at(5), 1)
+        self.flight('LWO', 'WAW', at(6, 45), 1)
+        self.assertEqual(self.search(), [])
+
+    def test_invalid_params(self):
+        res = self.client.get('/api/itineraries/', {
+            'source': self.kbp.id,
+            'destination': self.kbp.id,
+            'date': '2030-05-01',
+        })
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,112 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from airport.metrics import Counter, Histogram, Registry, registry
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.client = APIClient()
+
+    def scrape(self):
+        res = self.client.get('/metrics')
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        return res.content.decode()
+
+    def test_booking_metrics(self):
+        self.client.force_authenticate(self.user)
+        url = f'/api/flights/{self.flight.id}/book/'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'row': 1, 'seat': 1})
+        self.client.post(url, {'row': 1, 'seat': 1})
+
+        text = self.scrape()
+        self.assertEqual(sample(text, 'airport_orders_created_total'), 1)
+        self.assertEqual(sample(
+            text,
+            f'airport_seat_conflicts_total{{flight="{self.flight.id}"}}',
+        ), 1)
+        self.assertEqual(sample(
+            text,
+            'airport_booking_seconds_count'
+            '{operation="book",outcome="ok"}',
+        ), 1)
+        self.assertEqual(sample(
+            text,
+            'airport_booking_seconds_bucket'
+            '{operation="book",outcome="conflict",le="+Inf"}',
+        ), 1)
+        self.assertEqual(sample(
+            text,
+            'airport_http_requests_total'
+            '{view="flight-book",method="POST",status="201"}',
+        ), 1)
+
+    def test_seat_map_cache_results(self):
+        url = f'/api/flights/{self.flight.id}/seats/'
+        etag = self.client.get(url)['ETag']
+        self.client.get(url)
+        self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        text = self.scrape()
+        for result in ('miss', 'hit', 'not_modified'):
+            self.assertEqual(sample(
+                text,
+                f'airport_seat_map_requests_total{{result="{result}"}}',
+            ), 1)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        res = self.client.get(
+            '/metrics',
+            HTTP_AUTHORIZATION='Bearer secret',
+        )
+        self.assertEqual(res.status_code, 200)
+
+
+class RegistryTests(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        local = Registry()
+        histogram = Histogram('h', 'Help.', buckets=(1, 2), registry=local)
+        for value in (0.5, 1, 1.5, 3):
+            histogram.observe(value)
+        lines = local.render().splitlines()
+        self.assertIn('h_bucket{le="1"} 2', lines)
+        self.assertIn('h_bucket{le="2"} 3', lines)
+        self.assertIn('h_bucket{le="+Inf"} 4', lines)
+        self.assertIn('h_sum 6.0', lines)
+
+    def test_processes_are_summed_through_metrics_dir(self):
+        local = Registry()
+        counter = Counter('c_total', 'Help.', ['kind'], registry=local)
+        counter.inc(kind='a')
+        with tempfile.TemporaryDirectory() as directory:
+            # Another worker's snapshot.
+            Path(directory, '99999.json').write_text(json.dumps({
+                'c_total': {json.dumps(['a']): 2, json.dumps(['b']): 5},
+            }))
+            with self.settings(METRICS_DIR=directory):
+                lines = local.render().splitlines()
+        self.assertIn('c_total{kind="a"} 3', lines)
+        self.assertIn('c_total{kind="b"} 5', lines)
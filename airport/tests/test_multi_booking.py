@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class MultiSeatBookingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.url = f'/api/flights/{self.flight.id}/book-seats/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_books_all_seats_under_one_order(self):
+        seats = [{'row': 1, 'seat': s} for s in (1, 2, 3)]
+        res = self.client.post(self.url, {'seats': seats}, format='json')
+        self.assertEqual(res.status_code, 201)
+        payload = res.json()
+        self.assertEqual(len(payload['tickets']), 3)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            Ticket.objects.filter(order_id=payload['order']).count(),
+            3,
+        )
+        bitmap = Flight.objects.get(pk=self.flight.pk).get_seat_bitmap()
+        self.assertEqual(bitmap.taken_count(), 3)
+
+    def test_conflicts_reported_and_nothing_booked(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flight, order=order, row=2, seat=1)
+        Ticket.objects.create(flight=self.flight, order=order, row=2, seat=2)
+        seats = [{'row': 2, 'seat': s} for s in (1, 2, 3)]
+        res = self.client.post(self.url, {'seats': seats}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            res.json()['seats'],
+            [{'row': 2, 'seat': 1}, {'row': 2, 'seat': 2}],
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_capacity_and_duplicates(self):
+        seats = [{'row': 9, 'seat': 1}, {'row': 1, 'seat': 9}]
+        res = self.client.post(self.url, {'seats': seats}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(len(res.json()['seats']), 2)
+
+        seats = [{'row': 1, 'seat': 1}, {'row': 1, 'seat': 1}]
+        res = self.client.post(self.url, {'seats': seats}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+
+class SeatAssignmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.url = f'/api/flights/{self.flight.id}/assign-seats/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_prefers_contiguous_seats_in_one_row(self):
+        order = Order.objects.create(user=self.user)
+        for row, seat in [(1, 2), (2, 4), (3, 1)]:
+            Ticket.objects.create(
+                flight=self.flight,
+                order=order,
+                row=row,
+                seat=seat,
+            )
+        res = self.client.post(self.url, {'count': 3}, format='json')
+        self.assertEqual(res.status_code, 201)
+        places = [(t['row'], t['seat']) for t in res.json()['tickets']]
+        self.assertEqual(places, [(2, 1), (2, 2), (2, 3)])
+
+    def test_spills_into_adjacent_rows(self):
+        res = self.client.post(self.url, {'count': 6}, format='json')
+        self.assertEqual(res.status_code, 201)
+        rows = {t['row'] for t in res.json()['tickets']}
+        self.assertEqual(rows, {1, 2})
+
+    def test_not_enough_seats(self):
+        res = self.client.post(self.url, {'count': 13}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,130 @@
+import base64
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.seatmap import SeatBitmap
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class SeatBitmapTests(TestCase):
+    def test_take_and_release(self):
+        bitmap = SeatBitmap(3, 4)
+        self.assertEqual(len(bitmap.to_bytes()), 2)
+        bitmap.take(3, 4)
+        bitmap.take(1, 1)
+        self.assertTrue(bitmap.is_taken(3, 4))
+        self.assertFalse(bitmap.is_taken(2, 2))
+        self.assertEqual(bitmap.taken_count(), 2)
+        bitmap.release(3, 4)
+        self.assertFalse(bitmap.is_taken(3, 4))
+        self.assertEqual(bitmap.taken_count(), 1)
+
+    def test_size_mismatch(self):
+        with self.assertRaises(ValueError):
+            SeatBitmap(3, 4, b'\x00')
+
+
+class OccupancyIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='u1',
+            password='pass12345',
+        )
+        self.flight = make_flight()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bitmap(self):
+        return Flight.objects.get(pk=self.flight.pk).get_seat_bitmap()
+
+    def test_book_sets_bit(self):
+        url = f'/api/flights/{self.flight.id}/book/'
+        res = self.client.post(url, {'row': 2, 'seat': 3}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(self.bitmap().is_taken(2, 3))
+
+    def test_taken_seat_rejected_without_insert(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flight, order=order, row=1, seat=1)
+        url = f'/api/flights/{self.flight.id}/book/'
+        res = self.client.post(url, {'row': 1, 'seat': 1}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_ticket_writes_keep_bitmap_in_step(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            flight=self.flight,
+            order=order,
+            row=1,
+            seat=2,
+        )
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.seat = 3
+        ticket.save()
+        bitmap = self.bitmap()
+        self.assertFalse(bitmap.is_taken(1, 2))
+        self.assertTrue(bitmap.is_taken(1, 3))
+
+        order.delete()
+        self.assertEqual(self.bitmap().taken_count(), 0)
+
+    def test_stale_flight_save_keeps_bookings(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        url = f'/api/flights/{self.flight.id}/book/'
+        self.client.post(url, {'row': 1, 'seat': 1}, format='json')
+        stale.arrival_time += timedelta(minutes=5)
+        stale.save()
+
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(flight.arrival_time, stale.arrival_time)
+        self.assertEqual((flight.seat_version, flight.seats_sold), (1, 1))
+        self.assertTrue(flight.get_seat_bitmap().is_taken(1, 1))
+        res = self.client.post(url, {'row': 1, 'seat': 2}, format='json')
+        self.assertEqual(res.status_code, 201)
+
+    def test_seat_map_reads_bitmap(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flight, order=order, row=3, seat=4)
+        res = self.client.get(f'/api/flights/{self.flight.id}/seats/')
+        taken = [
+            (s['row'], s['seat'])
+            for row in res.json()['seat_map']
+            for s in row['seats']
+            if s['taken']
+        ]
+        self.assertEqual(taken, [(3, 4)])
+
+
+class CompactSeatMapTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.client = APIClient()
+
+    def test_compact_layout(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flight, order=order, row=1, seat=2)
+        res = self.client.get(
+            f'/api/flights/{self.flight.id}/seats/?layout=compact',
+        )
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data['encoding'], 'bitmap-base64')
+        bits = base64.b64decode(data['bitmap'])
+        bitmap = SeatBitmap(data['rows'], data['seats_in_row'], bits)
+        self.assertTrue(bitmap.is_taken(1, 2))
+        self.assertEqual(bitmap.taken_count(), 1)
+
+    def test_unknown_layout(self):
+        res = self.client.get(
+            f'/api/flights/{self.flight.id}/seats/?layout=tiny',
+        )
+        self.assertEqual(res.status_code, 400)
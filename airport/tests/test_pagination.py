@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight(rows=5, seats_in_row=5)
+        self.orders = [Order.objects.create(user=self.user) for _ in range(3)]
+        self.tickets = [
+            Ticket.objects.create(
+                flight=self.flight,
+                order=self.orders[0],
+                row=row,
+                seat=seat,
+            )
+            for row in range(1, 6)
+            for seat in range(1, 6)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def collect(self, url):
+        ids = []
+        while url:
+            payload = self.client.get(url).json()
+            self.assertNotIn('count', payload)
+            ids.extend(item['id'] for item in payload['results'])
+            url = payload['next']
+        return ids
+
+    def test_page_numbers_stay_default(self):
+        payload = self.client.get('/api/tickets/').json()
+        self.assertEqual(payload['count'], 25)
+
+    def test_cursor_walks_tickets_in_id_order(self):
+        ids = self.collect('/api/tickets/?pagination=cursor')
+        self.assertEqual(ids, [t.id for t in self.tickets])
+
+    def test_cursor_pages_skip_count_query(self):
+        url = '/api/tickets/?pagination=cursor'
+        # The page itself and no COUNT(*).
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_orders_newest_first(self):
+        ids = self.collect('/api/orders/?pagination=cursor')
+        self.assertEqual(ids, [o.id for o in reversed(self.orders)])
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+
+from airport import benchmark
+from airport.synthetic import generate_dataset
+
+
+class QueryBudgetTests(TestCase):
+    def measure(self, flights, prefix):
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_dataset(
+                flights=flights,
+                airports=6,
+                rows=4,
+                seats_in_row=4,
+                flights_per_airplane=3,
+                prefix=prefix,
+            )
+        cache.clear()
+        ctx = benchmark.build_context(get_user_model().objects.first())
+        return benchmark.measure_endpoints(ctx, repeat=2)
+
+    def test_endpoints_stay_within_budget_as_data_grows(self):
+        small = self.measure(6, 'S')
+        large = self.measure(30, 'L')
+        for name, result in large.items():
+            with self.subTest(endpoint=name):
+                self.assertFalse(result['over_budget'], result)
+                self.assertLess(max(result['statuses']), 400)
+                self.assertEqual(result['queries'], small[name]['queries'])
+
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        def report(p50, queries):
+            return {'runs': [{'flights': 10, 'endpoints': {
+                'flight-list': {'p50_ms': p50, 'queries': queries},
+            }}]}
+
+        self.assertFalse(
+            benchmark.compare(report(10, 3), report(11, 3), 1.25)[0][-1],
+        )
+        self.assertTrue(
+            benchmark.compare(report(10, 3), report(20, 3), 1.25)[0][-1],
+        )
+        self.assertTrue(
+            benchmark.compare(report(10, 3), report(10, 4), 1.25)[0][-1],
+        )
+
+
+class BookingStormTests(TransactionTestCase):
+    # Outside a test transaction, reads may go to replica mirrors.
+    databases = '__all__'
+
+    def test_storm_never_sells_a_seat_twice(self):
+        generate_dataset(flights=1, fill=0, rows=2, seats_in_row=2)
+        ctx = benchmark.build_context(get_user_model().objects.first())
+
+        result = benchmark.booking_storm(
+            ctx['book_flight'],
+            threads=4,
+            attempts=5,
+        )
+
+        self.assertEqual(
+            result['booked'] + result['conflicts'] + result['errors'],
+            20,
+        )
+        self.assertLessEqual(result['booked'], 4)
+        self.assertTrue(result['consistent'])
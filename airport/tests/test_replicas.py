@@ -0,0 +1,125 @@
+from contextlib import ExitStack
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from airport.models import Flight
+from airport.replicas import ReplicaMiddleware, ReplicaRouter, _replica_reads
+
+from .utils import make_flight
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_replica_only_when_the_request_allows(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Flight), 'default')
+        token = _replica_reads.set(True)
+        try:
+            self.assertEqual(ReplicaRouter().db_for_read(Flight), 'replica1')
+            self.assertEqual(ReplicaRouter().db_for_write(Flight), 'default')
+        finally:
+            _replica_reads.reset(token)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(ReplicaRouter().allow_migrate('replica1', 'airport'),
+                      False)
+        self.assertIsNone(ReplicaRouter().allow_migrate('default', 'airport'))
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica1'],
+    DB_REPLICA_STICKY_SECONDS=10,
+)
+class ReplicaMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.status = 201
+        self.middleware = ReplicaMiddleware(self.view)
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        self.read_from = ReplicaRouter().db_for_read(Flight)
+        return HttpResponse(status=self.status)
+
+    def request(self, method, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        request = getattr(self.factory, method)('/api/flights/', **{
+            f'HTTP_{k.upper()}': v for k, v in headers.items()
+        })
+        self.middleware(request)
+        return self.read_from
+
+    def test_writer_sticks_to_primary(self):
+        self.assertEqual(self.request('get', 'alice'), 'replica1')
+        self.assertEqual(self.request('post', 'alice'), 'default')
+        self.assertEqual(self.request('get', 'alice'), 'default')
+        self.assertEqual(self.request('get', 'bob'), 'replica1')
+        self.assertEqual(self.request('get'), 'replica1')
+
+    def test_failed_write_does_not_pin(self):
+        self.status = 400
+        self.request('post', 'alice')
+        self.status = 200
+        self.assertEqual(self.request('get', 'alice'), 'replica1')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_primary(self):
+        self.assertEqual(self.request('get'), 'default')
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'DB_REPLICAS is not set')
+class ReplicaRoutingTests(TransactionTestCase):
+    """Run with e.g. DB_REPLICAS=replica.sqlite3 to exercise the mirrors."""
+
+    databases = '__all__'
+
+    def get(self, client, url):
+        with ExitStack() as stack:
+            primary = stack.enter_context(
+                CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]),
+            )
+            replicas = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in settings.DATABASE_REPLICAS
+            ]
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(primary), sum(len(replica) for replica in replicas)
+
+    def test_booking_client_reads_its_own_writes(self):
+        flight = make_flight()
+        user = get_user_model().objects.create_user(
+            username='u',
+            password='p',
+        )
+        client = APIClient()
+        token = client.post(
+            '/api/auth/jwt/create/',
+            {'username': 'u', 'password': 'p'},
+        ).json()['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(user.orders.count(), 0)
+
+        primary, replica = self.get(APIClient(), '/api/flights/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        res = client.post(
+            f'/api/flights/{flight.id}/book/',
+            {'row': 1, 'seat': 1},
+        )
+        self.assertEqual(res.status_code, 201)
+        primary, replica = self.get(client, '/api/orders/')
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        self.assertEqual(router.db_for_write(Flight), DEFAULT_DB_ALIAS)
@@ -0,0 +1,89 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from airport.models import Crew, Flight, FlightSchedule
+from airport.schedules import materialize_schedules
+
+from .utils import make_flight
+
+
+class RecurringScheduleTests(TestCase):
+    def setUp(self):
+        template = make_flight()
+        self.schedule = FlightSchedule.objects.create(
+            route=template.route,
+            airplane=template.airplane,
+            departure_time=time(8, 30),
+            time_zone='Europe/Kyiv',
+            duration=timedelta(hours=1, minutes=10),
+            weekdays=0b0010101,  # Mon, Wed, Fri
+            valid_from=date(2030, 6, 1),
+            valid_until=date(2030, 6, 30),
+        )
+        self.crew = Crew.objects.create(first_name='Olena', last_name='I')
+        self.schedule.crews.set([self.crew])
+        template.delete()
+
+    def generate(self, until):
+        return materialize_schedules(until, today=date(2030, 5, 1))
+
+    def test_generates_operating_days_with_crew(self):
+        self.assertEqual(self.generate(date(2030, 6, 9)), (3, 0))
+        flights = list(Flight.objects.order_by('departure_time'))
+        self.assertEqual(
+            [f.departure_time for f in flights],
+            [
+                datetime(2030, 6, day, 5, 30, tzinfo=dt_timezone.utc)
+                for day in (3, 5, 7)
+            ],
+        )
+        self.assertEqual(
+            flights[0].arrival_time - flights[0].departure_time,
+            timedelta(hours=1, minutes=10),
+        )
+        self.assertEqual(list(flights[0].crews.all()), [self.crew])
+        self.assertEqual(flights[0].seats_available, 12)
+        self.assertEqual(flights[0].schedule, self.schedule)
+
+    def test_incremental_runs_only_add_missing_flights(self):
+        self.generate(date(2030, 6, 9))
+        self.assertEqual(self.generate(date(2030, 6, 9)), (0, 0))
+        self.assertEqual(self.generate(date(2030, 6, 14)), (3, 0))
+        self.assertEqual(self.generate(date(2030, 12, 31)), (6, 0))
+        self.assertEqual(Flight.objects.count(), 12)
+        self.assertEqual(
+            Flight.crews.through.objects.count(),
+            12,
+        )
+
+    def test_skips_flights_whose_airplane_or_crew_is_busy(self):
+        # Jun 3 05:30 UTC: the airplane is away; Jun 5: the crew is.
+        busy = Flight.objects.create(
+            route=self.schedule.route,
+            airplane=self.schedule.airplane,
+            departure_time=datetime(2030, 6, 3, 5, tzinfo=dt_timezone.utc),
+            arrival_time=datetime(2030, 6, 3, 6, tzinfo=dt_timezone.utc),
+        )
+        other = make_flight(
+            departure=datetime(2030, 6, 5, 6, tzinfo=dt_timezone.utc),
+            name='UR-CCC',
+        )
+        other.crews.set([self.crew])
+
+        self.assertEqual(self.generate(date(2030, 6, 9)), (1, 2))
+        self.assertEqual(
+            list(
+                self.schedule.flights.values_list('departure_time', flat=True)
+            ),
+            [datetime(2030, 6, 7, 5, 30, tzinfo=dt_timezone.utc)],
+        )
+        self.assertFalse(busy.crews.exists())
+
+        # Once the conflicts are gone, the skipped days are generated.
+        busy.delete()
+        other.crews.clear()
+        self.assertEqual(self.generate(date(2030, 6, 9)), (2, 0))
+        self.assertEqual(self.schedule.flights.count(), 3)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.generated_until, date(2030, 6, 9))
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class SeatCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def counters(self):
+        flight = Flight.objects.get(pk=self.flight.pk)
+        return flight.seats_sold, flight.seats_available
+
+    def test_new_flight_is_empty(self):
+        self.assertEqual(self.counters(), (0, 12))
+
+    def test_counters_follow_tickets(self):
+        self.client.post(
+            f'/api/flights/{self.flight.id}/book-seats/',
+            {'seats': [{'row': 1, 'seat': 1}, {'row': 1, 'seat': 2}]},
+            format='json',
+        )
+        self.assertEqual(self.counters(), (2, 10))
+
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            flight=self.flight,
+            order=order,
+            row=3,
+            seat=3,
+        )
+        self.assertEqual(self.counters(), (3, 9))
+        ticket.delete()
+        self.assertEqual(self.counters(), (2, 10))
+
+        Order.objects.all().delete()
+        self.assertEqual(self.counters(), (0, 12))
+
+    def test_filter_and_order_by_availability(self):
+        full = make_flight(rows=1, seats_in_row=1, name='UR-BBB')
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=full, order=order, row=1, seat=1)
+
+        res = self.client.get('/api/flights/?available_gte=1')
+        ids = [f['id'] for f in res.json()['results']]
+        self.assertEqual(ids, [self.flight.id])
+
+        res = self.client.get('/api/flights/?ordering=seats_available')
+        ids = [f['id'] for f in res.json()['results']]
+        self.assertEqual(ids, [full.id, self.flight.id])
+        self.assertEqual(res.json()['results'][0]['seats_available'], 0)
+
+    def test_reconcile_command(self):
+        Flight.objects.filter(pk=self.flight.pk).update(
+            seats_sold=7,
+            seats_available=1,
+        )
+        out = StringIO()
+        call_command('reconcile_seat_counters', stdout=out)
+        self.assertIn('Reconciled 1 flights.', out.getvalue())
+        self.assertEqual(self.counters(), (0, 12))
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport import occupancy
+from airport.models import Flight, SeatChange, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class SeatMapDeltaTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.url = f'/api/flights/{self.flight.id}/seats/'
+        self.client = APIClient()
+
+    def book(self, *seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            occupancy.book_seats(self.flight.id, self.user, list(seats))
+
+    def test_full_map_carries_version(self):
+        self.book((1, 1))
+        self.assertEqual(self.client.get(self.url).json()['version'], 1)
+
+    def test_delta_since_version(self):
+        self.book((1, 1), (1, 2))
+        self.book((2, 3))
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.get(flight=self.flight, row=1, seat=2).delete()
+
+        res = self.client.get(self.url, {'since': 1})
+        self.assertEqual(res.json(), {
+            'flight': self.flight.id,
+            'version': 3,
+            'since': 1,
+            'changes': [
+                {'row': 1, 'seat': 2, 'taken': False},
+                {'row': 2, 'seat': 3, 'taken': True},
+            ],
+        })
+        self.assertEqual(res['ETag'], f'"{self.flight.id}-3"')
+
+    def test_up_to_date_client_gets_empty_delta_from_cache(self):
+        self.book((1, 1))
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, {'since': 1})
+        self.assertEqual(res.json()['changes'], [])
+
+    def test_ticket_move_is_logged(self):
+        self.book((1, 1))
+        ticket = Ticket.objects.get(flight=self.flight)
+        ticket.seat = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+        res = self.client.get(self.url, {'since': 1})
+        self.assertEqual(res.json()['changes'], [
+            {'row': 1, 'seat': 1, 'taken': False},
+            {'row': 1, 'seat': 4, 'taken': True},
+        ])
+
+    def test_trimmed_log_falls_back_to_full_map(self):
+        self.book((1, 1))
+        self.book((1, 2))
+        SeatChange.objects.update(
+            created_at=timezone.now() - timedelta(days=2),
+        )
+        self.book((1, 3))
+        call_command('trim_seat_changes', stdout=StringIO())
+
+        data = self.client.get(self.url, {'since': 1}).json()
+        self.assertNotIn('changes', data)
+        self.assertEqual(data['version'], 3)
+        self.assertEqual(
+            [s['taken'] for s in data['seat_map'][0]['seats']],
+            [True, True, True, False],
+        )
+        self.assertEqual(
+            len(self.client.get(self.url, {'since': 2}).json()['changes']),
+            1,
+        )
+
+    def test_reindex_falls_back_to_full_map(self):
+        self.book((1, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            occupancy.reindex_flight(occupancy.lock_flight(self.flight.id))
+        data = self.client.get(self.url, {'since': 0}).json()
+        self.assertNotIn('changes', data)
+        self.assertEqual(data['version'], 2)
+
+    def test_future_or_invalid_since(self):
+        self.assertNotIn(
+            'changes',
+            self.client.get(self.url, {'since': 5}).json(),
+        )
+        res = self.client.get(self.url, {'since': '-1'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_deleting_booked_flight(self):
+        self.book((1, 1), (1, 2))
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append(kwargs)
+
+        occupancy.seats_changed.connect(receiver)
+        self.addCleanup(occupancy.seats_changed.disconnect, receiver)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.delete()
+        connection.check_constraints()
+        self.assertFalse(Flight.objects.filter(pk=self.flight.pk).exists())
+        self.assertFalse(SeatChange.objects.exists())
+        self.assertEqual(sent, [])
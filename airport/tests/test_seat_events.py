@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, SimpleTestCase, TestCase
+
+from airport import occupancy
+from airport.models import Flight
+from airport.occupancy import seats_changed
+from airport.pubsub import LocalBroker
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+def parse_event(chunk):
+    event = {}
+    for line in chunk.decode().strip().splitlines():
+        key, _, value = line.partition(': ')
+        event[key] = value
+    event['data'] = json.loads(event['data'])
+    return event
+
+
+class LocalBrokerTests(SimpleTestCase):
+    async def test_publish_from_another_thread(self):
+        broker = LocalBroker()
+        async with broker.subscribe('flight:1') as subscription:
+            thread = threading.Thread(
+                target=broker.publish,
+                args=('flight:1', {'version': 2}),
+            )
+            thread.start()
+            thread.join()
+            broker.publish('flight:2', {'version': 9})
+            self.assertEqual(await subscription.get(1), {'version': 2})
+            with self.assertRaises(TimeoutError):
+                await subscription.get(0.01)
+        self.assertEqual(broker._subscribers, {})
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        broker = LocalBroker()
+        broker.queue_size = 2
+        async with broker.subscribe('flight:1') as subscription:
+            for version in range(4):
+                broker.publish('flight:1', {'version': version})
+            await asyncio.sleep(0)
+            self.assertIsNone(await subscription.get(1))
+            self.assertEqual(await subscription.get(1), {'version': 3})
+
+
+class SeatEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.url = f'/api/async/flights/{self.flight.id}/seats/events/'
+        self.client = AsyncClient()
+
+    def book(self, seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            occupancy.book_seats(self.flight.id, self.user, seats)
+
+    async def next_event(self, stream):
+        return parse_event(await asyncio.wait_for(anext(stream), 1))
+
+    async def test_snapshot_then_deltas(self):
+        res = await self.client.get(self.url)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        stream = aiter(res.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        snapshot = await self.next_event(stream)
+        self.assertEqual(snapshot['event'], 'snapshot')
+        self.assertEqual(snapshot['id'], '0')
+        self.assertEqual(snapshot['data']['encoding'], 'bitmap-base64')
+
+        await sync_to_async(self.book)([(1, 1), (1, 2)])
+        delta = await self.next_event(stream)
+        self.assertEqual(delta['event'], 'seats')
+        self.assertEqual(delta['id'], '1')
+        self.assertEqual(delta['data'], {
+            'flight': self.flight.id,
+            'version': 1,
+            'taken': [[1, 1], [1, 2]],
+            'released': [],
+        })
+        await stream.aclose()
+
+    async def test_gap_in_versions_resends_snapshot(self):
+        res = await self.client.get(self.url)
+        stream = aiter(res.streaming_content)
+        await anext(stream)
+        await self.next_event(stream)
+
+        await Flight.objects.filter(pk=self.flight.pk).aupdate(
+            seat_version=3,
+        )
+        await sync_to_async(seats_changed.send)(
+            sender=Flight,
+            flight_id=self.flight.id,
+            version=3,
+            taken=[(2, 1)],
+            released=[],
+        )
+        snapshot = await self.next_event(stream)
+        self.assertEqual(snapshot['event'], 'snapshot')
+        self.assertEqual(snapshot['id'], '3')
+        await stream.aclose()
+
+    async def test_keepalive(self):
+        res = await self.client.get(self.url)
+        stream = aiter(res.streaming_content)
+        await anext(stream)
+        await self.next_event(stream)
+        with self.settings(SEAT_EVENTS_KEEPALIVE=0.01):
+            self.assertEqual(await anext(stream), b': keepalive\n\n')
+        await stream.aclose()
+
+    async def test_missing_flight(self):
+        res = await self.client.get('/api/async/flights/999999/seats/events/')
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, SeatHold, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.other = User.objects.create_user(username='u2', password='p')
+        self.flight = make_flight()
+        self.base = f'/api/flights/{self.flight.id}'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def hold(self, *places):
+        seats = [{'row': row, 'seat': seat} for row, seat in places]
+        return self.client.post(
+            f'{self.base}/hold/',
+            {'seats': seats},
+            format='json',
+        )
+
+    def bitmap(self):
+        return Flight.objects.get(pk=self.flight.pk).get_seat_bitmap()
+
+    def test_held_seats_are_taken(self):
+        res = self.hold((1, 1), (1, 2))
+        self.assertEqual(res.status_code, 201)
+        self.assertIn('expires_at', res.json())
+
+        seat_map = self.client.get(f'{self.base}/seats/').json()['seat_map']
+        self.assertTrue(seat_map[0]['seats'][0]['taken'])
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        res = other.post(
+            f'{self.base}/book/',
+            {'row': 1, 'seat': 2},
+            format='json',
+        )
+        self.assertEqual(res.status_code, 400)
+
+    def test_confirm_turns_holds_into_order(self):
+        self.hold((2, 1), (2, 2))
+        res = self.client.post(f'{self.base}/hold/confirm/')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(res.json()['tickets']), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(self.bitmap().taken_count(), 2)
+
+        res = self.client.post(f'{self.base}/hold/confirm/')
+        self.assertEqual(res.status_code, 400)
+
+    def test_release(self):
+        self.hold((3, 3))
+        res = self.client.delete(f'{self.base}/hold/')
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(self.bitmap().taken_count(), 0)
+
+    def test_expired_holds_do_not_block_booking(self):
+        self.hold((1, 1))
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        res = self.client.post(
+            f'{self.base}/book/',
+            {'row': 1, 'seat': 1},
+            format='json',
+        )
+        self.assertEqual(res.status_code, 201)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_reap_command(self):
+        self.hold((1, 1), (1, 2))
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        call_command('reap_seat_holds', stdout=StringIO())
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(self.bitmap().taken_count(), 0)
+        self.assertFalse(Order.objects.exists())
+
+    def test_ticket_api_rejects_held_seat(self):
+        self.hold((1, 1))
+        other = APIClient()
+        other.force_authenticate(self.other)
+        order = Order.objects.create(user=self.other)
+        res = other.post('/api/tickets/', {
+            'flight': self.flight.id,
+            'order': order.id,
+            'row': 1,
+            'seat': 1,
+        })
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_ticket_on_held_seat_outlives_the_hold(self):
+        self.hold((1, 1))
+        order = Order.objects.create(user=self.other)
+        Ticket.objects.create(flight=self.flight, order=order, row=1, seat=1)
+
+        res = self.client.post(f'{self.base}/hold/confirm/')
+        self.assertEqual(res.status_code, 400)
+
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(1))
+        call_command('reap_seat_holds', stdout=StringIO())
+        self.assertTrue(self.bitmap().is_taken(1, 1))
+
+    def test_deleting_user_releases_holds(self):
+        self.hold((2, 2))
+        self.user.delete()
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(self.bitmap().taken_count(), 0)
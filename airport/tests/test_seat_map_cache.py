@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+
+from .utils import make_flight
+
+User = get_user_model()
+
+
+class SeatMapCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', password='p')
+        self.flight = make_flight()
+        self.url = f'/api/flights/{self.flight.id}/seats/'
+        self.client = APIClient()
+
+    def test_etag_and_not_modified_without_queries(self):
+        res = self.client.get(self.url)
+        etag = res['ETag']
+        self.assertTrue(etag)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_cached_payload_served_without_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+
+    def test_ticket_write_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            etag = self.client.get(self.url)['ETag']
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(
+                flight=self.flight,
+                order=order,
+                row=1,
+                seat=1,
+            )
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertTrue(res.json()['seat_map'][0]['seats'][0]['taken'])
+
+    def test_book_invalidates(self):
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                f'/api/flights/{self.flight.id}/book/',
+                {'row': 2, 'seat': 2},
+                format='json',
+            )
+        self.assertEqual(res.status_code, 201)
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+
+    def test_deleted_flight_is_not_served_from_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 404)
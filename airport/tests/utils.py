@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Route,
+)
+
+
+def make_flight(rows=3, seats_in_row=4, departure=None, name='UR-AAA'):
+    a1, _ = Airport.objects.get_or_create(
+        name='Boryspil',
+        closest_big_city='Kyiv',
+    )
+    a2, _ = Airport.objects.get_or_create(
+        name='Lviv',
+        closest_big_city='Lviv',
+    )
+    route, _ = Route.objects.get_or_create(
+        source=a1,
+        destination=a2,
+        defaults={'distance': 468},
+    )
+    at, _ = AirplaneType.objects.get_or_create(name='Airbus A320')
+    plane, _ = Airplane.objects.get_or_create(
+        name=name,
+        defaults={
+            'rows': rows,
+            'seats_in_row': seats_in_row,
+            'airplane_type': at,
+        },
+    )
+    departure = departure or timezone.now() + timedelta(days=1)
+    return Flight.objects.create(
+        route=route,
+        airplane=plane,
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=1),
+    )
@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
@@ -5,9 +6,18 @@ from .views import (
     AirplaneViewSet,
     AirportViewSet,
     CrewViewSet,
+    DatabasePoolView,
+    DailyBookingsView,
+    DayLoadView,
+    FlightScheduleViewSet,
+    FlightLoadView,
     FlightViewSet,
+    ItineraryViewSet,
+    OrderExportView,
     OrderViewSet,
+    RouteLoadView,
     RouteViewSet,
+    TicketExportView,
     TicketViewSet,
 )
 
@@ -18,7 +28,37 @@ router.register('airplane-types', AirplaneTypeViewSet)
 router.register('airplanes', AirplaneViewSet)
 router.register('crews', CrewViewSet)
 router.register('flights', FlightViewSet)
+router.register('schedules', FlightScheduleViewSet)
 router.register('orders', OrderViewSet)
 router.register('tickets', TicketViewSet)
+router.register('itineraries', ItineraryViewSet, basename='itinerary')
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        'exports/tickets.<str:fmt>',
+        TicketExportView.as_view(),
+        name='export-tickets',
+    ),
+    path(
+        'exports/orders.<str:fmt>',
+        OrderExportView.as_view(),
+        name='export-orders',
+    ),
+    path(
+        'analytics/flights/',
+        FlightLoadView.as_view(),
+        name='analytics-flights',
+    ),
+    path(
+        'analytics/routes/',
+        RouteLoadView.as_view(),
+        name='analytics-routes',
+    ),
+    path('analytics/days/', DayLoadView.as_view(), name='analytics-days'),
+    path(
+        'analytics/bookings/',
+        DailyBookingsView.as_view(),
+        name='analytics-bookings',
+    ),
+    path('ops/db-pool/', DatabasePoolView.as_view(), name='ops-db-pool'),
+]
@@ -1,38 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets, status
+from rest_framework import filters, generics, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
+from . import cache as seat_map_cache, occupancy
+from .analytics import with_load_factor
+from .conflicts import RESOURCES, conflict_report
+from .dbpool import pool_stats
+from .exports import (
+    ENCODERS,
+    ORDER_COLUMNS,
+    TICKET_COLUMNS,
+    stream_export,
+)
+from .filters import (
+    DailyBookingsFilter,
+    FlightFilter,
+    FlightLoadFilter,
+    OrderExportFilter,
+    RouteDayLoadFilter,
+    TicketExportFilter,
+)
+from .itineraries import search_itineraries
+from .metrics import SEAT_MAP_REQUESTS
 from .models import (
     Airplane,
     AirplaneType,
     Airport,
     Crew,
+    DailyBookings,
     Flight,
+    FlightLoad,
+    FlightSchedule,
     Order,
     Route,
+    RouteDayLoad,
     Ticket,
 )
+from .occupancy import (
+    NoActiveHolds,
+    NotEnoughSeats,
+    SeatUnavailable,
+)
+from .postgres import violates_airplane_overlap
+from .search import autocomplete
+from .seatmap import seat_map_payload
 from .serializers import (
     AirplaneSerializer,
     AirplaneTypeSerializer,
     AirportSerializer,
     CrewSerializer,
+    FlightScheduleSerializer,
     FlightSerializer,
     OrderSerializer,
     RouteSerializer,
     TicketSerializer,
     BookSeatSerializer,
+    BookSeatsSerializer,
+    MultiBookingResponseSerializer,
+    SeatMapDeltaResponseSerializer,
     SeatMapResponseSerializer,
     BookingResponseSerializer,
+    CompactSeatMapResponseSerializer,
+    AssignSeatsSerializer,
+    SeatHoldResponseSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    AirportAutocompleteSerializer,
+    FlightConflictSerializer,
+    FlightLoadSerializer,
+    RouteLoadSerializer,
+    DayLoadSerializer,
+    DailyBookingsSerializer,
 )
 
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     OpenApiExample,
+    OpenApiParameter,
     OpenApiResponse,
+    PolymorphicProxySerializer,
     extend_schema,
+    extend_schema_view,
 )
 
 
@@ -42,6 +98,19 @@ class AirportViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['name', 'closest_big_city']
 
+    @extend_schema(
+        parameters=[AirportAutocompleteSerializer],
+        responses=AirportSerializer(many=True),
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def autocomplete(self, request):
+        serializer = AirportAutocompleteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(autocomplete(
+            serializer.validated_data['q'],
+            serializer.validated_data['limit'],
+        ))
+
 
 class RouteViewSet(viewsets.ModelViewSet):
     queryset = Route.objects.select_related(
@@ -73,32 +142,135 @@ class CrewViewSet(viewsets.ModelViewSet):
     search_fields = ['first_name', 'last_name']
 
 
+class FlightScheduleViewSet(viewsets.ModelViewSet):
+    queryset = (
+        FlightSchedule.objects.select_related('route', 'airplane')
+        .prefetch_related('crews')
+        .order_by('id')
+    )
+    serializer_class = FlightScheduleSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['route', 'airplane']
+
+
 class FlightViewSet(viewsets.ModelViewSet):
     queryset = (
         Flight.objects.select_related('route', 'airplane')
         .prefetch_related('crews')
+        .defer('seat_bitmap')
         .order_by('id')
     )
     serializer_class = FlightSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = [
-        'route',
-        'airplane',
-        'crews',
+    filterset_class = FlightFilter
+    cursor_ordering = 'id'
+    ordering_fields = [
         'departure_time',
-        'arrival_time'
+        'arrival_time',
+        'id',
+        'seats_sold',
+        'seats_available',
     ]
-    ordering_fields = ['departure_time', 'arrival_time', 'id']
+
+    seat_actions = (
+        'seats',
+        'book',
+        'book_seats',
+        'assign_seats',
+        'hold',
+        'confirm_hold',
+    )
+
+    def get_queryset(self):
+        if self.action in self.seat_actions:
+            return Flight.objects.select_related('airplane')
+        return super().get_queryset()
+
+    def perform_create(self, serializer):
+        self._save_checked(serializer)
+
+    def perform_update(self, serializer):
+        self._save_checked(serializer)
+
+    def _save_checked(self, serializer):
+        # The serializer checks overlaps; this catches the exclusion
+        # constraint losing a race on PostgreSQL.
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError as exc:
+            if not violates_airplane_overlap(exc):
+                raise
+            raise ValidationError(
+                {'airplane': ['airplane is already flying at that time']},
+            )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'kind',
+                str,
+                enum=list(RESOURCES),
+                description='only overlaps of airplanes or of crew members',
+            ),
+        ],
+        responses=FlightConflictSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=['get'],
+        pagination_class=None,
+        permission_classes=[IsAdminUser],
+    )
+    def conflicts(self, request):
+        kind = request.query_params.get('kind')
+        if kind is not None and kind not in RESOURCES:
+            return Response(
+                {'detail': 'kind must be one of: airplane, crew'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        report = conflict_report((kind,) if kind else tuple(RESOURCES))
+        return Response(FlightConflictSerializer(report, many=True).data)
 
     @extend_schema(
-        responses=OpenApiResponse(
-            response=SeatMapResponseSerializer,
+        parameters=[
+            OpenApiParameter(
+                'layout',
+                str,
+                enum=['verbose', 'compact'],
+                default='verbose',
+                description=(
+                    'verbose: one object per seat; '
+                    'compact: base64 occupancy bitmap for the whole cabin'
+                ),
+            ),
+            OpenApiParameter(
+                'since',
+                int,
+                description=(
+                    'version of a seat map the client already has: return '
+                    'only the seats changed after it. Falls back to the '
+                    'full map when the change log no longer covers it.'
+                ),
+            ),
+        ],
+        responses={200: OpenApiResponse(
+            response=PolymorphicProxySerializer(
+                component_name='SeatMap',
+                serializers=[
+                    SeatMapResponseSerializer,
+                    CompactSeatMapResponseSerializer,
+                    SeatMapDeltaResponseSerializer,
+                ],
+                resource_type_field_name=None,
+            ),
             description='Seat map for a given flight',
             examples=[
                 OpenApiExample(
                     'Seat map example',
                     value={
                         'flight': 1,
+                        'version': 7,
                         'rows': 30,
                         'seats_in_row': 6,
                         'seat_map': [
@@ -109,37 +281,130 @@ class FlightViewSet(viewsets.ModelViewSet):
                         ],
                     },
                 ),
+                OpenApiExample(
+                    'Compact seat map example',
+                    value={
+                        'flight': 1,
+                        'version': 7,
+                        'rows': 3,
+                        'seats_in_row': 4,
+                        'encoding': 'bitmap-base64',
+                        'bitmap': 'AgA=',
+                    },
+                ),
+                OpenApiExample(
+                    'Seat map delta example',
+                    value={
+                        'flight': 1,
+                        'version': 9,
+                        'since': 7,
+                        'changes': [
+                            {'row': 1, 'seat': 2, 'taken': False},
+                            {'row': 3, 'seat': 1, 'taken': True},
+                        ],
+                    },
+                ),
             ],
-        )
+        ), 304: OpenApiResponse(
+            description='Seat map unchanged since the If-None-Match ETag',
+        )},
     )
     @action(detail=True, methods=['get'], url_path='seats')
     def seats(self, request, pk=None):
-        flight = self.get_object()
-        rows = flight.airplane.rows
-        seats_in_row = flight.airplane.seats_in_row
-
-        occupied = set(flight.tickets.values_list('row', 'seat'))
-
-        seat_map = []
-        for row_number in range(1, rows + 1):
-            row_seats = []
-            for seat_number in range(1, seats_in_row + 1):
-                is_taken = (row_number, seat_number) in occupied
-                row_seats.append(
-                    {
-                        'row': row_number,
-                        'seat': seat_number,
-                        'taken': is_taken
-                    }
+        layout = request.query_params.get('layout', 'verbose')
+        if layout not in ('verbose', 'compact'):
+            return Response(
+                {'detail': 'layout must be one of: verbose, compact'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        since = request.query_params.get('since')
+        if since is not None:
+            if not since.isdigit():
+                return Response(
+                    {'detail': 'since must be a non-negative integer'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            since = int(since)
+
+        try:
+            flight_id = int(pk)
+        except ValueError:
+            raise NotFound()
+
+        version = seat_map_cache.get_version(flight_id)
+        payload = flight = None
+        if version is not None:
+            if seat_map_cache.etag_matches(
+                request,
+                seat_map_cache.etag_for(flight_id, version),
+            ):
+                SEAT_MAP_REQUESTS.inc(result='not_modified')
+                return self._seat_map_not_modified(flight_id, version)
+            if since == version:
+                payload = self._seat_map_delta(flight_id, version, since, [])
+            elif since is None:
+                payload = seat_map_cache.get_payload(
+                    flight_id,
+                    version,
+                    layout,
                 )
-            seat_map.append({'row': row_number, 'seats': row_seats})
 
-        return Response({
-            'flight': flight.id,
-            'rows': rows,
-            'seats_in_row': seats_in_row,
-            'seat_map': seat_map,
-        })
+        SEAT_MAP_REQUESTS.inc(result='hit' if payload is not None else 'miss')
+        if payload is None and since is not None:
+            flight = self.get_object()
+            changes = occupancy.seat_changes_since(flight, since)
+            if changes is not None:
+                version = flight.seat_version
+                seat_map_cache.remember_version(flight_id, version)
+                payload = self._seat_map_delta(
+                    flight_id,
+                    version,
+                    since,
+                    changes,
+                )
+
+        if payload is None:
+            # No delta to give: send the full map.
+            flight = flight or self.get_object()
+            version = flight.seat_version
+            seat_map_cache.remember_version(flight_id, version)
+            if seat_map_cache.etag_matches(
+                request,
+                seat_map_cache.etag_for(flight_id, version),
+            ):
+                return self._seat_map_not_modified(flight_id, version)
+            payload = seat_map_cache.get_payload(flight_id, version, layout)
+            if payload is None:
+                payload = seat_map_payload(
+                    flight_id,
+                    version,
+                    flight.get_seat_bitmap(),
+                    layout,
+                )
+                seat_map_cache.set_payload(
+                    flight_id,
+                    version,
+                    layout,
+                    payload,
+                )
+
+        response = Response(payload)
+        response['ETag'] = seat_map_cache.etag_for(flight_id, version)
+        return response
+
+    @staticmethod
+    def _seat_map_delta(flight_id, version, since, changes):
+        return {
+            'flight': flight_id,
+            'version': version,
+            'since': since,
+            'changes': changes,
+        }
+
+    def _seat_map_not_modified(self, flight_id, version):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = seat_map_cache.etag_for(flight_id, version)
+        return response
 
     @extend_schema(
         request=BookSeatSerializer,
@@ -188,25 +453,20 @@ class FlightViewSet(viewsets.ModelViewSet):
         row = serializer.validated_data['row']
         seat = serializer.validated_data['seat']
 
-        total_rows = flight.airplane.rows
-        seats_per_row = flight.airplane.seats_in_row
-
-        if row > total_rows or seat > seats_per_row:
+        bitmap = flight.get_seat_bitmap()
+        if not bitmap.contains(row, seat):
             return Response(
                 {'detail': 'row/seat exceeds airplane capacity'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
-            with transaction.atomic():
-                order = Order.objects.create(user=request.user)
-                ticket = Ticket.objects.create(
-                    flight=flight,
-                    order=order,
-                    row=row,
-                    seat=seat,
-                )
-        except IntegrityError:
+            order, (ticket,) = occupancy.book_seats(
+                flight.pk,
+                request.user,
+                [(row, seat)],
+            )
+        except (SeatUnavailable, IntegrityError):
             return Response(
                 {'detail': 'seat already taken for this flight'},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -225,12 +485,280 @@ class FlightViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @extend_schema(
+        request=BookSeatsSerializer,
+        responses={
+            201: OpenApiResponse(
+                response=MultiBookingResponseSerializer,
+                description='All seats booked under a single order',
+                examples=[
+                    OpenApiExample(
+                        'Booking created',
+                        value={
+                            'order': 11,
+                            'flight': 1,
+                            'tickets': [
+                                {'id': 56, 'row': 5, 'seat': 3},
+                                {'id': 57, 'row': 5, 'seat': 4},
+                            ],
+                        },
+                    ),
+                ],
+            ),
+            400: OpenApiResponse(
+                description=(
+                    'Invalid input, or some seats are out of capacity or '
+                    'already taken; nothing is booked'
+                ),
+                examples=[
+                    OpenApiExample(
+                        'Seats taken',
+                        value={
+                            'detail': 'seat already taken for this flight',
+                            'seats': [{'row': 5, 'seat': 4}],
+                        },
+                    ),
+                    OpenApiExample(
+                        'Out of capacity',
+                        value={
+                            'detail': 'row/seat exceeds airplane capacity',
+                            'seats': [{'row': 99, 'seat': 1}],
+                        },
+                    ),
+                ],
+            ),
+            401: OpenApiResponse(description='Authentication required'),
+        },
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path='book-seats',
+        permission_classes=[IsAuthenticated],
+    )
+    def book_seats(self, request, pk=None):
+        flight = self.get_object()
+        serializer = BookSeatsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        seats = serializer.validated_data['seats']
+
+        bitmap = flight.get_seat_bitmap()
+        outside = [
+            (row, seat) for row, seat in seats
+            if not bitmap.contains(row, seat)
+        ]
+        if outside:
+            return self._seats_error(
+                'row/seat exceeds airplane capacity',
+                outside,
+            )
+
+        try:
+            order, tickets = occupancy.book_seats(
+                flight.pk,
+                request.user,
+                seats,
+            )
+        except SeatUnavailable as exc:
+            return self._seats_error(
+                'seat already taken for this flight',
+                exc.seats,
+            )
+        except IntegrityError:
+            return Response(
+                {'detail': 'seat already taken for this flight'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self._booking_response(order, flight, tickets)
+
+    @extend_schema(
+        request=AssignSeatsSerializer,
+        responses={
+            201: OpenApiResponse(
+                response=MultiBookingResponseSerializer,
+                description=(
+                    'Seats picked by the server and booked under one order'
+                ),
+            ),
+            400: OpenApiResponse(
+                description='Invalid input or not enough free seats',
+                examples=[
+                    OpenApiExample(
+                        'Flight too full',
+                        value={'detail': 'not enough free seats'},
+                    ),
+                ],
+            ),
+            401: OpenApiResponse(description='Authentication required'),
+        },
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path='assign-seats',
+        permission_classes=[IsAuthenticated],
+    )
+    def assign_seats(self, request, pk=None):
+        flight = self.get_object()
+        serializer = AssignSeatsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            order, tickets = occupancy.assign_seats(
+                flight.pk,
+                request.user,
+                serializer.validated_data['count'],
+            )
+        except (NotEnoughSeats, IntegrityError):
+            return Response(
+                {'detail': 'not enough free seats'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self._booking_response(order, flight, tickets)
+
+    @extend_schema(
+        methods=['POST'],
+        request=BookSeatsSerializer,
+        responses={
+            201: OpenApiResponse(
+                response=SeatHoldResponseSerializer,
+                description=(
+                    'Seats held for the current user until expires_at'
+                ),
+            ),
+            400: OpenApiResponse(
+                description='Invalid input or seats already taken/held',
+            ),
+            401: OpenApiResponse(description='Authentication required'),
+        },
+    )
+    @extend_schema(
+        methods=['DELETE'],
+        responses={
+            204: OpenApiResponse(
+                description="Current user's holds released",
+            ),
+        },
+    )
+    @action(
+        detail=True,
+        methods=['post', 'delete'],
+        url_path='hold',
+        permission_classes=[IsAuthenticated],
+    )
+    def hold(self, request, pk=None):
+        flight = self.get_object()
+        if request.method == 'DELETE':
+            occupancy.release_holds(flight.pk, request.user)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = BookSeatsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        seats = serializer.validated_data['seats']
+
+        bitmap = flight.get_seat_bitmap()
+        outside = [
+            (row, seat) for row, seat in seats
+            if not bitmap.contains(row, seat)
+        ]
+        if outside:
+            return self._seats_error(
+                'row/seat exceeds airplane capacity',
+                outside,
+            )
+
+        try:
+            holds = occupancy.hold_seats(flight.pk, request.user, seats)
+        except SeatUnavailable as exc:
+            return self._seats_error(
+                'seat already taken for this flight',
+                exc.seats,
+            )
+        except IntegrityError:
+            return Response(
+                {'detail': 'seat already taken for this flight'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                'flight': flight.id,
+                'expires_at': holds[0].expires_at,
+                'seats': [{'row': h.row, 'seat': h.seat} for h in holds],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        request=None,
+        responses={
+            201: OpenApiResponse(
+                response=MultiBookingResponseSerializer,
+                description="Current user's holds turned into one order",
+            ),
+            400: OpenApiResponse(
+                description='No active holds on this flight',
+            ),
+            401: OpenApiResponse(description='Authentication required'),
+        },
+    )
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path='hold/confirm',
+        permission_classes=[IsAuthenticated],
+    )
+    def confirm_hold(self, request, pk=None):
+        flight = self.get_object()
+        try:
+            order, tickets = occupancy.confirm_holds(flight.pk, request.user)
+        except NoActiveHolds:
+            return Response(
+                {'detail': 'no active seat holds for this flight'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except IntegrityError:
+            return Response(
+                {'detail': 'seat already taken for this flight'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self._booking_response(order, flight, tickets)
+
+    def _booking_response(self, order, flight, tickets):
+        return Response(
+            {
+                'order': order.id,
+                'flight': flight.id,
+                'tickets': [
+                    {'id': t.id, 'row': t.row, 'seat': t.seat}
+                    for t in tickets
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _seats_error(self, detail, seats):
+        return Response(
+            {
+                'detail': detail,
+                'seats': [{'row': row, 'seat': seat} for row, seat in seats],
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
 
 class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.select_related('user').order_by('-created_at')
+    queryset = Order.objects.select_related('user').order_by(
+        '-created_at',
+        '-id',
+    )
     serializer_class = OrderSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['user']
+    cursor_ordering = ('-created_at', '-id')
 
 
 class TicketViewSet(viewsets.ModelViewSet):
@@ -238,3 +766,194 @@ class TicketViewSet(viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['flight', 'order']
+    cursor_ordering = 'id'
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        self._lock_place(serializer)
+        super().perform_create(serializer)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        self._lock_place(serializer)
+        super().perform_update(serializer)
+
+    def _lock_place(self, serializer):
+        # The seat must be free in the occupancy bitmap, which also covers
+        # other users' holds, while the flight is locked.
+        instance = serializer.instance
+        flight, row, seat = (
+            serializer.validated_data.get(name, getattr(instance, name, None))
+            for name in ('flight', 'row', 'seat')
+        )
+        if instance is not None and (
+            (instance.flight_id, instance.row, instance.seat)
+            == (flight.pk, row, seat)
+        ):
+            return
+        try:
+            occupancy.lock_free_place(flight.pk, row, seat)
+        except SeatUnavailable:
+            raise ValidationError(
+                {'seat': ['seat already taken for this flight']},
+            )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
+
+class ItineraryViewSet(viewsets.ViewSet):
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def list(self, request):
+        serializer = ItinerarySearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        itineraries = search_itineraries(
+            params['source'],
+            params['destination'],
+            params['date'],
+            max_legs=params['max_legs'],
+            min_layover=timedelta(minutes=params['min_layover']),
+            max_layover=timedelta(minutes=params['max_layover']),
+            order_by=params['ordering'],
+            limit=params['limit'],
+        )
+        return Response(ItinerarySerializer(itineraries, many=True).data)
+
+
+class ExportView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    pagination_class = None
+    columns = ()
+    filename = 'export'
+
+    def perform_content_negotiation(self, request, force=False):
+        # CSV/NDJSON are written by the view itself; the negotiated renderer
+        # is only used for error bodies.
+        return super().perform_content_negotiation(request, force=True)
+
+    @extend_schema(
+        filters=True,
+        parameters=[
+            OpenApiParameter(
+                'fmt',
+                str,
+                OpenApiParameter.PATH,
+                enum=list(ENCODERS),
+            ),
+        ],
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            (200, 'text/csv'): OpenApiTypes.STR,
+        },
+    )
+    def get(self, request, fmt):
+        if fmt not in ENCODERS:
+            raise NotFound()
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_export(queryset, self.columns, fmt, self.filename)
+
+
+@extend_schema_view(get=extend_schema(operation_id='exports_tickets'))
+class TicketExportView(ExportView):
+    queryset = Ticket.objects.order_by('id')
+    filterset_class = TicketExportFilter
+    columns = TICKET_COLUMNS
+    filename = 'tickets'
+
+
+@extend_schema_view(get=extend_schema(operation_id='exports_orders'))
+class OrderExportView(ExportView):
+    queryset = Order.objects.order_by('id')
+    filterset_class = OrderExportFilter
+    columns = ORDER_COLUMNS
+    filename = 'orders'
+
+
+class AnalyticsView(generics.ListAPIView):
+    """Read-only views over the rollups kept by refresh_analytics."""
+
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+
+
+class FlightLoadView(AnalyticsView):
+    queryset = FlightLoad.objects.order_by('day', 'flight_id')
+    serializer_class = FlightLoadSerializer
+    filterset_class = FlightLoadFilter
+    cursor_ordering = ('day', 'flight_id')
+
+
+class RouteLoadView(AnalyticsView):
+    queryset = RouteDayLoad.objects.all()
+    serializer_class = RouteLoadSerializer
+    filterset_class = RouteDayLoadFilter
+    pagination_class = None
+    group_by = 'route'
+
+    def list(self, request, *args, **kwargs):
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values(self.group_by)
+            .annotate(
+                flights=Sum('flights'),
+                capacity=Sum('capacity'),
+                seats_sold=Sum('seats_sold'),
+            )
+            .order_by(self.group_by)
+        )
+        return Response(
+            self.get_serializer(with_load_factor(rows), many=True).data,
+        )
+
+
+class DayLoadView(RouteLoadView):
+    serializer_class = DayLoadSerializer
+    group_by = 'day'
+
+
+class DailyBookingsView(AnalyticsView):
+    queryset = DailyBookings.objects.order_by('day')
+    serializer_class = DailyBookingsSerializer
+    filterset_class = DailyBookingsFilter
+    pagination_class = None
+
+
+class DatabasePoolView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+    filter_backends = []
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'alias',
+                str,
+                description='only this database alias',
+            ),
+            OpenApiParameter(
+                'probe',
+                int,
+                enum=[0, 1],
+                default=1,
+                description='0 skips the live checkout of open pools',
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request):
+        """Connection pool size, idle connections, waiters and latency."""
+        alias = request.query_params.get('alias')
+        if alias is not None and alias not in settings.DATABASES:
+            raise ValidationError({'alias': f'Unknown database "{alias}".'})
+        probe = request.query_params.get('probe') != '0'
+        return Response(pool_stats(
+            aliases=[alias] if alias else None,
+            probe=probe,
+        ))
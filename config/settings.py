@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'drf_spectacular',
@@ -52,12 +53,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'airport.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'airport.instrumentation.InstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -95,6 +98,19 @@ DB_NAME = (
     or str((BASE_DIR / (_env('SQLITE_NAME') or 'db.sqlite3')).resolve())
 )
 
+# PostgreSQL connections come from a psycopg_pool pool (DB_POOL=0 turns
+# it off); other setups keep each connection for DB_CONN_MAX_AGE seconds.
+# Either way a connection is checked before it is handed out again.
+DB_POOL = 'postgresql' in DB_ENGINE and _env('DB_POOL') != '0'
+DB_POOL_OPTIONS = {
+    'min_size': int(_env('DB_POOL_MIN_SIZE') or 2),
+    'max_size': int(_env('DB_POOL_MAX_SIZE') or 10),
+    # Seconds a request may wait for a free connection before failing.
+    'timeout': float(_env('DB_POOL_TIMEOUT') or 10),
+    'max_idle': float(_env('DB_POOL_MAX_IDLE') or 300),
+    'max_lifetime': float(_env('DB_POOL_MAX_LIFETIME') or 3600),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': DB_ENGINE,
@@ -103,9 +119,66 @@ DATABASES = {
         'PASSWORD': (_env('DB_PASSWORD') or '').strip(),
         'HOST': (_env('DB_HOST') or 'localhost').strip(),
         'PORT': (_env('DB_PORT') or '5432').strip(),
+        # Pooled connections go back to the pool after every request.
+        'CONN_MAX_AGE': 0 if DB_POOL else int(_env('DB_CONN_MAX_AGE') or 60),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
+    }
+}
+
+# Read replicas: comma-separated host[:port] of servers replicating
+# DB_NAME, or with SQLite, database file paths. Safe requests read from
+# them (airport.replicas); tests run them as mirrors of the test database.
+DATABASE_REPLICAS = []
+for _index, _replica in enumerate(
+    filter(None, _env('DB_REPLICAS').split(',')),
+    start=1,
+):
+    _replica = _replica.strip()
+    if 'sqlite3' in DB_ENGINE:
+        _location = {'NAME': str((BASE_DIR / _replica).resolve())}
+    else:
+        _host, _, _port = _replica.partition(':')
+        _location = {
+            'HOST': _host,
+            'PORT': _port or DATABASES['default']['PORT'],
+        }
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        **_location,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{_index}')
+
+DATABASE_ROUTERS = ['airport.replicas.ReplicaRouter']
+# After a write, the client reads from the primary for this long.
+DB_REPLICA_STICKY_SECONDS = int(_env('DB_REPLICA_STICKY_SECONDS') or 10)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# LocMem is per-process; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': (
+            _env('CACHE_BACKEND')
+            or 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': _env('CACHE_LOCATION'),
     }
 }
 
+SEAT_MAP_CACHE_ALIAS = _env('SEAT_MAP_CACHE_ALIAS') or 'default'
+SEAT_MAP_CACHE_TIMEOUT = int(_env('SEAT_MAP_CACHE_TIMEOUT') or 300)
+# How stale another worker's in-process indexes (route graph, airport
+# autocomplete) may be before it rereads their generation from the cache.
+INDEX_GENERATION_CHECK_SECONDS = float(
+    _env('INDEX_GENERATION_CHECK_SECONDS') or 5
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -154,22 +227,36 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-REST_FRAMEWORK = {
-    'DEFAULT_PERMISSION_CLASSES': [
-        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ],
-    'DEFAULT_AUTHENTICATION_CLASSES': [
+# 'fast': JWT with the token's user cached for AUTH_USER_CACHE_TIMEOUT
+# seconds, plus sessions for the browsable API. 'compat' restores the
+# uncached JWT lookup and HTTP Basic (PBKDF2 on every request).
+API_AUTH_MODE = _env('API_AUTH_MODE') or 'fast'
+AUTH_USER_CACHE_TIMEOUT = int(_env('AUTH_USER_CACHE_TIMEOUT') or 60)
+
+if API_AUTH_MODE == 'compat':
+    AUTHENTICATION_CLASSES = [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
+    ]
+else:
+    AUTHENTICATION_CLASSES = [
+        'airport.authentication.CachedJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ]
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_AUTHENTICATION_CLASSES': AUTHENTICATION_CLASSES,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+        'airport.pagination.SelectablePagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -192,6 +279,48 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# 'memory' (in-process prefix/trigram index) or 'postgres' (pg_trgm).
+AIRPORT_AUTOCOMPLETE_BACKEND = (
+    _env('AIRPORT_AUTOCOMPLETE_BACKEND') or 'memory'
+)
+
+# PostgreSQL exclusion constraint against an airplane flying two flights
+# at once, added by migrate. Migrate fails while /api/flights/conflicts/
+# still lists airplane overlaps; fix those or set this to 0.
+AIRPLANE_OVERLAP_CONSTRAINT = _env('AIRPLANE_OVERLAP_CONSTRAINT') != '0'
+
+# Fan-out for /api/async/flights/{id}/seats/events/: 'local' (this
+# process only) or 'postgres' (LISTEN/NOTIFY across worker processes).
+SEAT_EVENTS_BROKER = _env('SEAT_EVENTS_BROKER') or 'local'
+SEAT_EVENTS_KEEPALIVE = int(_env('SEAT_EVENTS_KEEPALIVE_SECONDS') or 15)
+
+# Request instrumentation (Server-Timing header, JSON slow log on the
+# airport.instrumentation logger) for this share of requests.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    _env('INSTRUMENTATION_SAMPLE_RATE') or (1 if DEBUG else 0.1)
+)
+INSTRUMENTATION_SLOW_REQUEST_MS = int(
+    _env('INSTRUMENTATION_SLOW_REQUEST_MS') or 500
+)
+INSTRUMENTATION_SLOW_QUERY_MS = int(
+    _env('INSTRUMENTATION_SLOW_QUERY_MS') or 100
+)
+# The same statement this many times in one request is logged as N+1.
+INSTRUMENTATION_REPEATED_QUERY_THRESHOLD = int(
+    _env('INSTRUMENTATION_REPEATED_QUERY_THRESHOLD') or 5
+)
+
+# /metrics. Set METRICS_DIR to a directory shared by the worker processes
+# of one host (cleared on deploy) so that any worker reports all of them.
+METRICS_DIR = _env('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(_env('METRICS_FLUSH_INTERVAL') or 1)
+# When set, scrapers must send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = _env('METRICS_TOKEN') or None
+
+SEAT_HOLD_TTL = timedelta(
+    seconds=int(_env('SEAT_HOLD_TTL_SECONDS') or 600),
+)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
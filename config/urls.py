@@ -26,8 +26,12 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from airport.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('api/async/', include('airport.async_urls')),
     path('api/', include('airport.urls')),
 
     # JWT auth
@@ -0,0 +1,14 @@
+import pytest
+from django.core.cache import caches
+
+from airport.itineraries import route_graph
+from airport.search import airport_index
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    for index in (route_graph, airport_index):
+        index.reset()
+    yield